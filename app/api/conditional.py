@@ -0,0 +1,59 @@
+"""ETag helpers for conditional requests."""
+
+import hashlib
+from typing import Iterable, Optional, Sequence, Tuple
+
+from fastapi import Response, status
+
+from app.core.compression import decoded_etag
+
+
+def lesson_plan_etag(lesson_plan_id: int, version: int) -> str:
+    """Strong ETag of a single lesson plan."""
+    return f'"lp-{lesson_plan_id}-v{version}"'
+
+
+def list_etag(rows: Iterable[Tuple[int, int]], fields: Sequence[str] = ()) -> str:
+    """
+    Strong ETag of a lesson plan page from its ``(id, version)`` pairs.
+
+    Pages are fetched with one look-ahead row, so whether a next page
+    exists is part of the fingerprint as well. ``fields`` distinguishes
+    representations of the same page with different sparse fieldsets.
+    """
+    fingerprint = ",".join(f"{row_id}:{version}" for row_id, version in rows)
+    fingerprint += ";" + ",".join(fields)
+    return f'"lps-{hashlib.sha1(fingerprint.encode()).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """
+    Weak comparison of an ``If-None-Match`` header against an ETag.
+
+    Tags of compressed representations match the ETag they were derived from.
+    """
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return decoded_etag(tag[2:] if tag.startswith("W/") else tag)
+
+    return opaque(etag) in {opaque(tag) for tag in if_none_match.split(",")}
+
+
+def if_match_satisfied(if_match: Optional[str], etag: str) -> bool:
+    """
+    Strong comparison of an ``If-Match`` header against the current ETag,
+    accepting the tag of any compressed representation of it.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return True
+    return etag in {decoded_etag(tag.strip()) for tag in if_match.split(",")}
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current ETag."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -1,10 +1,16 @@
 """API dependencies for authentication and database access."""
 
+import time
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.revocation import revocations
 from app.core.security import decode_access_token
 from app.db.database import get_db
 from app.models.user import User
@@ -12,42 +18,110 @@ from app.schemas.token import TokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Decoded token payloads, keyed by the raw token
+token_cache = TTLCache(max_size=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token."""
-    credentials_exception = HTTPException(
+# Column snapshots of resolved users, keyed by username
+user_cache = TTLCache(max_size=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def credentials_exception() -> HTTPException:
+    """Error raised for missing, invalid or expired credentials."""
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    payload = decode_access_token(token)
+
+def inactive_user_exception() -> HTTPException:
+    """Error raised when the authenticated account is deactivated."""
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Inactive user"
+    )
+
+
+def decode_token(token: str) -> dict:
+    """
+    Decode a JWT, reusing the payload of recently seen tokens.
+
+    Revoked tokens are rejected even while their payload is cached.
+    """
+    payload = token_cache.get(token)
     if payload is None:
-        raise credentials_exception
+        payload = decode_access_token(token)
+        if payload is None:
+            raise credentials_exception()
+        token_cache.set(token, payload, ttl=payload.get("exp", 0) - time.time())
+    if revocations.is_revoked(payload):
+        raise credentials_exception()
+    return payload
+
+
+def invalidate_cached_user(username: str) -> None:
+    """Drop a user's cached snapshot after the account changes."""
+    user_cache.delete(username)
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """Get current authenticated user from JWT token."""
+    payload = decode_token(token)
 
     username: Optional[str] = payload.get("sub")
     if username is None:
-        raise credentials_exception
+        raise credentials_exception()
 
     token_data = TokenData(username=username)
 
-    user = db.query(User).filter(User.username == token_data.username).first()
+    snapshot = user_cache.get(token_data.username)
+    if snapshot is not None:
+        # Rebuild the user without a query and attach it to this request's
+        # session so endpoints can still modify it
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        db.add(user)
+        return user
+
+    result = await db.execute(select(User).where(User.username == token_data.username))
+    user = result.scalars().first()
     if user is None:
-        raise credentials_exception
+        raise credentials_exception()
 
+    user_cache.set(
+        token_data.username,
+        {column.key: getattr(user, column.key) for column in User.__table__.columns}
+    )
     return user
 
 
-def get_current_active_user(
+async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
     """Ensure the current user is active."""
     if not current_user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Inactive user"
-        )
+        raise inactive_user_exception()
     return current_user
+
+
+async def get_current_active_user_id(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> int:
+    """
+    Get the id of the current active user.
+
+    Tokens carrying ``uid``/``active`` claims are trusted without touching the
+    database; other tokens fall back to the cached user lookup.
+    """
+    payload = decode_token(token)
+    if "uid" in payload and "active" in payload:
+        if not payload["active"]:
+            raise inactive_user_exception()
+        return payload["uid"]
+
+    current_user = await get_current_active_user(await get_current_user(token, db))
+    return current_user.id
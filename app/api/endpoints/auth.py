@@ -3,29 +3,59 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.hashing import password_hasher
+from app.core.security import create_access_token, user_token_claims
 from app.db.database import get_db
-from app.models.user import User
+from app.db.tokens import (
+    InvalidRefreshToken,
+    hash_token,
+    issue_refresh_token,
+    revoke_family,
+    rotate_refresh_token,
+)
+from app.models.user import RefreshToken, User
 from app.schemas.user import UserCreate, User as UserSchema
-from app.schemas.token import Token
+from app.schemas.token import RefreshRequest, Token
 
 router = APIRouter()
 
 
+def token_pair(user: User, refresh_token: str, family_id: str) -> dict:
+    """Response body with a new access token and its refresh token."""
+    access_token = create_access_token(
+        # The family id lets a detected refresh token reuse revoke this token too
+        data={**user_token_claims(user), "fam": family_id},
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+def invalid_refresh_token_exception() -> HTTPException:
+    """Error raised for refresh tokens that cannot be exchanged."""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 @router.post("/register", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user."""
     # Check if user already exists
-    if db.query(User).filter(User.email == user_in.email).first():
+    result = await db.execute(select(User).where(User.email == user_in.email))
+    if result.scalars().first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    if db.query(User).filter(User.username == user_in.username).first():
+    result = await db.execute(select(User).where(User.username == user_in.username))
+    if result.scalars().first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
@@ -36,25 +66,32 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)):
         email=user_in.email,
         username=user_in.username,
         full_name=user_in.full_name,
-        hashed_password=get_password_hash(user_in.password)
+        hashed_password=await password_hasher.hash(user_in.password)
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     return db_user
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login and receive access token."""
-    user = db.query(User).filter(User.username == form_data.username).first()
+    result = await db.execute(select(User).where(User.username == form_data.username))
+    user = result.scalars().first()
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await password_hasher.verify_and_update(
+            form_data.password, user.hashed_password
+        )
+
+    if not user or not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -67,9 +104,47 @@ def login(
             detail="Inactive user"
         )
 
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
+    # Transparently upgrade hashes made with an outdated cost factor
+    if new_hash:
+        user.hashed_password = new_hash
+
+    refresh_token, family_id = await issue_refresh_token(db, user.id)
+    await db.commit()
+
+    return token_pair(user, refresh_token, family_id)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(body: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access token and refresh token.
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    Each refresh token can be used once. Reusing one revokes every token
+    descended from the same login.
+    """
+    try:
+        user_id, refresh_token, family_id = await rotate_refresh_token(db, body.refresh_token)
+    except InvalidRefreshToken:
+        # Keep the family revocation, if reuse triggered one
+        await db.commit()
+        raise invalid_refresh_token_exception()
+
+    user = await db.get(User, user_id)
+    if user is None or not user.is_active:
+        await db.rollback()
+        raise invalid_refresh_token_exception()
+
+    await db.commit()
+    return token_pair(user, refresh_token, family_id)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(body: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Revoke a refresh token and every token descended from the same login."""
+    result = await db.execute(
+        select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_token(body.refresh_token))
+    )
+    family_id = result.scalars().first()
+    if family_id is not None:
+        await revoke_family(db, family_id)
+        await db.commit()
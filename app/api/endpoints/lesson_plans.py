@@ -1,55 +1,343 @@
 """Lesson plan management endpoints."""
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-
-from app.api.dependencies import get_current_active_user
-from app.db.database import get_db
-from app.models.user import User
-from app.models.lesson_plan import LessonPlan, Tag, GradeLevel, DifficultyLevel
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import (
+    Select,
+    String,
+    case,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    union_all,
+    update
+)
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer_group
+
+from app.api.conditional import (
+    etag_matches,
+    if_match_satisfied,
+    lesson_plan_etag,
+    list_etag,
+    not_modified
+)
+from app.api.dependencies import get_current_active_user_id
+from app.api.export import MEDIA_TYPES, ExportFormat, export_chunk, export_header
+from app.api.fields import (
+    OPTIONAL_FIELDS,
+    lesson_plan_summaries,
+    parse_fields,
+    summary_columns
+)
+from app.api.pagination import (
+    lesson_plan_cursor,
+    lesson_plans_after,
+    paginate,
+    pagination_headers
+)
+from app.api.streaming import RecordError, iter_json_records
+from app.core.config import settings
+from app.core.response_cache import (
+    LESSON_PLAN_LISTS,
+    LESSON_PLANS,
+    TAGS,
+    lesson_plan_namespace,
+    response_cache
+)
+from app.core.serialization import dump_json, json_response
+from app.db.database import get_db, get_read_db
+from app.db.revisions import (
+    record_revision,
+    replay,
+    revision_chain,
+    revision_content,
+    snapshot_revision
+)
+from app.db.search import apply_search
+from app.models.lesson_plan import (
+    LessonPlan,
+    LessonPlanRevision,
+    Tag,
+    GradeLevel,
+    DifficultyLevel,
+    lesson_plan_tags
+)
 from app.schemas.lesson_plan import (
     LessonPlan as LessonPlanSchema,
     LessonPlanCreate,
-    LessonPlanUpdate
+    LessonPlanFacets,
+    LessonPlanImportResult,
+    LessonPlanImportSummary,
+    LessonPlanRevisionContent,
+    LessonPlanRevisionInfo,
+    LessonPlanSummary,
+    LessonPlanUpdate,
+    TagMatch
 )
 
 router = APIRouter()
 
+FIELDS_DESCRIPTION = f"Comma-separated optional fields to include: {', '.join(OPTIONAL_FIELDS)}"
+
+lesson_plan_adapter = TypeAdapter(LessonPlanSchema)
+lesson_plan_facets_adapter = TypeAdapter(LessonPlanFacets)
+
+
+async def lesson_plan_cache_key(lesson_plan_id: int) -> str:
+    """Response cache key of a single lesson plan."""
+    return await response_cache.key(
+        "lesson_plan", [LESSON_PLANS, lesson_plan_namespace(lesson_plan_id)], id=lesson_plan_id
+    )
+
 
 @router.post("/", response_model=LessonPlanSchema, status_code=status.HTTP_201_CREATED)
-def create_lesson_plan(
+async def create_lesson_plan(
+    response: Response,
     lesson_plan_in: LessonPlanCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user_id: int = Depends(get_current_active_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new lesson plan."""
     # Create lesson plan
     lesson_plan_data = lesson_plan_in.model_dump(exclude={"tag_ids"})
-    db_lesson_plan = LessonPlan(**lesson_plan_data, owner_id=current_user.id)
+    db_lesson_plan = LessonPlan(**lesson_plan_data, owner_id=current_user_id, tags=[])
 
     # Add tags if provided
     if lesson_plan_in.tag_ids:
-        tags = db.query(Tag).filter(Tag.id.in_(lesson_plan_in.tag_ids)).all()
-        db_lesson_plan.tags = tags
+        result = await db.execute(select(Tag).where(Tag.id.in_(lesson_plan_in.tag_ids)))
+        db_lesson_plan.tags = list(result.scalars().all())
+    tags_changed = await update_tag_usage(db, {tag.id: 1 for tag in db_lesson_plan.tags})
 
     db.add(db_lesson_plan)
-    db.commit()
-    db.refresh(db_lesson_plan)
-
+    await db.flush()
+    db.add(LessonPlanRevision(**snapshot_revision(
+        db_lesson_plan.id, db_lesson_plan.version, revision_content(db_lesson_plan), current_user_id
+    )))
+    await db.commit()
+    # Only reload what the database generated; content is already in memory
+    await db.refresh(db_lesson_plan, ["created_at", "updated_at"])
+    await response_cache.invalidate(LESSON_PLAN_LISTS, *([TAGS] if tags_changed else []))
+
+    response.headers["ETag"] = lesson_plan_etag(db_lesson_plan.id, db_lesson_plan.version)
     return db_lesson_plan
 
 
-@router.get("/", response_model=List[LessonPlanSchema])
-def get_lesson_plans(
+async def update_tag_usage(db: AsyncSession, deltas: Dict[int, int]) -> bool:
+    """
+    Adjust ``Tag.lesson_plan_count`` by per-tag deltas in a single UPDATE.
+
+    Runs in the caller's transaction. Returns whether any count changed, in
+    which case cached tag responses must be invalidated.
+    """
+    deltas = {tag_id: delta for tag_id, delta in deltas.items() if delta}
+    if not deltas:
+        return False
+
+    await db.execute(
+        update(Tag)
+        .where(Tag.id.in_(sorted(deltas)))
+        .values(lesson_plan_count=Tag.lesson_plan_count + case(deltas, value=Tag.id))
+        .execution_options(synchronize_session=False)
+    )
+    return True
+
+
+def filter_lesson_plans(
+    query: Select,
+    db: AsyncSession,
+    subject: Optional[str],
+    grade_level: Optional[GradeLevel],
+    difficulty: Optional[DifficultyLevel],
+    search: Optional[str],
+    tag_ids: Optional[str],
+    tag_match: TagMatch = TagMatch.ANY
+) -> Select:
+    """Apply the list filters shared by the lesson plan list and export endpoints."""
+    if subject:
+        query = query.where(LessonPlan.subject.ilike(f"%{subject}%"))
+
+    if grade_level:
+        query = query.where(LessonPlan.grade_level == grade_level)
+
+    if difficulty:
+        query = query.where(LessonPlan.difficulty == difficulty)
+
+    # Full-text search, ranked by relevance
+    if search:
+        query = apply_search(query, LessonPlan, search, db.get_bind().dialect.name)
+
+    # Filter by tags with semi-joins on lesson_plan_tags, so a lesson plan
+    # carrying several of the tags is still returned once
+    if tag_ids:
+        try:
+            tag_id_list = list(dict.fromkeys(int(tid.strip()) for tid in tag_ids.split(",")))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid tag_ids format"
+            )
+
+        if tag_match == TagMatch.ALL:
+            query = query.where(LessonPlan.id.in_(
+                select(lesson_plan_tags.c.lesson_plan_id)
+                .where(lesson_plan_tags.c.tag_id.in_(tag_id_list))
+                .group_by(lesson_plan_tags.c.lesson_plan_id)
+                .having(func.count() == len(tag_id_list))
+            ))
+        else:
+            query = query.where(exists().where(
+                lesson_plan_tags.c.lesson_plan_id == LessonPlan.id,
+                lesson_plan_tags.c.tag_id.in_(tag_id_list)
+            ))
+
+    return query
+
+
+def import_error(index: int, errors: List[Dict]) -> LessonPlanImportResult:
+    """Failed import result for the record at ``index``."""
+    return LessonPlanImportResult(index=index, status="error", errors=errors)
+
+
+async def insert_import_batch(
+    db: AsyncSession,
+    batch: List[Tuple[int, LessonPlanCreate]],
+    owner_id: int,
+    tag_ids: Dict[int, bool]
+) -> List[LessonPlanImportResult]:
+    """
+    Insert a batch of validated lesson plans in one transaction.
+
+    ``tag_ids`` remembers which tag ids exist across batches, so each tag id
+    is looked up once per import. Unknown tag ids are ignored, as on create.
+    """
+    unresolved = {
+        tag_id for _, record in batch for tag_id in record.tag_ids or [] if tag_id not in tag_ids
+    }
+    if unresolved:
+        result = await db.execute(select(Tag.id).where(Tag.id.in_(unresolved)))
+        existing = set(result.scalars().all())
+        tag_ids.update({tag_id: tag_id in existing for tag_id in unresolved})
+
+    try:
+        result = await db.execute(
+            insert(LessonPlan).returning(LessonPlan.id, sort_by_parameter_order=True),
+            [
+                {**record.model_dump(exclude={"tag_ids"}), "owner_id": owner_id}
+                for _, record in batch
+            ]
+        )
+        ids = result.scalars().all()
+
+        record_tag_ids = [
+            sorted(tag_id for tag_id in set(record.tag_ids or []) if tag_ids[tag_id])
+            for _, record in batch
+        ]
+        associations = [
+            {"lesson_plan_id": lesson_plan_id, "tag_id": tag_id}
+            for lesson_plan_id, valid_tag_ids in zip(ids, record_tag_ids)
+            for tag_id in valid_tag_ids
+        ]
+        if associations:
+            await db.execute(insert(lesson_plan_tags), associations)
+            await update_tag_usage(db, Counter(row["tag_id"] for row in associations))
+
+        await db.execute(insert(LessonPlanRevision), [
+            snapshot_revision(
+                lesson_plan_id,
+                1,
+                {**record.model_dump(mode="json", exclude={"tag_ids"}), "tag_ids": valid_tag_ids},
+                owner_id
+            )
+            for lesson_plan_id, (_, record), valid_tag_ids in zip(ids, batch, record_tag_ids)
+        ])
+        await db.commit()
+    except SQLAlchemyError:
+        await db.rollback()
+        return [
+            import_error(index, [{"loc": [], "msg": "Could not store lesson plan"}])
+            for index, _ in batch
+        ]
+
+    return [
+        LessonPlanImportResult(index=index, status="created", id=lesson_plan_id)
+        for lesson_plan_id, (index, _) in zip(ids, batch)
+    ]
+
+
+@router.post("/import", response_model=LessonPlanImportSummary)
+async def import_lesson_plans(
+    request: Request,
+    current_user_id: int = Depends(get_current_active_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk import lesson plans owned by the current user.
+
+    The body is either newline-delimited JSON (one `LessonPlanCreate` object
+    per line) or a JSON array of them. Records are validated as they stream
+    in and inserted in batches of `BULK_IMPORT_BATCH_SIZE`, each committed in
+    its own transaction. Invalid records are reported and skipped; the
+    response lists the outcome of every record by its position in the body.
+    """
+    results: List[LessonPlanImportResult] = []
+    batch: List[Tuple[int, LessonPlanCreate]] = []
+    tag_ids: Dict[int, bool] = {}
+
+    async for index, record in iter_json_records(request.stream()):
+        if isinstance(record, RecordError):
+            results.append(import_error(index, [{"loc": [], "msg": str(record)}]))
+            continue
+        try:
+            batch.append((index, LessonPlanCreate.model_validate(record)))
+        except ValidationError as exc:
+            results.append(import_error(index, [
+                {"loc": list(error["loc"]), "msg": error["msg"]} for error in exc.errors()
+            ]))
+            continue
+
+        if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+            results.extend(await insert_import_batch(db, batch, current_user_id, tag_ids))
+            batch = []
+
+    if batch:
+        results.extend(await insert_import_batch(db, batch, current_user_id, tag_ids))
+
+    created = sum(1 for result in results if result.status == "created")
+    if created:
+        await response_cache.invalidate(LESSON_PLAN_LISTS, TAGS)
+
+    results.sort(key=lambda result: result.index)
+    return LessonPlanImportSummary(
+        created=created,
+        failed=len(results) - created,
+        results=results
+    )
+
+
+@router.get("/", response_model=List[LessonPlanSummary], response_model_exclude_unset=True)
+async def get_lesson_plans(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
     subject: Optional[str] = None,
     grade_level: Optional[GradeLevel] = None,
     difficulty: Optional[DifficultyLevel] = None,
     search: Optional[str] = None,
     tag_ids: Optional[str] = Query(None, description="Comma-separated tag IDs"),
-    db: Session = Depends(get_db)
+    tag_match: TagMatch = Query(TagMatch.ANY, description="Match any or all of tag_ids"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get lesson plans with filtering and search.
@@ -57,88 +345,364 @@ def get_lesson_plans(
     - **subject**: Filter by subject
     - **grade_level**: Filter by grade level
     - **difficulty**: Filter by difficulty level
-    - **search**: Search in title, subject, and procedure
+    - **search**: Full-text search in title, subject, objectives, and procedure
+      (results are ranked by relevance)
     - **tag_ids**: Filter by tag IDs (comma-separated, e.g., "1,2,3")
+    - **tag_match**: Return lesson plans with `any` (default) or `all` of the tags
+    - **cursor**: Continue after the page that returned this `X-Next-Cursor` header
+      (not available together with search, whose results are ranked)
+    - **fields**: Content fields to include besides the summary (e.g. "snippet,objectives")
+
+    Responses carry an `ETag`; send it back in `If-None-Match` to get an empty
+    304 response while the page is unchanged.
     """
-    query = db.query(LessonPlan)
+    if cursor and search:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor pagination is not supported for search results"
+        )
+    fields = parse_fields(fields)
+
+    cache_key = await response_cache.key(
+        "lesson_plans",
+        [LESSON_PLANS, LESSON_PLAN_LISTS],
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        subject=subject,
+        grade_level=grade_level,
+        difficulty=difficulty,
+        search=search,
+        tag_ids=tag_ids,
+        tag_match=tag_match,
+        fields=",".join(fields) or None
+    )
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        if etag_matches(if_none_match, cached.headers.get("ETag")):
+            return not_modified(cached.headers["ETag"])
+        return cached
+
+    query = filter_lesson_plans(
+        select(LessonPlan), db, subject, grade_level, difficulty, search, tag_ids, tag_match
+    )
 
-    # Apply filters
-    if subject:
-        query = query.filter(LessonPlan.subject.ilike(f"%{subject}%"))
+    # Keyset pagination
+    if cursor:
+        query = query.where(lesson_plans_after(cursor))
 
-    if grade_level:
-        query = query.filter(LessonPlan.grade_level == grade_level)
+    # Order by most recent
+    query = query.order_by(LessonPlan.created_at.desc(), LessonPlan.id.desc())
 
-    if difficulty:
-        query = query.filter(LessonPlan.difficulty == difficulty)
+    query = query.offset(skip).limit(limit + 1)
+
+    # Revalidate from (id, version) pairs alone, without loading content
+    if if_none_match:
+        result = await db.execute(query.with_only_columns(LessonPlan.id, LessonPlan.version))
+        etag = list_etag(result.all(), fields)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
 
-    # Search
+    # Select plain columns and build the JSON directly from the rows
+    result = await db.execute(query.with_only_columns(*summary_columns(fields)))
+    rows = result.all()
+    etag = list_etag(((row.id, row.version) for row in rows), fields)
     if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            (LessonPlan.title.ilike(search_filter)) |
-            (LessonPlan.subject.ilike(search_filter)) |
-            (LessonPlan.procedure.ilike(search_filter))
-        )
+        page = rows[:limit]
+    else:
+        page = paginate(rows, limit, response, lesson_plan_cursor)
+
+    return await response_cache.store_body(
+        cache_key,
+        dump_json(await lesson_plan_summaries(db, page)),
+        {**pagination_headers(response), "ETag": etag}
+    )
 
-    # Filter by tags
-    if tag_ids:
+
+@router.get("/my", response_model=List[LessonPlanSummary], response_model_exclude_unset=True)
+async def get_my_lesson_plans(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user_id: int = Depends(get_current_active_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get current user's lesson plans."""
+    fields = parse_fields(fields)
+    query = select(*summary_columns(fields)).where(LessonPlan.owner_id == current_user_id)
+    if cursor:
+        query = query.where(lesson_plans_after(cursor))
+
+    result = await db.execute(
+        query
+        .order_by(LessonPlan.created_at.desc(), LessonPlan.id.desc())
+        .offset(skip)
+        .limit(limit + 1)
+    )
+    page = paginate(result.all(), limit, response, lesson_plan_cursor)
+    return json_response(await lesson_plan_summaries(db, page), pagination_headers(response))
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_lesson_plans(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    subject: Optional[str] = None,
+    grade_level: Optional[GradeLevel] = None,
+    difficulty: Optional[DifficultyLevel] = None,
+    search: Optional[str] = None,
+    tag_ids: Optional[str] = Query(None, description="Comma-separated tag IDs"),
+    tag_match: TagMatch = Query(TagMatch.ANY, description="Match any or all of tag_ids"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Stream every lesson plan matching the list filters as NDJSON or CSV.
+
+    Rows are read through a server-side cursor in batches of
+    `EXPORT_BATCH_SIZE` (tags loaded per batch) and written out as they
+    arrive, so memory use does not grow with the size of the catalog.
+    """
+    query = filter_lesson_plans(
+        select(LessonPlan).options(undefer_group("content")),
+        db, subject, grade_level, difficulty, search, tag_ids, tag_match
+    ).order_by(LessonPlan.created_at.desc(), LessonPlan.id.desc())
+
+    async def body():
         try:
-            tag_id_list = [int(tid.strip()) for tid in tag_ids.split(",")]
-            query = query.join(LessonPlan.tags).filter(Tag.id.in_(tag_id_list))
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid tag_ids format"
+            yield export_header(export_format)
+            result = await db.stream(
+                query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
             )
+            async for partition in result.scalars().partitions():
+                yield export_chunk(export_format, partition)
+        finally:
+            await db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="lesson_plans.{export_format.value}"'
+        }
+    )
 
-    # Order by most recent
-    query = query.order_by(LessonPlan.created_at.desc())
 
-    lesson_plans = query.offset(skip).limit(limit).all()
-    return lesson_plans
+@router.get("/facets", response_model=LessonPlanFacets)
+async def get_lesson_plan_facets(
+    subject: Optional[str] = None,
+    grade_level: Optional[GradeLevel] = None,
+    difficulty: Optional[DifficultyLevel] = None,
+    search: Optional[str] = None,
+    tag_ids: Optional[str] = Query(None, description="Comma-separated tag IDs"),
+    tag_match: TagMatch = Query(TagMatch.ANY, description="Match any or all of tag_ids"),
+    facet_limit: int = Query(50, ge=1, le=500, description="Maximum subjects and tags returned"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Count the lesson plans matching the list filters per grade level,
+    difficulty, subject and tag.
+
+    All facets are computed in a single statement: one grouped query per
+    facet over the filtered set, combined with UNION ALL. Subjects and tags
+    are ordered by count and capped at `facet_limit`.
+    """
+    cache_key = await response_cache.key(
+        "lesson_plan_facets",
+        [LESSON_PLANS, LESSON_PLAN_LISTS],
+        subject=subject,
+        grade_level=grade_level,
+        difficulty=difficulty,
+        search=search,
+        tag_ids=tag_ids,
+        tag_match=tag_match,
+        facet_limit=facet_limit
+    )
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    filtered = filter_lesson_plans(
+        select(LessonPlan.id, LessonPlan.subject, LessonPlan.grade_level, LessonPlan.difficulty),
+        db, subject, grade_level, difficulty, search, tag_ids, tag_match
+    ).order_by(None).cte("filtered")
+
+    def facet(name: str, value, label=None) -> Select:
+        return select(
+            literal(name).label("facet"),
+            cast(value, String).label("value"),
+            cast(label, String).label("label"),
+            func.count().label("count")
+        )
+
+    counts = union_all(
+        facet("total", None).select_from(filtered),
+        facet("grade_level", filtered.c.grade_level).group_by(filtered.c.grade_level),
+        facet("difficulty", filtered.c.difficulty)
+        .where(filtered.c.difficulty.is_not(None))
+        .group_by(filtered.c.difficulty),
+        facet("subject", filtered.c.subject).group_by(filtered.c.subject),
+        facet("tags", Tag.id, Tag.name)
+        .select_from(filtered)
+        .join(lesson_plan_tags, lesson_plan_tags.c.lesson_plan_id == filtered.c.id)
+        .join(Tag, Tag.id == lesson_plan_tags.c.tag_id)
+        .group_by(Tag.id, Tag.name),
+    )
+    result = await db.execute(counts)
+
+    # Enum columns store member names; report their public values
+    enums = {"grade_level": GradeLevel, "difficulty": DifficultyLevel}
+    facets: Dict[str, list] = {"grade_level": [], "difficulty": [], "subject": [], "tags": []}
+    total = 0
+    for name, value, label, count in result.all():
+        if name == "total":
+            total = count
+        elif name == "tags":
+            facets["tags"].append({"id": int(value), "name": label, "count": count})
+        else:
+            value = enums[name][value].value if name in enums else value
+            facets[name].append({"value": value, "count": count})
+
+    for name, values in facets.items():
+        values.sort(key=lambda item: (-item["count"], str(item.get("value", item.get("name")))))
+    facets["subject"] = facets["subject"][:facet_limit]
+    facets["tags"] = facets["tags"][:facet_limit]
+
+    return await response_cache.store(
+        cache_key, lesson_plan_facets_adapter, {"total": total, **facets}
+    )
+
 
+@router.get("/{lesson_plan_id}", response_model=LessonPlanSchema)
+async def get_lesson_plan(
+    lesson_plan_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get a specific lesson plan by ID.
 
-@router.get("/my", response_model=List[LessonPlanSchema])
-def get_my_lesson_plans(
+    Responses carry an `ETag` derived from the lesson plan's version; send it
+    back in `If-None-Match` to get an empty 304 response while it is unchanged.
+    """
+    cache_key = await lesson_plan_cache_key(lesson_plan_id)
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        if etag_matches(if_none_match, cached.headers.get("ETag")):
+            return not_modified(cached.headers["ETag"])
+        return cached
+
+    # Revalidate from the version column alone, without loading content
+    if if_none_match:
+        result = await db.execute(
+            select(LessonPlan.version).where(LessonPlan.id == lesson_plan_id)
+        )
+        version = result.scalar_one_or_none()
+        if version is not None:
+            etag = lesson_plan_etag(lesson_plan_id, version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+    result = await db.execute(
+        select(LessonPlan)
+        .where(LessonPlan.id == lesson_plan_id)
+        .options(undefer_group("content"))
+    )
+    lesson_plan = result.scalars().first()
+    if not lesson_plan:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lesson plan not found"
+        )
+    return await response_cache.store(
+        cache_key,
+        lesson_plan_adapter,
+        lesson_plan,
+        {"ETag": lesson_plan_etag(lesson_plan.id, lesson_plan.version)}
+    )
+
+
+@router.get("/{lesson_plan_id}/revisions", response_model=List[LessonPlanRevisionInfo])
+async def get_lesson_plan_revisions(
+    lesson_plan_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get current user's lesson plans."""
-    lesson_plans = (
-        db.query(LessonPlan)
-        .filter(LessonPlan.owner_id == current_user.id)
-        .order_by(LessonPlan.created_at.desc())
+    """List the recorded revisions of a lesson plan, newest first."""
+    result = await db.execute(
+        select(LessonPlanRevision)
+        .where(LessonPlanRevision.lesson_plan_id == lesson_plan_id)
+        .order_by(LessonPlanRevision.version.desc())
         .offset(skip)
         .limit(limit)
-        .all()
     )
-    return lesson_plans
+    revisions = result.scalars().all()
+    if not revisions and skip == 0:
+        exists_result = await db.execute(
+            select(LessonPlan.id).where(LessonPlan.id == lesson_plan_id)
+        )
+        if exists_result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Lesson plan not found"
+            )
+    return revisions
 
 
-@router.get("/{lesson_plan_id}", response_model=LessonPlanSchema)
-def get_lesson_plan(lesson_plan_id: int, db: Session = Depends(get_db)):
-    """Get a specific lesson plan by ID."""
-    lesson_plan = db.query(LessonPlan).filter(LessonPlan.id == lesson_plan_id).first()
-    if not lesson_plan:
+@router.get(
+    "/{lesson_plan_id}/revisions/{version}",
+    response_model=LessonPlanRevisionContent
+)
+async def get_lesson_plan_revision(
+    lesson_plan_id: int,
+    version: int,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get the content of a lesson plan as of a recorded version.
+
+    The content is rebuilt from the nearest earlier snapshot and the deltas
+    recorded after it, in a single query.
+    """
+    chain = await revision_chain(db, lesson_plan_id, version)
+    if not chain or chain[-1].version != version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Lesson plan not found"
+            detail="Revision not found"
         )
-    return lesson_plan
+
+    revision = chain[-1]
+    return {
+        **replay(chain),
+        "version": revision.version,
+        "author_id": revision.author_id,
+        "created_at": revision.created_at,
+    }
 
 
 @router.put("/{lesson_plan_id}", response_model=LessonPlanSchema)
-def update_lesson_plan(
+async def update_lesson_plan(
     lesson_plan_id: int,
     lesson_plan_update: LessonPlanUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user_id: int = Depends(get_current_active_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Update a lesson plan (only owner can update)."""
-    lesson_plan = db.query(LessonPlan).filter(LessonPlan.id == lesson_plan_id).first()
+    """
+    Update a lesson plan (only owner can update).
+
+    The write only succeeds if the lesson plan still has the version that was
+    read (409 otherwise). Send the `ETag` from a previous read in `If-Match`
+    to also reject edits based on a stale copy (412).
+    """
+    result = await db.execute(
+        select(LessonPlan)
+        .where(LessonPlan.id == lesson_plan_id)
+        .options(undefer_group("content"))
+    )
+    lesson_plan = result.scalars().first()
 
     if not lesson_plan:
         raise HTTPException(
@@ -146,39 +710,61 @@ def update_lesson_plan(
             detail="Lesson plan not found"
         )
 
-    if lesson_plan.owner_id != current_user.id:
+    if lesson_plan.owner_id != current_user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this lesson plan"
         )
 
+    if not if_match_satisfied(if_match, lesson_plan_etag(lesson_plan.id, lesson_plan.version)):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Lesson plan has been modified since it was read"
+        )
+
     # Update fields
     update_data = lesson_plan_update.model_dump(exclude_unset=True, exclude={"tag_ids"})
     for field, value in update_data.items():
         setattr(lesson_plan, field, value)
 
     # Update tags if provided
+    tags_changed = False
     if lesson_plan_update.tag_ids is not None:
-        tags = db.query(Tag).filter(Tag.id.in_(lesson_plan_update.tag_ids)).all()
-        lesson_plan.tags = tags
-
-    # Increment version
+        previous_tag_ids = {tag.id for tag in lesson_plan.tags}
+        result = await db.execute(select(Tag).where(Tag.id.in_(lesson_plan_update.tag_ids)))
+        lesson_plan.tags = list(result.scalars().all())
+        tag_ids = {tag.id for tag in lesson_plan.tags}
+        tags_changed = await update_tag_usage(db, {
+            **{tag_id: 1 for tag_id in tag_ids - previous_tag_ids},
+            **{tag_id: -1 for tag_id in previous_tag_ids - tag_ids},
+        })
+
+    # Increment version (compare-and-swap against the version read above)
     lesson_plan.version += 1
+    await record_revision(db, lesson_plan, current_user_id)
+
+    await db.commit()
+    # Only reload what the database generated; content is already in memory
+    await db.refresh(lesson_plan, ["updated_at"])
+    await response_cache.invalidate(
+        lesson_plan_namespace(lesson_plan_id),
+        LESSON_PLAN_LISTS,
+        *([TAGS] if tags_changed else [])
+    )
 
-    db.commit()
-    db.refresh(lesson_plan)
-
+    response.headers["ETag"] = lesson_plan_etag(lesson_plan.id, lesson_plan.version)
     return lesson_plan
 
 
 @router.delete("/{lesson_plan_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_lesson_plan(
+async def delete_lesson_plan(
     lesson_plan_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user_id: int = Depends(get_current_active_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a lesson plan (only owner can delete)."""
-    lesson_plan = db.query(LessonPlan).filter(LessonPlan.id == lesson_plan_id).first()
+    result = await db.execute(select(LessonPlan).where(LessonPlan.id == lesson_plan_id))
+    lesson_plan = result.scalars().first()
 
     if not lesson_plan:
         raise HTTPException(
@@ -186,13 +772,22 @@ def delete_lesson_plan(
             detail="Lesson plan not found"
         )
 
-    if lesson_plan.owner_id != current_user.id:
+    if lesson_plan.owner_id != current_user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this lesson plan"
         )
 
-    db.delete(lesson_plan)
-    db.commit()
+    tags_changed = await update_tag_usage(db, {tag.id: -1 for tag in lesson_plan.tags})
+    await db.execute(
+        delete(LessonPlanRevision).where(LessonPlanRevision.lesson_plan_id == lesson_plan_id)
+    )
+    await db.delete(lesson_plan)
+    await db.commit()
+    await response_cache.invalidate(
+        lesson_plan_namespace(lesson_plan_id),
+        LESSON_PLAN_LISTS,
+        *([TAGS] if tags_changed else [])
+    )
 
     return None
@@ -1,27 +1,47 @@
 """Tag management endpoints."""
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_active_user
-from app.db.database import get_db
-from app.models.user import User
-from app.models.lesson_plan import Tag
-from app.schemas.lesson_plan import Tag as TagSchema, TagCreate
+from app.api.dependencies import get_current_active_user_id
+from app.api.pagination import (
+    paginate,
+    pagination_headers,
+    popular_tag_cursor,
+    popular_tags_after,
+    tag_cursor,
+    tags_after
+)
+from app.core.response_cache import LESSON_PLANS, TAGS, response_cache
+from app.db.database import get_db, get_read_db
+from app.db.revisions import record_tag_removal
+from app.models.lesson_plan import LessonPlan, Tag, lesson_plan_tags
+from app.schemas.lesson_plan import TagCreate, TagSort, TagWithUsage
 
 router = APIRouter()
 
+tag_adapter = TypeAdapter(TagWithUsage)
+tag_list_adapter = TypeAdapter(List[TagWithUsage])
 
-@router.post("/", response_model=TagSchema, status_code=status.HTTP_201_CREATED)
-def create_tag(
+
+async def tag_cache_key(tag_id: int) -> str:
+    """Response cache key of a single tag."""
+    return await response_cache.key("tag", [TAGS], id=tag_id)
+
+
+@router.post("/", response_model=TagWithUsage, status_code=status.HTTP_201_CREATED)
+async def create_tag(
     tag_in: TagCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user_id: int = Depends(get_current_active_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new tag."""
     # Check if tag already exists
-    existing_tag = db.query(Tag).filter(Tag.name == tag_in.name).first()
+    result = await db.execute(select(Tag).where(Tag.name == tag_in.name))
+    existing_tag = result.scalars().first()
     if existing_tag:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -30,50 +50,117 @@ def create_tag(
 
     db_tag = Tag(**tag_in.model_dump())
     db.add(db_tag)
-    db.commit()
-    db.refresh(db_tag)
+    await db.commit()
+    await db.refresh(db_tag)
+    await response_cache.invalidate(TAGS)
 
     return db_tag
 
 
-@router.get("/", response_model=List[TagSchema])
-def get_tags(
+@router.get("/", response_model=List[TagWithUsage])
+async def get_tags(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    sort: TagSort = Query(TagSort.NAME, description="Order by name or by usage"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get all tags, ordered by name or by number of lesson plans (most used first)."""
+    cache_key = await response_cache.key(
+        "tags", [TAGS], skip=skip, limit=limit, cursor=cursor, sort=sort
+    )
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    query = select(Tag)
+    if sort == TagSort.POPULAR:
+        if cursor:
+            query = query.where(popular_tags_after(cursor))
+        query = query.order_by(Tag.lesson_plan_count.desc(), Tag.id.desc())
+        cursor_for = popular_tag_cursor
+    else:
+        if cursor:
+            query = query.where(tags_after(cursor))
+        query = query.order_by(Tag.name, Tag.id)
+        cursor_for = tag_cursor
+
+    result = await db.execute(query.offset(skip).limit(limit + 1))
+    page = paginate(result.scalars().all(), limit, response, cursor_for)
+    return await response_cache.store(cache_key, tag_list_adapter, page, pagination_headers(response))
+
+
+@router.get("/popular", response_model=List[TagWithUsage])
+async def get_popular_tags(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all tags."""
-    tags = db.query(Tag).offset(skip).limit(limit).all()
-    return tags
+    """Get the most used tags (e.g. for a tag cloud), read from precomputed counts."""
+    cache_key = await response_cache.key("popular_tags", [TAGS], limit=limit)
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(
+        select(Tag)
+        .where(Tag.lesson_plan_count > 0)
+        .order_by(Tag.lesson_plan_count.desc(), Tag.id.desc())
+        .limit(limit)
+    )
+    return await response_cache.store(cache_key, tag_list_adapter, result.scalars().all())
 
 
-@router.get("/{tag_id}", response_model=TagSchema)
-def get_tag(tag_id: int, db: Session = Depends(get_db)):
+@router.get("/{tag_id}", response_model=TagWithUsage)
+async def get_tag(tag_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a specific tag by ID."""
-    tag = db.query(Tag).filter(Tag.id == tag_id).first()
+    cache_key = await tag_cache_key(tag_id)
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(select(Tag).where(Tag.id == tag_id))
+    tag = result.scalars().first()
     if not tag:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tag not found"
         )
-    return tag
+    return await response_cache.store(cache_key, tag_adapter, tag)
 
 
 @router.delete("/{tag_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_tag(
+async def delete_tag(
     tag_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user_id: int = Depends(get_current_active_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a tag."""
-    tag = db.query(Tag).filter(Tag.id == tag_id).first()
+    result = await db.execute(select(Tag).where(Tag.id == tag_id))
+    tag = result.scalars().first()
     if not tag:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tag not found"
         )
 
-    db.delete(tag)
-    db.commit()
+    # Removing the tag changes every lesson plan that embeds it: record the
+    # new revision and bump their versions to keep ETags and version checks honest
+    await record_tag_removal(db, tag_id, current_user_id)
+    await db.execute(
+        update(LessonPlan)
+        .where(LessonPlan.id.in_(
+            select(lesson_plan_tags.c.lesson_plan_id).where(lesson_plan_tags.c.tag_id == tag_id)
+        ))
+        .values(version=LessonPlan.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+    await db.delete(tag)
+    await db.commit()
+
+    # Lesson plans embed their tags, so every cached lesson plan is stale too
+    await response_cache.delete(await tag_cache_key(tag_id))
+    await response_cache.invalidate(TAGS, LESSON_PLANS)
 
     return None
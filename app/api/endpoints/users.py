@@ -2,11 +2,13 @@
 
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_active_user
-from app.core.security import get_password_hash
-from app.db.database import get_db
+from app.api.dependencies import get_current_active_user, invalidate_cached_user
+from app.core.hashing import password_hasher
+from app.db.database import get_db, get_read_db
+from app.db.tokens import revoke_user_tokens
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserUpdate
 
@@ -14,30 +16,37 @@ router = APIRouter()
 
 
 @router.get("/me", response_model=UserSchema)
-def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
     """Get current user information."""
     return current_user
 
 
 @router.put("/me", response_model=UserSchema)
-def update_current_user(
+async def update_current_user(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Update current user information."""
+    """
+    Update current user information.
+
+    Changing the password signs the user out everywhere: every refresh token
+    and the access tokens minted from them are revoked.
+    """
     update_data = user_update.model_dump(exclude_unset=True)
 
     # Check for username/email conflicts
     if "username" in update_data and update_data["username"] != current_user.username:
-        if db.query(User).filter(User.username == update_data["username"]).first():
+        result = await db.execute(select(User).where(User.username == update_data["username"]))
+        if result.scalars().first():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already taken"
             )
 
     if "email" in update_data and update_data["email"] != current_user.email:
-        if db.query(User).filter(User.email == update_data["email"]).first():
+        result = await db.execute(select(User).where(User.email == update_data["email"]))
+        if result.scalars().first():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
@@ -45,22 +54,26 @@ def update_current_user(
 
     # Hash password if provided
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await password_hasher.hash(update_data.pop("password"))
+        await revoke_user_tokens(db, current_user.id)
 
     # Update user
+    previous_username = current_user.username
     for field, value in update_data.items():
         setattr(current_user, field, value)
 
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    invalidate_cached_user(previous_username)
+    await db.refresh(current_user)
 
     return current_user
 
 
 @router.get("/{user_id}", response_model=UserSchema)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get user by ID."""
-    user = db.query(User).filter(User.id == user_id).first()
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,82 @@
+"""Serialization of lesson plans for catalog exports."""
+
+import csv
+import io
+from enum import Enum
+from typing import Any, Iterable, List
+
+from pydantic import TypeAdapter
+
+from app.models.lesson_plan import LessonPlan
+from app.schemas.lesson_plan import LessonPlan as LessonPlanSchema
+
+_adapter = TypeAdapter(LessonPlanSchema)
+
+# CSV columns; tags are exported as a semicolon-separated list of names
+CSV_COLUMNS = [
+    "id",
+    "title",
+    "subject",
+    "grade_level",
+    "duration_minutes",
+    "difficulty",
+    "objectives",
+    "materials",
+    "procedure",
+    "assessment",
+    "notes",
+    "version",
+    "owner_id",
+    "tags",
+    "created_at",
+    "updated_at",
+]
+
+
+class ExportFormat(str, Enum):
+    """Catalog export formats."""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def _csv_value(lesson_plan: LessonPlan, column: str) -> Any:
+    if column == "tags":
+        return ";".join(tag.name for tag in lesson_plan.tags)
+    value = getattr(lesson_plan, column)
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def _csv_lines(rows: List[List[Any]]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def export_header(export_format: ExportFormat) -> bytes:
+    """Bytes written before the first lesson plan."""
+    if export_format == ExportFormat.CSV:
+        return _csv_lines([CSV_COLUMNS])
+    return b""
+
+
+def export_chunk(export_format: ExportFormat, lesson_plans: Iterable[LessonPlan]) -> bytes:
+    """Serialize a batch of lesson plans (with tags loaded) in the given format."""
+    if export_format == ExportFormat.CSV:
+        return _csv_lines([
+            [_csv_value(lesson_plan, column) for column in CSV_COLUMNS]
+            for lesson_plan in lesson_plans
+        ])
+    return b"".join(
+        _adapter.dump_json(_adapter.validate_python(lesson_plan, from_attributes=True)) + b"\n"
+        for lesson_plan in lesson_plans
+    )
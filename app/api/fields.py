@@ -0,0 +1,80 @@
+"""Sparse fieldsets and row-based serialization for lesson plan list views."""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.lesson_plan import LessonPlan, Tag, lesson_plan_tags
+
+# Deferred text columns, only loaded for detail views or on request
+CONTENT_FIELDS = ("objectives", "materials", "procedure", "assessment", "notes")
+
+# Fields list views leave out unless requested through ``fields=``
+OPTIONAL_FIELDS = CONTENT_FIELDS + ("snippet",)
+
+SUMMARY_FIELDS = (
+    "id",
+    "title",
+    "subject",
+    "grade_level",
+    "duration_minutes",
+    "difficulty",
+    "version",
+    "owner_id",
+    "created_at",
+    "updated_at",
+)
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Parse a comma-separated ``fields`` parameter into a sorted tuple."""
+    if not fields:
+        return ()
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(OPTIONAL_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}; "
+                   f"available: {', '.join(OPTIONAL_FIELDS)}"
+        )
+    return tuple(sorted(requested))
+
+
+def summary_columns(fields: Tuple[str, ...] = ()) -> List[Any]:
+    """Columns selected for lesson plan summaries plus the requested fields."""
+    return [getattr(LessonPlan, field).label(field) for field in SUMMARY_FIELDS + fields]
+
+
+async def lesson_plan_summaries(db: AsyncSession, rows: Sequence[Row]) -> List[Dict[str, Any]]:
+    """
+    Build summary dicts from rows selected with ``summary_columns``.
+
+    Tags of the whole page are fetched with one query. The result is plain
+    JSON-ready data, so it can be serialized without model validation.
+    """
+    summaries = [{**row._mapping, "tags": []} for row in rows]
+    if not summaries:
+        return summaries
+
+    by_id = {summary["id"]: summary for summary in summaries}
+    result = await db.execute(
+        select(
+            lesson_plan_tags.c.lesson_plan_id,
+            Tag.id,
+            Tag.name,
+            Tag.description,
+            Tag.created_at
+        )
+        .join(Tag, Tag.id == lesson_plan_tags.c.tag_id)
+        .where(lesson_plan_tags.c.lesson_plan_id.in_(list(by_id)))
+        .order_by(lesson_plan_tags.c.lesson_plan_id, Tag.id)
+    )
+    for lesson_plan_id, tag_id, name, description, created_at in result.all():
+        by_id[lesson_plan_id]["tags"].append(
+            {"id": tag_id, "name": name, "description": description, "created_at": created_at}
+        )
+    return summaries
@@ -0,0 +1,104 @@
+"""Keyset (cursor) pagination helpers for list endpoints."""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import func, select, tuple_
+
+from app.models.lesson_plan import LessonPlan, Tag
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode keyset values into an opaque, URL-safe cursor."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> Tuple[Any, ...]:
+    """Decode a cursor produced by ``encode_cursor``, converting each value."""
+    invalid_cursor = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise invalid_cursor
+        return tuple(convert(value) for convert, value in zip(types, values))
+    except (binascii.Error, TypeError, ValueError):
+        raise invalid_cursor
+
+
+def lesson_plans_after(cursor: str):
+    """Filter clause for lesson plans after the cursor in newest-first order."""
+    created_at, lesson_plan_id = decode_cursor(cursor, datetime.fromisoformat, int)
+    # Compare against the stored timestamp so the keyset is exact however the
+    # database serializes datetimes; fall back to the cursor's copy if the
+    # anchor row has been deleted since.
+    anchor = (
+        select(LessonPlan.created_at)
+        .where(LessonPlan.id == lesson_plan_id)
+        .scalar_subquery()
+    )
+    return tuple_(LessonPlan.created_at, LessonPlan.id) < tuple_(
+        func.coalesce(anchor, created_at), lesson_plan_id
+    )
+
+
+def tags_after(cursor: str):
+    """Filter clause for tags after the cursor in name order."""
+    name, tag_id = decode_cursor(cursor, str, int)
+    return tuple_(Tag.name, Tag.id) > tuple_(name, tag_id)
+
+
+def popular_tags_after(cursor: str):
+    """Filter clause for tags after the cursor in most-used-first order."""
+    lesson_plan_count, tag_id = decode_cursor(cursor, int, int)
+    return tuple_(Tag.lesson_plan_count, Tag.id) < tuple_(lesson_plan_count, tag_id)
+
+
+def lesson_plan_cursor(lesson_plan: LessonPlan) -> str:
+    """Cursor pointing just past the given lesson plan (or summary row)."""
+    return encode_cursor(lesson_plan.created_at, lesson_plan.id)
+
+
+def tag_cursor(tag: Tag) -> str:
+    """Cursor pointing just past the given tag."""
+    return encode_cursor(tag.name, tag.id)
+
+
+def popular_tag_cursor(tag: Tag) -> str:
+    """Cursor pointing just past the given tag in most-used-first order."""
+    return encode_cursor(tag.lesson_plan_count, tag.id)
+
+
+def pagination_headers(response: Response) -> Dict[str, str]:
+    """Pagination headers set on ``response`` by ``paginate``."""
+    if NEXT_CURSOR_HEADER in response.headers:
+        return {NEXT_CURSOR_HEADER: response.headers[NEXT_CURSOR_HEADER]}
+    return {}
+
+
+def paginate(
+    items: Sequence[Any],
+    limit: int,
+    response: Response,
+    cursor_for: Callable[[Any], str]
+) -> List[Any]:
+    """
+    Trim a page fetched with ``limit + 1`` rows and expose the next cursor.
+
+    The cursor is sent in the ``X-Next-Cursor`` header only when more rows exist.
+    """
+    page = list(items[:limit])
+    if len(items) > limit:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_for(page[-1])
+    return page
@@ -0,0 +1,396 @@
+"""Token-bucket rate limiting and concurrency admission control.
+
+Requests are sorted into route classes (auth, session, search, write,
+read), each with its own budget per client. Clients are identified by the
+user in their bearer token, or else by their address (taken from
+``X-Forwarded-For`` when the peer is a trusted proxy). Logins are charged
+per address and submitted username, so users behind one NAT do not share a
+budget, and to a larger budget per address, so one address cannot try every
+username. Token refreshes and logouts are charged to the login (refresh
+token family) they belong to. Independently of clients, at most
+``MAX_CONCURRENT_REQUESTS`` requests run at once; others wait briefly for a
+slot and are shed with 503 if none frees up. Both checks run before routing,
+so rejected requests never reach a database session.
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from ipaddress import ip_address, ip_network
+from typing import Callable, Deque, Dict, Optional, Sequence, Tuple
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.api.dependencies import decode_token
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.tokens import refresh_token_family
+from app.db.database import SAFE_METHODS
+
+# Route classes
+AUTH = "auth"
+SESSION = "session"
+SEARCH = "search"
+WRITE = "write"
+READ = "read"
+
+# Budget of all auth requests from one address, whatever the username
+AUTH_ADDRESS = "auth-address"
+
+# Largest auth request body read to find the submitted username or token
+MAX_AUTH_BODY_SIZE = 16384
+
+SESSION_PATHS = ("/auth/refresh", "/auth/logout")
+
+TRUSTED_PROXIES = [ip_network(proxy, strict=False) for proxy in settings.TRUSTED_PROXIES]
+
+
+class InMemoryBucketStore:
+    """Per-process token buckets; each worker enforces its own budget."""
+
+    def __init__(self, max_keys: int):
+        # Idle buckets refill completely and can be forgotten
+        self._buckets = TTLCache(max_size=max_keys, ttl=math.inf)
+
+    async def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens; return 0 if granted, else seconds until they are."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / rate
+        self._buckets.set(key, (tokens, now), ttl=(capacity - tokens) / rate)
+        return retry_after
+
+
+# Refill, take and store a bucket atomically, timed by the server's clock
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(retry_after)
+"""
+
+
+class RedisBucketStore:
+    """
+    Token buckets shared by every worker, for any ``redis.asyncio``-style client.
+
+    Only ``eval`` is used, so a local fake can stand in for a real server.
+    """
+
+    def __init__(self, client, prefix: str = "rate-limit:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens; return 0 if granted, else seconds until they are."""
+        retry_after = await self.client.eval(
+            _TAKE_SCRIPT, 1, self.prefix + key, rate, capacity, cost
+        )
+        return float(retry_after)
+
+
+def create_store():
+    """Build the bucket store selected by ``RATE_LIMIT_BACKEND``."""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        import redis.asyncio as redis  # optional dependency
+
+        return RedisBucketStore(redis.from_url(settings.RATE_LIMIT_URL))
+    return InMemoryBucketStore(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+def route_class(scope: Scope) -> str:
+    """Budget a request is charged to."""
+    if scope["path"].startswith(f"{settings.API_V1_STR}/auth/"):
+        if scope["path"].rstrip("/")[len(settings.API_V1_STR):] in SESSION_PATHS:
+            return SESSION
+        return AUTH
+    if scope["method"] not in SAFE_METHODS:
+        return WRITE
+    if parse_qs(scope.get("query_string", b"").decode("latin-1")).get("search"):
+        return SEARCH
+    return READ
+
+
+def _is_trusted(address: str, trusted_proxies: Sequence) -> bool:
+    try:
+        address = ip_address(address)
+    except ValueError:
+        return False
+    return any(address in network for network in trusted_proxies)
+
+
+def client_address(scope: Scope, trusted_proxies: Sequence = TRUSTED_PROXIES) -> str:
+    """
+    Address of the client, looking through trusted proxies.
+
+    ``X-Forwarded-For`` is only honoured when the peer is a trusted proxy, and
+    is read from the right: the first hop that is not a trusted proxy is the
+    client, since anything further left may have been forged by it.
+    """
+    client = scope.get("client")
+    address = client[0] if client else ""
+    if not trusted_proxies or not _is_trusted(address, trusted_proxies):
+        return address
+
+    hops = [
+        hop.strip()
+        for header in Headers(scope=scope).getlist("x-forwarded-for")
+        for hop in header.split(",")
+    ]
+    for hop in reversed(hops):
+        if not hop:
+            continue
+        address = hop
+        if not _is_trusted(hop, trusted_proxies):
+            break
+    return address
+
+
+async def read_auth_subject(scope: Scope, receive: Receive) -> Tuple[Receive, Optional[str]]:
+    """
+    The subject an auth or session request is charged to, if any, and a
+    ``receive`` that replays the body read to find it.
+
+    The subject is the username submitted to an auth endpoint (form or JSON
+    body), or the family of the refresh token sent to a session endpoint.
+    """
+    field = "refresh_token" if route_class(scope) == SESSION else "username"
+    messages = []
+    body = b""
+    more_body = True
+    while more_body and len(body) <= MAX_AUTH_BODY_SIZE:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+    async def replay():
+        if messages:
+            return messages.pop(0)
+        return await receive()
+
+    value = None
+    if not more_body and body:
+        content_type = Headers(scope=scope).get("content-type", "")
+        try:
+            if content_type.startswith("application/json"):
+                data = json.loads(body)
+                value = data.get(field) if isinstance(data, dict) else None
+            else:
+                value = parse_qs(body.decode("utf-8", "replace")).get(field, [None])[0]
+        except ValueError:
+            pass
+    if not isinstance(value, str) or not value:
+        return replay, None
+    if field == "refresh_token":
+        family_id = refresh_token_family(value)
+        return replay, family_id and f"family:{family_id}"
+    return replay, f"username:{value[:150]}"
+
+
+def client_identity(scope: Scope) -> str:
+    """The user in a valid bearer token, or else the client's address."""
+    scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = decode_token(token)
+        except HTTPException:
+            pass
+        else:
+            user = payload.get("uid", payload.get("sub"))
+            if user is not None:
+                return f"user:{user}"
+    return f"ip:{client_address(scope)}"
+
+
+class RateLimiter:
+    """Charge each request to a per-client token bucket of its route class."""
+
+    def __init__(
+        self,
+        store,
+        per_minute: Dict[str, int],
+        identify: Callable[[Scope], str] = client_identity
+    ):
+        self.store = store
+        self.per_minute = per_minute
+        self.identify = identify
+
+    async def check(self, scope: Scope, subject: Optional[str] = None) -> float:
+        """
+        Return 0 if the request may proceed, else seconds until it may.
+
+        An auth request naming a ``subject`` (the submitted username) is
+        charged to the client's bucket for that subject and to the client's
+        overall auth bucket. A session request naming a ``subject`` (a
+        refresh token family) is charged to that subject alone.
+        """
+        budget = route_class(scope)
+        per_minute = self.per_minute.get(budget)
+        if not per_minute:
+            return 0.0
+        if budget == SESSION and subject is not None:
+            buckets = [(f"{budget}:{subject}", per_minute)]
+        elif budget == AUTH and subject is not None:
+            identity = self.identify(scope)
+            buckets = [(f"{budget}:{identity}:{subject}", per_minute)]
+            if self.per_minute.get(AUTH_ADDRESS):
+                buckets.append((f"{AUTH_ADDRESS}:{identity}", self.per_minute[AUTH_ADDRESS]))
+        else:
+            buckets = [(f"{budget}:{self.identify(scope)}", per_minute)]
+        try:
+            for key, limit in buckets:
+                retry_after = await self.store.take(key, limit / 60, limit)
+                if retry_after > 0:
+                    return retry_after
+        except Exception:
+            # An unreachable shared store must not take the API down with it
+            pass
+        return 0.0
+
+
+class AdmissionController:
+    """
+    Bound the number of requests running at once.
+
+    Requests over the limit wait up to ``timeout`` seconds, first come first
+    served, for a running request to finish.
+    """
+
+    def __init__(self, limit: int, timeout: float):
+        self.limit = limit
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> bool:
+        """Take a slot; return False if none became free in time."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        if self.timeout <= 0:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            self._waiters.remove(waiter)
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the client went away
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        return True
+
+    def release(self) -> None:
+        """Hand the slot to the oldest waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class RateLimitMiddleware:
+    """
+    Reject requests over their rate limit (429) or beyond the concurrency
+    limit (503), both with ``Retry-After``. Paths in ``exempt_paths`` (health
+    checks, metrics) are never limited.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: Optional[RateLimiter] = None,
+        admission: Optional[AdmissionController] = None,
+        exempt_paths: Sequence[str] = ()
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.admission = admission
+        self.exempt_paths = tuple(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if self.limiter is not None:
+            subject = None
+            if route_class(scope) in (AUTH, SESSION):
+                receive, subject = await read_auth_subject(scope, receive)
+            retry_after = await self.limiter.check(scope, subject)
+            if retry_after > 0:
+                response = JSONResponse(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    content={"detail": "Too many requests, please retry later"},
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+                await response(scope, receive, send)
+                return
+
+        if self.admission is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.admission.acquire():
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Server is busy, please retry shortly"},
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.admission.release()
+
+
+rate_limiter = RateLimiter(create_store(), {
+    AUTH: settings.RATE_LIMIT_AUTH_PER_MINUTE,
+    AUTH_ADDRESS: settings.RATE_LIMIT_AUTH_PER_ADDRESS_PER_MINUTE,
+    SESSION: settings.RATE_LIMIT_SESSION_PER_MINUTE,
+    SEARCH: settings.RATE_LIMIT_SEARCH_PER_MINUTE,
+    WRITE: settings.RATE_LIMIT_WRITE_PER_MINUTE,
+    READ: settings.RATE_LIMIT_READ_PER_MINUTE,
+})
+
+admission = AdmissionController(
+    limit=settings.MAX_CONCURRENT_REQUESTS,
+    timeout=settings.ADMISSION_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,171 @@
+"""Incremental parsing of JSON records from streamed request bodies."""
+
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+# Longest record (in characters) buffered before it is rejected unparsed
+MAX_RECORD_SIZE = 1_000_000
+
+# Characters that matter when looking for the end of an array element,
+# outside and inside strings
+_STRUCTURAL = re.compile(r'["\[\]{},]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class RecordError(ValueError):
+    """A record in the stream is not valid JSON."""
+
+
+class _ElementScanner:
+    """
+    Find where a top-level JSON array element ends, resuming across chunks.
+
+    Only strings and bracket depth are tracked, so each character is looked
+    at once, and a malformed element still ends at the next top-level ``,``
+    or ``]``.
+    """
+
+    def __init__(self):
+        self.reset(0)
+
+    def reset(self, position: int) -> None:
+        self.position = position
+        self.depth = 0
+        self.in_string = False
+
+    def find_end(self, text: str) -> int:
+        """Index of the ``,`` or ``]`` ending the current element, or -1 for now."""
+        position = self.position
+        while True:
+            pattern = _STRING_SPECIAL if self.in_string else _STRUCTURAL
+            match = pattern.search(text, position)
+            if match is None:
+                self.position = len(text)
+                return -1
+            char = match.group()
+            position = match.end()
+            if self.in_string:
+                if char == '"':
+                    self.in_string = False
+                elif position < len(text):
+                    # Skip the escaped character
+                    position += 1
+                else:
+                    # The escaped character has not arrived yet
+                    self.position = match.start()
+                    return -1
+            elif char == '"':
+                self.in_string = True
+            elif char in "[{":
+                self.depth += 1
+            elif char in "]}" and self.depth:
+                self.depth -= 1
+            elif char in ",]" and not self.depth:
+                self.position = match.start()
+                return match.start()
+
+
+async def iter_json_records(
+    chunks: AsyncIterator[bytes],
+    max_record_size: int = MAX_RECORD_SIZE
+) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield ``(index, record)`` pairs from an NDJSON stream or a JSON array.
+
+    The format is detected from the first non-whitespace character. Records
+    are decoded as soon as they are complete, so only the record currently
+    being received is buffered. A record that is not valid JSON, or longer
+    than ``max_record_size`` characters, is yielded as a ``RecordError`` and
+    parsing continues with the next line or array element; a truncated JSON
+    array ends the stream with a ``RecordError``.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    scanner = _ElementScanner()
+    buffer = ""
+    is_array = None
+    index = 0
+    array_done = False
+    # Discarding the rest of an oversized record
+    skipping = False
+
+    async def feed():
+        async for chunk in chunks:
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+
+    async for text in feed():
+        if array_done:
+            break
+        buffer += text
+
+        if is_array is None:
+            stripped = buffer.lstrip(_WHITESPACE)
+            if not stripped:
+                continue
+            is_array = stripped.startswith("[")
+            buffer = stripped[1:] if is_array else stripped
+
+        if not is_array:
+            *lines, buffer = buffer.split("\n")
+            if skipping and lines:
+                # The tail of the oversized record
+                lines = lines[1:]
+                skipping = False
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    yield index, json.loads(line)
+                except ValueError as exc:
+                    yield index, RecordError(f"Invalid JSON: {exc}")
+                index += 1
+            if len(buffer) > max_record_size:
+                if not skipping:
+                    yield index, RecordError(f"Record exceeds {max_record_size} characters")
+                    index += 1
+                    skipping = True
+                buffer = ""
+            continue
+
+        start = 0
+        while True:
+            end = scanner.find_end(buffer)
+            if end < 0:
+                break
+            element, terminator = buffer[start:end], buffer[end]
+            start = end + 1
+            scanner.reset(start)
+            if skipping:
+                skipping = False
+            elif element.strip(_WHITESPACE):
+                try:
+                    yield index, json.loads(element)
+                except ValueError as exc:
+                    yield index, RecordError(f"Invalid JSON: {exc}")
+                index += 1
+            if terminator == "]":
+                array_done = True
+                break
+
+        buffer = buffer[start:]
+        scanner.position -= start
+        if not array_done and len(buffer) > max_record_size:
+            if not skipping:
+                yield index, RecordError(f"Record exceeds {max_record_size} characters")
+                index += 1
+                skipping = True
+            # Keep the scanner's string and depth state to find the record's end
+            buffer = buffer[scanner.position:]
+            scanner.position = 0
+
+    if is_array is False and buffer.strip() and not skipping:
+        try:
+            yield index, json.loads(buffer)
+        except ValueError as exc:
+            yield index, RecordError(f"Invalid JSON: {exc}")
+    elif is_array and not array_done:
+        yield index, RecordError("Invalid JSON: unterminated array")
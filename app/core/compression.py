@@ -0,0 +1,186 @@
+"""Response compression middleware (gzip, and brotli when installed)."""
+
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # optional dependency
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+
+class GzipEncoder:
+    """Streaming gzip encoder."""
+
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    """Streaming brotli encoder."""
+
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    ETag of the ``encoding``-compressed representation.
+
+    A strong ETag must differ between content codings of the same resource,
+    so the coding is appended to the opaque tag; weak ETags are kept.
+    """
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def decoded_etag(etag: str) -> str:
+    """The ETag ``encoded_etag`` was given, for any supported encoding."""
+    for encoding in ("gzip", "br"):
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+def available_encodings(encodings: List[str]) -> List[str]:
+    """The configured encodings this process can produce, in preference order."""
+    return [
+        encoding for encoding in encodings
+        if encoding == "gzip" or (encoding == "br" and brotli is not None)
+    ]
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Content codings an ``Accept-Encoding`` header accepts (``q=0`` excluded)."""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies of at least ``minimum_size`` bytes.
+
+    The first encoding in ``encodings`` that the client accepts is used.
+    Streaming responses are compressed chunk by chunk. Responses that are
+    already encoded or below the threshold pass through untouched. Strong
+    ETags of compressed responses get the encoding appended, as do those of
+    304 responses to clients revalidating a compressed copy.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: List[str],
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.encodings = available_encodings(encodings)
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def select_encoding(self, scope: Scope) -> Optional[str]:
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        for encoding in self.encodings:
+            if encoding in accepted:
+                return encoding
+        return None
+
+    def encoder(self, encoding: str):
+        if encoding == "br":
+            return BrotliEncoder(self.brotli_quality)
+        return GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = self.select_encoding(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, encoder, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                etag = headers.get("etag")
+                if "content-encoding" in headers or (
+                    not more_body and len(body) < self.minimum_size
+                ):
+                    passthrough = True
+                    if start_message["status"] == 304 and etag:
+                        compressed_etag = encoded_etag(etag, encoding)
+                        if compressed_etag in Headers(scope=scope).get("if-none-match", ""):
+                            headers["ETag"] = compressed_etag
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                encoder = self.encoder(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if etag:
+                    headers["ETag"] = encoded_etag(etag, encoding)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    body = encoder.compress(body) + encoder.flush()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start_message)
+
+            chunk = encoder.compress(body)
+            if not more_body:
+                chunk += encoder.flush()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,367 @@
+"""
+Access token signing keys: a key ring with scheduled rotation.
+
+Tokens are compact JWS (RFC 7515) signed with HS256, RS256, ES256 or EdDSA
+(Ed25519), and name their signing key in the ``kid`` header. Without
+``JWT_KEYS_FILE`` the ring holds a single HMAC key derived from
+``SECRET_KEY``. With it, keys come from a JSON manifest::
+
+    {"keys": [
+        {"kid": "2026-10", "alg": "EdDSA", "private_key_file": "2026-10.pem",
+         "active_from": "2026-10-01T00:00:00Z"},
+        {"kid": "2026-11", "alg": "EdDSA", "private_key_file": "2026-11.pem",
+         "active_from": "2026-11-01T00:00:00Z"},
+        {"kid": "partner", "alg": "RS256", "public_key_file": "partner.pub.pem"}
+    ]}
+
+The key with a private part and the latest ``active_from`` in the past signs.
+Keys whose ``active_from`` is still ahead are already published, so
+gateways caching the JWKS know them before the first token signed with them
+arrives. A superseded key keeps verifying for one token lifetime after its
+successor took over, then drops out; ``retire_at`` drops a key earlier.
+
+Key files are parsed once per load into ``cryptography`` key objects, and
+the set of usable keys and the JWKS document are only recomputed when the
+schedule changes, so verifying a token is a dict lookup and a signature check.
+The manifest is re-read when it changes on disk, so rotating keys needs no
+restart.
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import math
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set
+
+import orjson
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
+from cryptography.hazmat.primitives.asymmetric.utils import (
+    decode_dss_signature,
+    encode_dss_signature,
+)
+
+from app.core.config import settings
+
+HMAC_ALGORITHMS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+ASYMMETRIC_ALGORITHMS = {"RS256", "ES256", "EdDSA"}
+
+# Kid of the key derived from SECRET_KEY
+DEFAULT_KID = "default"
+
+# Bytes per coordinate of P-256 points and ES256 signature halves
+_P256_SIZE = 32
+
+
+def b64encode(data: bytes) -> str:
+    """Unpadded base64url, as used throughout JOSE."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def b64decode(data: str) -> bytes:
+    """Decode unpadded base64url, rejecting any other character."""
+    return base64.b64decode(data + "=" * (-len(data) % 4), altchars=b"-_", validate=True)
+
+
+def _int_bytes(value: int, length: Optional[int] = None) -> bytes:
+    return value.to_bytes(length or max(1, (value.bit_length() + 7) // 8), "big")
+
+
+def _timestamp(value) -> Optional[float]:
+    """Epoch seconds of an ISO 8601 string or number from the manifest."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+class SigningKey:
+    """
+    One key of the ring: a secret, a private key (which signs) or a public
+    key only (which verifies tokens signed elsewhere).
+    """
+
+    def __init__(
+        self,
+        kid: str,
+        algorithm: str,
+        key,
+        active_from: Optional[float] = None,
+        retire_at: Optional[float] = None
+    ):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.active_from = active_from or 0.0
+        self.retire_at = retire_at if retire_at is not None else math.inf
+        self._secret: Optional[bytes] = None
+        self._private_key = None
+
+        if algorithm in HMAC_ALGORITHMS:
+            if not isinstance(key, bytes):
+                raise ValueError(f"Key {kid!r}: {algorithm} needs a secret")
+            self._secret = key
+            self._public_key = None
+            return
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ValueError(f"Key {kid!r}: unsupported algorithm {algorithm!r}")
+
+        if isinstance(key, (rsa.RSAPrivateKey, ec.EllipticCurvePrivateKey, ed25519.Ed25519PrivateKey)):
+            self._private_key = key
+            key = key.public_key()
+        expected = {
+            "RS256": rsa.RSAPublicKey,
+            "ES256": ec.EllipticCurvePublicKey,
+            "EdDSA": ed25519.Ed25519PublicKey,
+        }[algorithm]
+        if not isinstance(key, expected) or (
+            algorithm == "ES256" and not isinstance(key.curve, ec.SECP256R1)
+        ):
+            raise ValueError(f"Key {kid!r} does not match algorithm {algorithm}")
+        self._public_key = key
+
+    @property
+    def can_sign(self) -> bool:
+        return self._secret is not None or self._private_key is not None
+
+    def sign(self, message: bytes) -> bytes:
+        if self._secret is not None:
+            return hmac.new(self._secret, message, HMAC_ALGORITHMS[self.algorithm]).digest()
+        if self.algorithm == "RS256":
+            return self._private_key.sign(message, padding.PKCS1v15(), hashes.SHA256())
+        if self.algorithm == "ES256":
+            r, s = decode_dss_signature(self._private_key.sign(message, ec.ECDSA(hashes.SHA256())))
+            return _int_bytes(r, _P256_SIZE) + _int_bytes(s, _P256_SIZE)
+        return self._private_key.sign(message)
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        if self._secret is not None:
+            return hmac.compare_digest(self.sign(message), signature)
+        try:
+            if self.algorithm == "RS256":
+                self._public_key.verify(signature, message, padding.PKCS1v15(), hashes.SHA256())
+            elif self.algorithm == "ES256":
+                if len(signature) != 2 * _P256_SIZE:
+                    return False
+                der = encode_dss_signature(
+                    int.from_bytes(signature[:_P256_SIZE], "big"),
+                    int.from_bytes(signature[_P256_SIZE:], "big"),
+                )
+                self._public_key.verify(der, message, ec.ECDSA(hashes.SHA256()))
+            else:
+                self._public_key.verify(signature, message)
+        except InvalidSignature:
+            return False
+        return True
+
+    def jwk(self) -> Optional[dict]:
+        """Public JWK (RFC 7517) of the key; None for secrets, which are never published."""
+        if self._public_key is None:
+            return None
+        jwk = {"kid": self.kid, "alg": self.algorithm, "use": "sig"}
+        if self.algorithm == "RS256":
+            numbers = self._public_key.public_numbers()
+            jwk.update(kty="RSA", n=b64encode(_int_bytes(numbers.n)), e=b64encode(_int_bytes(numbers.e)))
+        elif self.algorithm == "ES256":
+            numbers = self._public_key.public_numbers()
+            jwk.update(
+                kty="EC",
+                crv="P-256",
+                x=b64encode(_int_bytes(numbers.x, _P256_SIZE)),
+                y=b64encode(_int_bytes(numbers.y, _P256_SIZE)),
+            )
+        else:
+            raw = self._public_key.public_bytes(
+                serialization.Encoding.Raw, serialization.PublicFormat.Raw
+            )
+            jwk.update(kty="OKP", crv="Ed25519", x=b64encode(raw))
+        return jwk
+
+
+class _Schedule(NamedTuple):
+    """Keys in use between two changes of the rotation schedule."""
+    valid_until: float
+    signer: Optional[SigningKey]
+    verifiers: Dict[str, SigningKey]
+    jwks: bytes
+
+
+class KeyRing:
+    """
+    Signs tokens with the active key and verifies them with any current key.
+
+    ``token_lifetime`` (seconds) is how long a superseded key keeps verifying.
+    With ``path`` the keys are (re)loaded from a manifest, checked for changes
+    at most every ``reload_seconds``.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[SigningKey] = (),
+        token_lifetime: float = 0.0,
+        path: Optional[str] = None,
+        reload_seconds: float = 60.0
+    ):
+        self.token_lifetime = token_lifetime
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._keys: List[SigningKey] = []
+        self._schedule: Optional[_Schedule] = None
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        if path is not None:
+            self._reload()
+        else:
+            self.set_keys(keys)
+
+    def set_keys(self, keys: Sequence[SigningKey]) -> None:
+        kids = [key.kid for key in keys]
+        if len(set(kids)) != len(kids):
+            raise ValueError("Key ids must be unique")
+        self._keys = list(keys)
+        self._schedule = None
+
+    def _reload(self) -> None:
+        self._next_check = time.monotonic() + self.reload_seconds
+        mtime = os.stat(self.path).st_mtime
+        if mtime != self._mtime:
+            self.set_keys(load_manifest(self.path))
+            self._mtime = mtime
+
+    def _current(self, now: float) -> _Schedule:
+        if self.path is not None and time.monotonic() >= self._next_check:
+            try:
+                self._reload()
+            except (OSError, ValueError, KeyError):
+                # A manifest being rewritten; keep the loaded keys until it parses
+                pass
+        schedule = self._schedule
+        if schedule is None or now >= schedule.valid_until:
+            schedule = self._schedule = self._compute(now)
+        return schedule
+
+    def _compute(self, now: float) -> _Schedule:
+        signers = sorted((key for key in self._keys if key.can_sign), key=lambda key: key.active_from)
+        # Times at which the signer or the set of verification keys changes
+        changes = [key.active_from for key in self._keys] + [key.retire_at for key in self._keys]
+
+        signer = None
+        verifiers = {}
+        for index, key in enumerate(signers):
+            successor = signers[index + 1] if index + 1 < len(signers) else None
+            if key.active_from <= now and (successor is None or successor.active_from > now):
+                signer = key
+            if successor is not None:
+                # Tokens signed just before the hand-over stay valid until they expire
+                superseded_until = successor.active_from + self.token_lifetime
+                changes.append(superseded_until)
+                if superseded_until <= now:
+                    continue
+            if key.retire_at > now:
+                verifiers[key.kid] = key
+        for key in self._keys:
+            if not key.can_sign and key.retire_at > now:
+                verifiers[key.kid] = key
+
+        jwks = [key.jwk() for key in verifiers.values()]
+        return _Schedule(
+            valid_until=min([change for change in changes if change > now], default=math.inf),
+            signer=signer,
+            verifiers=verifiers,
+            jwks=orjson.dumps({"keys": [jwk for jwk in jwks if jwk is not None]}),
+        )
+
+    def encode(self, claims: dict) -> str:
+        """Sign ``claims`` (JSON-serializable) with the active key."""
+        signer = self._current(time.time()).signer
+        if signer is None:
+            raise RuntimeError("No signing key is active")
+        header = {"alg": signer.algorithm, "kid": signer.kid, "typ": "JWT"}
+        signing_input = f"{b64encode(orjson.dumps(header))}.{b64encode(orjson.dumps(claims))}"
+        return f"{signing_input}.{b64encode(signer.sign(signing_input.encode('ascii')))}"
+
+    def decode(self, token: str, leeway: float = 0.0) -> Optional[dict]:
+        """Claims of a validly signed, unexpired token; None for anything else."""
+        now = time.time()
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+            header = orjson.loads(b64decode(header_segment))
+            # Tokens issued before key ids were introduced were signed with SECRET_KEY
+            key = self._current(now).verifiers.get(header.get("kid", DEFAULT_KID))
+            # The key, not the token, decides the algorithm
+            if key is None or header.get("alg") != key.algorithm:
+                return None
+            signing_input = f"{header_segment}.{payload_segment}".encode("ascii")
+            if not key.verify(signing_input, b64decode(signature_segment)):
+                return None
+            claims = orjson.loads(b64decode(payload_segment))
+        except (ValueError, TypeError, AttributeError, binascii.Error, UnicodeError):
+            return None
+
+        if not isinstance(claims, dict):
+            return None
+        expires = claims.get("exp")
+        if not isinstance(expires, (int, float)) or expires <= now - leeway:
+            return None
+        not_before = claims.get("nbf")
+        if not_before is not None and (
+            not isinstance(not_before, (int, float)) or not_before > now + leeway
+        ):
+            return None
+        return claims
+
+    def jwks(self) -> bytes:
+        """Serialized JSON Web Key Set of the public verification keys."""
+        return self._current(time.time()).jwks
+
+    def kids_in_use(self) -> Set[str]:
+        """Ids of the keys that currently verify tokens, including pre-published ones."""
+        return set(self._current(time.time()).verifiers)
+
+
+def load_manifest(path: str) -> List[SigningKey]:
+    """Parse the keys listed in a manifest; key file paths are relative to it."""
+    with open(path) as manifest:
+        return parse_manifest(json.load(manifest), os.path.dirname(os.path.abspath(path)))
+
+
+def parse_manifest(manifest: dict, directory: str) -> List[SigningKey]:
+    """Parse the keys of a manifest whose key files are in ``directory``."""
+    keys = []
+    for entry in manifest["keys"]:
+        if "private_key_file" in entry:
+            with open(os.path.join(directory, entry["private_key_file"]), "rb") as pem:
+                key = serialization.load_pem_private_key(pem.read(), password=None)
+        elif "public_key_file" in entry:
+            with open(os.path.join(directory, entry["public_key_file"]), "rb") as pem:
+                key = serialization.load_pem_public_key(pem.read())
+        else:
+            raise ValueError(f"Key {entry.get('kid')!r} has no key file")
+        keys.append(SigningKey(
+            kid=entry["kid"],
+            algorithm=entry["alg"],
+            key=key,
+            active_from=_timestamp(entry.get("active_from")),
+            retire_at=_timestamp(entry.get("retire_at")),
+        ))
+    return keys
+
+
+def create_key_ring() -> KeyRing:
+    """Build the key ring from ``JWT_KEYS_FILE``, or from ``SECRET_KEY``."""
+    token_lifetime = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    if settings.JWT_KEYS_FILE:
+        return KeyRing(
+            token_lifetime=token_lifetime,
+            path=settings.JWT_KEYS_FILE,
+            reload_seconds=settings.JWT_KEYS_RELOAD_SECONDS,
+        )
+    key = SigningKey(DEFAULT_KID, settings.ALGORITHM, settings.SECRET_KEY.encode())
+    return KeyRing([key], token_lifetime=token_lifetime)
+
+
+key_ring = create_key_ring()
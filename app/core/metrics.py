@@ -0,0 +1,309 @@
+"""Request metrics in the Prometheus text exposition format.
+
+A small in-process registry (counters, gauges and histograms with labels)
+fed by ``MetricsMiddleware`` and by SQLAlchemy cursor events. SQL statements
+are attributed to the request that issued them through a context variable.
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+Labels = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Metric:
+    """Base class of labelled metrics."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [
+                f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(self._values.items())
+            ]
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+@dataclass
+class _HistogramState:
+    buckets: List[int]
+    count: int = 0
+    total: float = 0.0
+
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._states: Dict[Labels, _HistogramState] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            state = self._states.get(labels)
+            if state is None:
+                state = self._states[labels] = _HistogramState([0] * len(self.buckets))
+            state.buckets[bisect_left(self.buckets, value)] += 1
+            state.count += 1
+            state.total += value
+
+    def count(self, *labels: str) -> int:
+        state = self._states.get(labels)
+        return state.count if state else 0
+
+    def sum(self, *labels: str) -> float:
+        state = self._states.get(labels)
+        return state.total if state else 0.0
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for labels, state in sorted(self._states.items()):
+                cumulative = 0
+                for bound, hits in zip(self.buckets, state.buckets):
+                    cumulative += hits
+                    bucket_labels = _format_labels(
+                        self.labelnames + ("le",), labels + (_format_value(bound),)
+                    )
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                label_text = _format_labels(self.labelnames, labels)
+                lines.append(f"{self.name}_sum{label_text} {_format_value(state.total)}")
+                lines.append(f"{self.name}_count{label_text} {state.count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics plus callbacks producing gauges at scrape time."""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.collectors: List[Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector) -> None:
+        """Register a callable yielding ``(name, help, labels, value)`` gauge samples."""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+
+        described = set()
+        for collector in self.collectors:
+            for name, documentation, labels, value in collector():
+                if name not in described:
+                    described.add(name)
+                    lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} gauge"])
+                lines.append(
+                    f"{name}{_format_labels(list(labels), list(labels.values()))} "
+                    f"{_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests handled.", ["method", "route", "status"]
+))
+request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ["method", "route"]
+))
+requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled."
+))
+response_size = registry.register(Histogram(
+    "http_response_size_bytes", "HTTP response body size as sent.", ["method", "route"],
+    buckets=SIZE_BUCKETS
+))
+request_statements = registry.register(Histogram(
+    "http_request_db_statements", "SQL statements executed per HTTP request.", ["method", "route"],
+    buckets=STATEMENT_BUCKETS
+))
+request_db_duration = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per HTTP request.", ["method", "route"]
+))
+
+
+@dataclass
+class RequestStats:
+    """SQL work attributed to the current request."""
+    statements: int = 0
+    db_seconds: float = 0.0
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def _record_statement(context) -> None:
+    # The start time lives on the statement's own execution context, so a
+    # statement that fails leaves nothing behind to skew the next one
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    del context._metrics_started
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_statement(context)
+
+
+def _handle_error(exception_context):
+    _record_statement(exception_context.execution_context)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute statements executed on ``engine``, failed or not, to the current request."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def _route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Record latency, size, status and SQL work of every HTTP request.
+
+    With ``server_timing`` enabled, responses also carry a ``Server-Timing``
+    header with the SQL statement count and time and the total handler time.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+        sent_bytes = 0
+
+        async def send_instrumented(message: Message) -> None:
+            nonlocal status_code, sent_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing",
+                        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries", '
+                        f"app;dur={elapsed_ms:.2f}"
+                    )
+            elif message["type"] == "http.response.body":
+                sent_bytes += len(message.get("body", b""))
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_instrumented)
+        finally:
+            requests_in_flight.dec()
+            current_request.reset(token)
+
+            method, route = scope["method"], _route_label(scope)
+            requests_total.inc(method, route, str(status_code))
+            request_duration.observe(time.perf_counter() - started, method, route)
+            response_size.observe(sent_bytes, method, route)
+            request_statements.observe(stats.statements, method, route)
+            request_db_duration.observe(stats.db_seconds, method, route)
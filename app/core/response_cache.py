@@ -0,0 +1,226 @@
+"""Read-through cache for serialized responses of public GET endpoints."""
+
+import json
+import math
+from contextvars import ContextVar
+from enum import Enum
+from typing import Any, Dict, Optional, Sequence
+from urllib.parse import urlencode
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+CACHE_STATUS_HEADER = "X-Cache"
+
+# Invalidation namespaces
+LESSON_PLANS = "lesson_plans"            # every cached lesson plan response
+LESSON_PLAN_LISTS = "lesson_plan_lists"  # lesson plan list pages
+TAGS = "tags"                            # tag list pages
+
+# Set while the current request reads from a replica, which may lag behind
+# writes (and invalidations) made on the primary
+replica_read: ContextVar[bool] = ContextVar("replica_read", default=False)
+
+
+def lesson_plan_namespace(lesson_plan_id: int) -> str:
+    """
+    Namespace of a single lesson plan's cached responses.
+
+    Bumped after each committed write to the plan, so a response built from
+    the row as it was before the write is stored under a key nobody reads.
+    """
+    return f"{LESSON_PLANS}:{lesson_plan_id}"
+
+
+class NullBackend:
+    """Backend that never stores anything (caching disabled)."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        pass
+
+    async def delete(self, key: str) -> None:
+        pass
+
+    async def get_counter(self, key: str) -> int:
+        return 0
+
+    async def incr(self, key: str) -> int:
+        return 0
+
+
+class InMemoryBackend:
+    """Per-process LRU backend; invalidations are only seen by this worker."""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self._entries = TTLCache(max_size=max_entries, ttl=ttl)
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._entries.delete(key)
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+class RedisBackend:
+    """
+    Shared backend for any client exposing the ``redis.asyncio`` API.
+
+    Only ``get``, ``set(..., ex=)``, ``delete`` and ``incr`` are used, so a
+    local fake can stand in for a real server.
+    """
+
+    def __init__(self, client, prefix: str = "response-cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+    async def get_counter(self, key: str) -> int:
+        return int(await self.client.get(self.prefix + key) or 0)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(self.prefix + key)
+
+
+def create_backend():
+    """Build the backend selected by ``RESPONSE_CACHE_BACKEND``."""
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        return InMemoryBackend(
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+        )
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        import redis.asyncio as redis  # optional dependency
+
+        return RedisBackend(redis.from_url(settings.RESPONSE_CACHE_URL))
+    return NullBackend()
+
+
+class CacheKey(str):
+    """A cache key that remembers the namespaces it was built from."""
+
+    namespaces: Sequence[str] = ()
+
+
+def _normalize(value: Any) -> str:
+    if isinstance(value, Enum):
+        return str(value.value)
+    return str(value)
+
+
+class ResponseCache:
+    """
+    Cache of serialized JSON responses with namespace-based invalidation.
+
+    Keys embed a generation counter for each namespace they belong to, so
+    bumping a namespace's counter invalidates all of its entries at once;
+    stale entries simply age out. For ``lag`` seconds after an invalidation,
+    responses read from a replica are not stored, since the replica may not
+    have the write yet and would fill the new generation with old data.
+    """
+
+    def __init__(self, backend, ttl: int, lag: float = 0):
+        self.backend = backend
+        self.ttl = ttl
+        self.lag = lag
+
+    async def key(self, name: str, namespaces: Sequence[str] = (), **params: Any) -> CacheKey:
+        """Build a cache key from the endpoint name and its parsed parameters."""
+        generations = [
+            str(await self.backend.get_counter(f"generation:{namespace}"))
+            for namespace in namespaces
+        ]
+        query = urlencode(sorted(
+            (field, _normalize(value)) for field, value in params.items() if value is not None
+        ))
+        key = CacheKey(f"{name}:{'.'.join(generations)}:{query}")
+        key.namespaces = tuple(namespaces)
+        return key
+
+    async def _may_lag(self, key: str) -> bool:
+        """Whether a replica may not yet have seen the writes behind ``key``'s generation."""
+        if not replica_read.get():
+            return False
+        for namespace in getattr(key, "namespaces", ()):
+            if await self.backend.get(f"invalidated:{namespace}") is not None:
+                return True
+        return False
+
+    async def get(self, key: str) -> Optional[Response]:
+        """Return the cached response for ``key``, if any."""
+        cached = await self.backend.get(key)
+        if cached is None:
+            return None
+
+        raw_headers, body = cached.split(b"\n", 1)
+        headers = {**json.loads(raw_headers), CACHE_STATUS_HEADER: "HIT"}
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def store(
+        self,
+        key: str,
+        adapter: TypeAdapter,
+        content: Any,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Response:
+        """Serialize ``content`` through ``adapter``, cache it and return the response."""
+        body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+        return await self.store_body(key, body, headers)
+
+    async def store_body(
+        self,
+        key: str,
+        body: bytes,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Response:
+        """Cache an already serialized JSON body and return the response."""
+        headers = headers or {}
+        if not await self._may_lag(key):
+            await self.backend.set(key, json.dumps(headers).encode() + b"\n" + body, self.ttl)
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={**headers, CACHE_STATUS_HEADER: "MISS"},
+        )
+
+    async def delete(self, key: str) -> None:
+        """Drop a single cached response."""
+        await self.backend.delete(key)
+
+    async def invalidate(self, *namespaces: str) -> None:
+        """Invalidate every cached response in the given namespaces."""
+        for namespace in namespaces:
+            await self.backend.incr(f"generation:{namespace}")
+            if self.lag:
+                await self.backend.set(f"invalidated:{namespace}", b"1", math.ceil(self.lag))
+
+
+response_cache = ResponseCache(
+    create_backend(),
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    lag=settings.READ_YOUR_WRITES_SECONDS if settings.DATABASE_REPLICA_URLS else 0,
+)
@@ -0,0 +1,47 @@
+"""In-memory set of revoked tokens, checked on every authenticated request."""
+
+import time
+from typing import Dict, Set
+
+
+class RevocationList:
+    """
+    Ids of revoked tokens, each kept until the tokens it covers have expired.
+
+    Ids are grouped into buckets by expiry time, so expired revocations are
+    dropped a whole bucket at a time and a lookup costs one set probe per
+    live bucket, however many tokens are revoked.
+    """
+
+    def __init__(self, bucket_seconds: float = 60.0):
+        self.bucket_seconds = bucket_seconds
+        self._buckets: Dict[int, Set[str]] = {}
+
+    def _current_bucket(self) -> int:
+        return int(time.time() // self.bucket_seconds)
+
+    def add(self, token_id: str, expires_at: float) -> None:
+        """Revoke ``token_id`` until the epoch timestamp ``expires_at``."""
+        bucket = int(expires_at // self.bucket_seconds)
+        if bucket >= self._current_bucket():
+            self._buckets.setdefault(bucket, set()).add(token_id)
+
+    def __contains__(self, token_id: str) -> bool:
+        current = self._current_bucket()
+        for bucket in [bucket for bucket in self._buckets if bucket < current]:
+            del self._buckets[bucket]
+        return any(token_id in ids for ids in self._buckets.values())
+
+    def is_revoked(self, payload: dict) -> bool:
+        """Whether an access token payload belongs to a revoked refresh family."""
+        return "fam" in payload and f"fam:{payload['fam']}" in self
+
+    def clear(self) -> None:
+        """Forget every revocation."""
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._buckets.values())
+
+
+revocations = RevocationList()
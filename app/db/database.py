@@ -1,21 +1,250 @@
 """Database connection and session configuration."""
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import hashlib
+import math
+import time
+from typing import Dict, List
 
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine
+)
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.response_cache import replica_read, response_cache
+
+# Sync URL schemes mapped onto their asyncio drivers
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Return ``url`` with its scheme switched to the matching async driver."""
+    scheme, separator, rest = url.partition("://")
+    if not separator:
+        return url
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def pool_status(pool) -> dict:
+    """Snapshot of connection usage and checkout wait times for a pool."""
+    if not isinstance(pool, InstrumentedPool):
+        return {"pool": pool.status()}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "checkouts": pool.checkouts,
+        "timeouts": pool.timeouts,
+        "wait_seconds_total": round(pool.wait_seconds_total, 6),
+        "wait_seconds_max": round(pool.wait_seconds_max, 6),
+    }
+
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def engine_options(url: str, pool_size: int, max_overflow: int) -> dict:
+    """Pool configuration for an engine connecting to ``url``."""
+    if make_url(url).get_backend_name() == "sqlite":
+        # SQLite keeps SQLAlchemy's default NullPool/StaticPool
+        return {}
+    return {
+        "poolclass": InstrumentedPool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+DATABASE_URL = async_database_url(settings.DATABASE_URL)
+
+# Writes and read-only requests draw from separate pools so that bursts of
+# list traffic cannot starve mutations of connections
+engine = create_async_engine(
+    DATABASE_URL,
+    **engine_options(DATABASE_URL, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+)
+read_engine = create_async_engine(
+    DATABASE_URL,
+    **engine_options(DATABASE_URL, settings.DB_READ_POOL_SIZE, settings.DB_READ_MAX_OVERFLOW)
+)
+
+SessionLocal = async_sessionmaker(
+    bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
 
-def get_db():
+class ReplicaSet:
+    """
+    Round-robin selection over read replicas with passive health checks.
+
+    A replica that fails to hand out a connection is skipped for
+    ``retry_after`` seconds, after which it is tried again.
+    """
+
+    def __init__(self, engines: List[AsyncEngine], retry_after: float):
+        self.engines = engines
+        self.retry_after = retry_after
+        self._next = 0
+        self._down_until: Dict[int, float] = {}
+
+    def candidates(self) -> List[AsyncEngine]:
+        """Replicas to try for the next session, in round-robin order."""
+        if not self.engines:
+            return []
+        start = self._next
+        self._next = (self._next + 1) % len(self.engines)
+        now = time.monotonic()
+        rotation = self.engines[start:] + self.engines[:start]
+        return [
+            engine for engine in rotation
+            if self._down_until.get(id(engine), 0.0) <= now
+        ]
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        """Take a replica out of rotation until its retry time."""
+        self._down_until[id(engine)] = time.monotonic() + self.retry_after
+
+    def mark_up(self, engine: AsyncEngine) -> None:
+        """Put a replica back into rotation."""
+        self._down_until.pop(id(engine), None)
+
+    def status(self) -> List[dict]:
+        """Health and pool usage of each replica."""
+        now = time.monotonic()
+        return [
+            {
+                "url": engine.url.render_as_string(hide_password=True),
+                "healthy": self._down_until.get(id(engine), 0.0) <= now,
+                **pool_status(engine.pool),
+            }
+            for engine in self.engines
+        ]
+
+
+replicas = ReplicaSet(
+    [
+        create_async_engine(
+            url,
+            **engine_options(url, settings.DB_READ_POOL_SIZE, settings.DB_READ_MAX_OVERFLOW)
+        )
+        for url in map(async_database_url, settings.DATABASE_REPLICA_URLS)
+    ],
+    retry_after=settings.DB_REPLICA_RETRY_SECONDS,
+)
+
+# Clients that recently sent a mutation, whose reads stay on the primary so
+# they see their own writes despite replication lag. Also recorded in the
+# response cache backend, which workers share when it is Redis.
+recent_writers = TTLCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.READ_YOUR_WRITES_SECONDS
+)
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def client_key(request: Request) -> str:
+    """Identify the requesting client by its credentials, or else its address."""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return authorization
+    return request.client.host if request.client else ""
+
+
+def _writer_marker(request: Request) -> str:
+    # Credentials are hashed so they are never written to a shared store
+    return "recent-writer:" + hashlib.sha256(client_key(request).encode()).hexdigest()
+
+
+async def mark_recent_writer(request: Request) -> None:
+    """Keep the client's reads on the primary for ``READ_YOUR_WRITES_SECONDS``."""
+    recent_writers.set(client_key(request), True)
+    await response_cache.backend.set(
+        _writer_marker(request), b"1", math.ceil(settings.READ_YOUR_WRITES_SECONDS)
+    )
+
+
+async def is_recent_writer(request: Request) -> bool:
+    """Whether the client sent a mutation to any worker within ``READ_YOUR_WRITES_SECONDS``."""
+    if recent_writers.get(client_key(request)):
+        return True
+    return await response_cache.backend.get(_writer_marker(request)) is not None
+
+
+async def get_db(request: Request):
     """Database session dependency."""
-    db = SessionLocal()
-    try:
+    if request.method not in SAFE_METHODS and replicas.engines:
+        await mark_recent_writer(request)
+    async with SessionLocal() as db:
+        yield db
+
+
+async def get_read_db(request: Request):
+    """
+    Database session dependency for read-only endpoints.
+
+    Sessions go to the next healthy replica, or to the primary when no
+    replica is configured or reachable, or when the client has just written.
+    """
+    replica_read.set(False)
+    if replicas.engines and not await is_recent_writer(request):
+        for replica in replicas.candidates():
+            db = AsyncSession(bind=replica, autoflush=False, expire_on_commit=False)
+            try:
+                # Check out (and pre-ping) a connection before committing to this replica
+                await db.connection()
+            except (DBAPIError, OSError, PoolTimeoutError):
+                await db.close()
+                replicas.mark_down(replica)
+                continue
+
+            replica_read.set(True)
+            try:
+                yield db
+            finally:
+                await db.close()
+            return
+
+    async with ReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
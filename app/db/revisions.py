@@ -0,0 +1,246 @@
+"""Revision history of lesson plans stored as deltas with periodic snapshots.
+
+Every ``REVISION_SNAPSHOT_INTERVAL``-th revision of a lesson plan (and its
+first) stores the full content; the others store only what changed since
+the previous revision. Long text fields are diffed line by line, so an edit
+to one step of a procedure costs a few lines of storage. Reconstructing a
+version reads at most one snapshot and the deltas recorded after it.
+"""
+
+import json
+from difflib import SequenceMatcher
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer_group
+
+from app.core.config import settings
+from app.models.lesson_plan import LessonPlan, LessonPlanRevision, lesson_plan_tags
+
+REVISION_FIELDS = (
+    "title",
+    "subject",
+    "grade_level",
+    "duration_minutes",
+    "difficulty",
+    "objectives",
+    "materials",
+    "procedure",
+    "assessment",
+    "notes",
+)
+
+Content = Dict[str, Any]
+
+
+def revision_content(lesson_plan: LessonPlan) -> Content:
+    """JSON-ready content of a lesson plan (content columns and tags must be loaded)."""
+    content = {}
+    for field in REVISION_FIELDS:
+        value = getattr(lesson_plan, field)
+        content[field] = value.value if isinstance(value, Enum) else value
+    content["tag_ids"] = sorted(tag.id for tag in lesson_plan.tags)
+    return content
+
+
+def _line_patch(old: str, new: str) -> List[list]:
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [
+        [i1, i2, new_lines[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def _apply_line_patch(old: str, patch: List[list]) -> str:
+    lines = old.splitlines(keepends=True)
+    # Later hunks first, so earlier line numbers stay valid
+    for i1, i2, replacement in reversed(patch):
+        lines[i1:i2] = replacement
+    return "".join(lines)
+
+
+def make_delta(old: Content, new: Content) -> Dict[str, Dict[str, Any]]:
+    """
+    Delta turning ``old`` into ``new``.
+
+    Changed text fields are stored as line patches when that is smaller
+    than the new value; other changed fields are stored whole.
+    """
+    delta: Dict[str, Dict[str, Any]] = {}
+    for field, value in new.items():
+        previous = old.get(field)
+        if previous == value:
+            continue
+        if isinstance(previous, str) and isinstance(value, str):
+            patch = _line_patch(previous, value)
+            if len(json.dumps(patch)) < len(json.dumps(value)):
+                delta.setdefault("patch", {})[field] = patch
+                continue
+        delta.setdefault("set", {})[field] = value
+    return delta
+
+
+def apply_delta(content: Content, delta: Dict[str, Dict[str, Any]]) -> Content:
+    """Apply a delta produced by ``make_delta``."""
+    content = {**content, **delta.get("set", {})}
+    for field, patch in delta.get("patch", {}).items():
+        content[field] = _apply_line_patch(content[field], patch)
+    return content
+
+
+def snapshot_revision(
+    lesson_plan_id: int,
+    version: int,
+    content: Content,
+    author_id: Optional[int]
+) -> Dict[str, Any]:
+    """Column values of a snapshot revision (for inserts without a chain)."""
+    return {
+        "lesson_plan_id": lesson_plan_id,
+        "version": version,
+        "is_snapshot": True,
+        "content": json.dumps(content, separators=(",", ":")),
+        "author_id": author_id,
+    }
+
+
+async def revision_chain(
+    db: AsyncSession,
+    lesson_plan_id: int,
+    version: Optional[int] = None
+) -> List[LessonPlanRevision]:
+    """
+    The latest snapshot at or before ``version`` (default: the newest) and
+    every revision after it up to ``version``, oldest first.
+    """
+    bounds = [LessonPlanRevision.lesson_plan_id == lesson_plan_id]
+    if version is not None:
+        bounds.append(LessonPlanRevision.version <= version)
+
+    last_snapshot = (
+        select(func.max(LessonPlanRevision.version))
+        .where(*bounds, LessonPlanRevision.is_snapshot.is_(True))
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(LessonPlanRevision)
+        .where(*bounds, LessonPlanRevision.version >= last_snapshot)
+        .order_by(LessonPlanRevision.version)
+    )
+    return list(result.scalars().all())
+
+
+def replay(chain: List[LessonPlanRevision]) -> Content:
+    """Content of the last revision of a chain returned by ``revision_chain``."""
+    content = json.loads(chain[0].content)
+    for revision in chain[1:]:
+        content = apply_delta(content, json.loads(revision.content))
+    return content
+
+
+async def record_revision(
+    db: AsyncSession,
+    lesson_plan: LessonPlan,
+    author_id: Optional[int]
+) -> None:
+    """
+    Add a revision for the lesson plan's current version to the session.
+
+    Stores a delta against the previous revision, or a snapshot when the
+    lesson plan has none yet or the snapshot interval has been reached.
+    """
+    content = revision_content(lesson_plan)
+    chain = await revision_chain(db, lesson_plan.id)
+
+    if not chain or len(chain) >= settings.REVISION_SNAPSHOT_INTERVAL:
+        db.add(LessonPlanRevision(
+            **snapshot_revision(lesson_plan.id, lesson_plan.version, content, author_id)
+        ))
+        return
+
+    db.add(LessonPlanRevision(
+        lesson_plan_id=lesson_plan.id,
+        version=lesson_plan.version,
+        is_snapshot=False,
+        content=json.dumps(make_delta(replay(chain), content), separators=(",", ":")),
+        author_id=author_id,
+    ))
+
+
+async def record_tag_removal(db: AsyncSession, tag_id: int, author_id: Optional[int]) -> None:
+    """
+    Add a revision without ``tag_id`` to every lesson plan carrying it.
+
+    Each one gets the version following its current one; call this before
+    bumping their versions and deleting the tag. Only lesson plans due for a
+    snapshot are loaded; the others get a delta setting ``tag_ids``, built
+    from the link table.
+    """
+    tagged = select(lesson_plan_tags.c.lesson_plan_id).where(lesson_plan_tags.c.tag_id == tag_id)
+    result = await db.execute(
+        select(LessonPlan.id, LessonPlan.version).where(LessonPlan.id.in_(tagged))
+    )
+    versions = dict(result.all())
+    if not versions:
+        return
+
+    tag_ids: Dict[int, List[int]] = {lesson_plan_id: [] for lesson_plan_id in versions}
+    result = await db.execute(
+        select(lesson_plan_tags.c.lesson_plan_id, lesson_plan_tags.c.tag_id)
+        .where(lesson_plan_tags.c.lesson_plan_id.in_(tagged), lesson_plan_tags.c.tag_id != tag_id)
+        .order_by(lesson_plan_tags.c.tag_id)
+    )
+    for lesson_plan_id, other_tag_id in result.all():
+        tag_ids[lesson_plan_id].append(other_tag_id)
+
+    # Length of each lesson plan's chain since its latest snapshot
+    last_snapshot = (
+        select(
+            LessonPlanRevision.lesson_plan_id,
+            func.max(LessonPlanRevision.version).label("version"),
+        )
+        .where(LessonPlanRevision.lesson_plan_id.in_(tagged), LessonPlanRevision.is_snapshot.is_(True))
+        .group_by(LessonPlanRevision.lesson_plan_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(LessonPlanRevision.lesson_plan_id, func.count())
+        .join(last_snapshot, and_(
+            last_snapshot.c.lesson_plan_id == LessonPlanRevision.lesson_plan_id,
+            LessonPlanRevision.version >= last_snapshot.c.version,
+        ))
+        .group_by(LessonPlanRevision.lesson_plan_id)
+    )
+    chain_lengths = dict(result.all())
+
+    due = [
+        lesson_plan_id for lesson_plan_id in versions
+        if not 0 < chain_lengths.get(lesson_plan_id, 0) < settings.REVISION_SNAPSHOT_INTERVAL
+    ]
+    if due:
+        result = await db.execute(
+            select(LessonPlan).options(undefer_group("content")).where(LessonPlan.id.in_(due))
+        )
+        for lesson_plan in result.scalars().all():
+            content = {**revision_content(lesson_plan), "tag_ids": tag_ids[lesson_plan.id]}
+            db.add(LessonPlanRevision(**snapshot_revision(
+                lesson_plan.id, versions[lesson_plan.id] + 1, content, author_id
+            )))
+
+    due_ids = set(due)
+    db.add_all([
+        LessonPlanRevision(
+            lesson_plan_id=lesson_plan_id,
+            version=version + 1,
+            is_snapshot=False,
+            content=json.dumps({"set": {"tag_ids": tag_ids[lesson_plan_id]}}, separators=(",", ":")),
+            author_id=author_id,
+        )
+        for lesson_plan_id, version in versions.items()
+        if lesson_plan_id not in due_ids
+    ])
@@ -0,0 +1,123 @@
+"""Full-text search index and query helpers for lesson plans.
+
+PostgreSQL keeps a weighted ``tsvector`` generated column with a GIN index.
+SQLite (used by the test suite) keeps an external-content FTS5 table that is
+maintained by triggers. Both index title, subject, objectives and procedure.
+"""
+
+import re
+from typing import List
+
+from sqlalchemy import DDL, event, func, literal_column, table, column
+
+FTS_TABLE = "lesson_plans_fts"
+
+# Relative weights for title, subject, objectives and procedure
+_SQLITE_BM25_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+_POSTGRES_DDL = [
+    """
+    ALTER TABLE lesson_plans ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(subject, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(objectives, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(procedure, '')), 'D')
+    ) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_lesson_plans_search_vector
+    ON lesson_plans USING GIN (search_vector)
+    """,
+]
+
+_SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, subject, objectives, procedure,
+        content='lesson_plans', content_rowid='id'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS lesson_plans_fts_ai AFTER INSERT ON lesson_plans BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, subject, objectives, procedure)
+        VALUES (new.id, new.title, new.subject, new.objectives, new.procedure);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS lesson_plans_fts_ad AFTER DELETE ON lesson_plans BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, subject, objectives, procedure)
+        VALUES ('delete', old.id, old.title, old.subject, old.objectives, old.procedure);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS lesson_plans_fts_au AFTER UPDATE ON lesson_plans BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, subject, objectives, procedure)
+        VALUES ('delete', old.id, old.title, old.subject, old.objectives, old.procedure);
+        INSERT INTO {FTS_TABLE}(rowid, title, subject, objectives, procedure)
+        VALUES (new.id, new.title, new.subject, new.objectives, new.procedure);
+    END
+    """,
+]
+
+
+def register_search_index(lesson_plans_table) -> None:
+    """Attach the dialect-specific search index DDL to the lesson plans table."""
+    for statement in _POSTGRES_DDL:
+        event.listen(
+            lesson_plans_table, "after_create", DDL(statement).execute_if(dialect="postgresql")
+        )
+    for statement in _SQLITE_DDL:
+        event.listen(
+            lesson_plans_table, "after_create", DDL(statement).execute_if(dialect="sqlite")
+        )
+    event.listen(
+        lesson_plans_table,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite"),
+    )
+
+
+def search_terms(search: str) -> List[str]:
+    """Split a free-text search string into word tokens."""
+    return re.findall(r"\w+", search.lower())
+
+
+def apply_search(query, model, search: str, dialect_name: str):
+    """
+    Restrict a lesson plan query to full-text matches, ranked by relevance.
+
+    Every word must match (as a prefix) in at least one indexed column.
+    Works with both ``Query`` and ``Select`` objects.
+    """
+    terms = search_terms(search)
+    if not terms:
+        return query
+
+    if dialect_name == "postgresql":
+        ts_query = func.to_tsquery("english", " & ".join(f"{term}:*" for term in terms))
+        search_vector = literal_column(f"{model.__tablename__}.search_vector")
+        return query.filter(search_vector.op("@@")(ts_query)).order_by(
+            func.ts_rank(search_vector, ts_query).desc()
+        )
+
+    if dialect_name == "sqlite":
+        fts = table(FTS_TABLE, column("rowid"))
+        fts_ref = literal_column(FTS_TABLE)
+        match = " ".join(f'"{term}"*' for term in terms)
+        return (
+            query.join(fts, fts.c.rowid == model.id)
+            .filter(fts_ref.op("MATCH")(match))
+            .order_by(func.bm25(fts_ref, *_SQLITE_BM25_WEIGHTS))
+        )
+
+    # Fallback for databases without a configured index
+    for term in terms:
+        pattern = f"%{term}%"
+        query = query.filter(
+            model.title.ilike(pattern)
+            | model.subject.ilike(pattern)
+            | model.objectives.ilike(pattern)
+            | model.procedure.ilike(pattern)
+        )
+    return query
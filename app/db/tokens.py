@@ -0,0 +1,218 @@
+"""Refresh token rotation and token revocation.
+
+Refresh tokens are random strings prefixed with their family id; the
+database only keeps their SHA-256 hash. Each one belongs to a family
+started at login. Exchanging a
+token marks it used and issues the next token of its family. Presenting a
+used token again means it was copied, so the whole family is revoked,
+including the access tokens minted from it.
+
+Revocations are written to ``token_revocations`` and mirrored in every
+worker's in-memory ``revocations`` list, which ``revocation_sync_loop``
+keeps up to date.
+"""
+
+import asyncio
+import hashlib
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.revocation import revocations
+from app.models.user import RefreshToken, TokenRevocation
+
+
+# Seconds between deletions of expired rows
+PURGE_INTERVAL = 3600
+
+# Session.info key of revocations to mirror in memory once committed
+PENDING_REVOCATIONS = "pending_revocations"
+
+
+class InvalidRefreshToken(Exception):
+    """Raised for unknown, expired, revoked or reused refresh tokens."""
+
+
+def hash_token(token: str) -> str:
+    """Digest under which a refresh token is stored."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def refresh_token_family(token: str) -> Optional[str]:
+    """
+    Family id a refresh token names, unverified (tokens issued before
+    families were embedded name none).
+    """
+    family_id, separator, _ = token.partition(".")
+    if separator and len(family_id) == 32 and all(c in "0123456789abcdef" for c in family_id):
+        return family_id
+    return None
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; every stored timestamp is UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def issue_refresh_token(
+    db: AsyncSession,
+    user_id: int,
+    family_id: Optional[str] = None
+) -> Tuple[str, str]:
+    """
+    Add a new refresh token to the session; return it with its family id.
+
+    Without ``family_id`` the token starts a new family (a new login).
+    """
+    family_id = family_id or uuid4().hex
+    token = f"{family_id}.{secrets.token_urlsafe(32)}"
+    db.add(RefreshToken(
+        token_hash=hash_token(token),
+        family_id=family_id,
+        user_id=user_id,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token, family_id
+
+
+async def revoke(db: AsyncSession, token_id: str) -> None:
+    """
+    Record a revocation for as long as an access token issued now could live.
+
+    Once the session commits, it takes effect in this worker immediately and
+    in the others at their next sync.
+    """
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    db.add(TokenRevocation(token_id=token_id, expires_at=expires_at, revoked_at=now))
+    db.info.setdefault(PENDING_REVOCATIONS, []).append((token_id, expires_at.timestamp()))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_revocations(session: Session) -> None:
+    for token_id, expires_at in session.info.pop(PENDING_REVOCATIONS, ()):
+        revocations.add(token_id, expires_at)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_revocations(session: Session) -> None:
+    session.info.pop(PENDING_REVOCATIONS, None)
+
+
+async def revoke_family(db: AsyncSession, family_id: str) -> None:
+    """Revoke every refresh token of a family and the access tokens minted from it."""
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id)
+        .values(revoked=True)
+    )
+    await revoke(db, f"fam:{family_id}")
+
+
+async def revoke_user_tokens(db: AsyncSession, user_id: int) -> None:
+    """Revoke every live refresh token family of a user, e.g. after a password change."""
+    result = await db.execute(
+        select(RefreshToken.family_id)
+        .where(
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked.is_(False),
+            RefreshToken.expires_at > datetime.now(timezone.utc),
+        )
+        .distinct()
+    )
+    for family_id in result.scalars().all():
+        await revoke_family(db, family_id)
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Tuple[int, str, str]:
+    """
+    Exchange a refresh token for the next one of its family.
+
+    Returns the user id, the new token and the family id. A token that was
+    already used revokes its family. The caller commits in both cases.
+    """
+    result = await db.execute(
+        select(RefreshToken).where(RefreshToken.token_hash == hash_token(token))
+    )
+    refresh_token = result.scalars().first()
+    now = datetime.now(timezone.utc)
+    if (
+        refresh_token is None
+        or refresh_token.revoked
+        or _utc(refresh_token.expires_at) <= now
+    ):
+        raise InvalidRefreshToken()
+
+    # Compare-and-set, so of two concurrent exchanges only one succeeds
+    claimed = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == refresh_token.id, RefreshToken.used_at.is_(None))
+        .values(used_at=now)
+    )
+    if claimed.rowcount != 1:
+        await revoke_family(db, refresh_token.family_id)
+        raise InvalidRefreshToken()
+
+    new_token, family_id = await issue_refresh_token(
+        db, refresh_token.user_id, refresh_token.family_id
+    )
+    return refresh_token.user_id, new_token, family_id
+
+
+async def load_revocations(db: AsyncSession, since: Optional[datetime] = None) -> int:
+    """Mirror unexpired revocations (made after ``since``) in memory; return how many."""
+    now = datetime.now(timezone.utc)
+    query = select(TokenRevocation.token_id, TokenRevocation.expires_at).where(
+        TokenRevocation.expires_at > now
+    )
+    if since is not None:
+        query = query.where(TokenRevocation.revoked_at >= since)
+
+    rows = (await db.execute(query)).all()
+    for token_id, expires_at in rows:
+        revocations.add(token_id, _utc(expires_at).timestamp())
+    return len(rows)
+
+
+async def purge_expired(db: AsyncSession) -> None:
+    """Delete revocations and refresh tokens that can no longer matter."""
+    now = datetime.now(timezone.utc)
+    await db.execute(delete(TokenRevocation).where(TokenRevocation.expires_at <= now))
+    await db.execute(delete(RefreshToken).where(RefreshToken.expires_at <= now))
+    await db.commit()
+
+
+async def revocation_sync_loop(session_factory, interval: float, stop: asyncio.Event) -> None:
+    """
+    Load new revocations every ``interval`` seconds until ``stop`` is set.
+
+    Each round re-reads a window overlapping the previous one, so rows
+    committed late or stamped by a worker with a skewed clock are not missed.
+    Expired rows are deleted at startup and then hourly.
+    """
+    since: Optional[datetime] = None
+    purged_at = None
+    while not stop.is_set():
+        started = datetime.now(timezone.utc)
+        try:
+            async with session_factory() as db:
+                await load_revocations(db, since)
+                if purged_at is None or time.monotonic() - purged_at > PURGE_INTERVAL:
+                    await purge_expired(db)
+                    purged_at = time.monotonic()
+            since = started - timedelta(seconds=max(interval * 2, 30))
+        except (SQLAlchemyError, OSError):
+            # Database unavailable; keep the current list and retry next round
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
@@ -1,23 +1,69 @@
 """Main FastAPI application entry point."""
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, Response
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.api.endpoints import auth, lesson_plans, users, tags
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api.rate_limit import RateLimitMiddleware, admission, rate_limiter
+from app.core.response_cache import CACHE_STATUS_HEADER
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.db.database import engine, Base
+from app.core.hashing import PasswordHashingBusy, password_hasher
+from app.core.keys import key_ring
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, instrument_engine, registry
+from app.db.database import SessionLocal, engine, read_engine, replicas, pool_status, Base
+from app.db.tokens import revocation_sync_loop
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create database tables and start syncing revoked tokens on startup;
+    release pooled connections on shutdown.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    # Stopped rather than cancelled, so no query is abandoned mid-flight
+    stop_revocation_sync = asyncio.Event()
+    revocation_sync = asyncio.create_task(revocation_sync_loop(
+        SessionLocal, settings.REVOCATION_SYNC_SECONDS, stop_revocation_sync
+    ))
+    yield
+    stop_revocation_sync.set()
+    await revocation_sync
+    await engine.dispose()
+    await read_engine.dispose()
+    for replica in replicas.engines:
+        await replica.dispose()
+    password_hasher.shutdown()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="A comprehensive API for creating, managing, and sharing lesson plans",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Shed excess load before it reaches the routes and the database; inside
+# CORS so browsers can read the rejections
+if settings.RATE_LIMIT_ENABLED or settings.MAX_CONCURRENT_REQUESTS:
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=rate_limiter if settings.RATE_LIMIT_ENABLED else None,
+        admission=admission if settings.MAX_CONCURRENT_REQUESTS else None,
+        exempt_paths=["/health", "/health/pool", "/metrics", "/.well-known/jwks.json"],
+    )
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -25,8 +71,59 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After", NEXT_CURSOR_HEADER, CACHE_STATUS_HEADER],
 )
 
+# Compression wraps the CORS middleware and the routes
+if settings.COMPRESSION_ENCODINGS:
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=settings.COMPRESSION_ENCODINGS,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.GZIP_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
+
+# Metrics wrap everything, so latencies and sizes are measured as sent
+if settings.METRICS_ENABLED or settings.DEBUG:
+    for instrumented in [engine, read_engine, *replicas.engines]:
+        instrument_engine(instrumented.sync_engine)
+    app.add_middleware(MetricsMiddleware, server_timing=settings.DEBUG)
+
+
+def pool_metrics():
+    """Pool gauges for the metrics endpoint, read at scrape time."""
+    pools = [("write", engine.pool), ("read", read_engine.pool)]
+    pools += [(f"replica-{index}", replica.pool) for index, replica in enumerate(replicas.engines)]
+    for name, pool in pools:
+        for field, value in pool_status(pool).items():
+            if isinstance(value, (int, float)):
+                documentation = f"Connection pool {field.replace('_', ' ')}."
+                yield f"db_pool_{field}", documentation, {"pool": name}, value
+
+
+registry.add_collector(pool_metrics)
+
+
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    """Shed authentication load when the hashing queue is full."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many authentication requests, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(request: Request, exc: StaleDataError):
+    """Report lost optimistic-concurrency races as conflicts."""
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": "The resource was modified by another request; reload and retry"},
+    )
+
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
@@ -49,3 +146,30 @@ async def root():
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@app.get("/health/pool")
+async def pool_health():
+    """Connection pool usage and checkout wait times for the primary and replica pools."""
+    return {
+        "write": pool_status(engine.pool),
+        "read": pool_status(read_engine.pool),
+        "replicas": replicas.status(),
+    }
+
+
+@app.get("/.well-known/jwks.json", include_in_schema=False)
+async def jwks():
+    """Public keys verifying access tokens, for gateways and other services."""
+    return Response(
+        key_ring.jwks(),
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}"},
+    )
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Request, SQL and connection pool metrics in the Prometheus text format."""
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
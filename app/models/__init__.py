@@ -1,6 +1,14 @@
 """Database models."""
 
-from app.models.user import User
-from app.models.lesson_plan import LessonPlan, Tag, lesson_plan_tags
+from app.models.user import RefreshToken, TokenRevocation, User
+from app.models.lesson_plan import LessonPlan, LessonPlanRevision, Tag, lesson_plan_tags
 
-__all__ = ["User", "LessonPlan", "Tag", "lesson_plan_tags"]
+__all__ = [
+    "User",
+    "RefreshToken",
+    "TokenRevocation",
+    "LessonPlan",
+    "LessonPlanRevision",
+    "Tag",
+    "lesson_plan_tags",
+]
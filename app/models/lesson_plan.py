@@ -1,11 +1,28 @@
 """Lesson plan and tag database models."""
 
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Table, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Integer,
+    String,
+    Text,
+    ForeignKey,
+    DateTime,
+    Table,
+    Enum,
+    Index,
+    UniqueConstraint
+)
+from sqlalchemy.orm import column_property, deferred, relationship
 from sqlalchemy.sql import func
 import enum
 
 from app.db.database import Base
+from app.db.search import register_search_index
+
+
+# Characters of objectives (or procedure) in a lesson plan snippet
+SNIPPET_LENGTH = 200
 
 
 class GradeLevel(str, enum.Enum):
@@ -24,12 +41,20 @@ class DifficultyLevel(str, enum.Enum):
     ADVANCED = "advanced"
 
 
-# Association table for many-to-many relationship between lesson plans and tags
+# Association table for many-to-many relationship between lesson plans and tags.
+# The primary key serves lookups by lesson plan (and rules out duplicate
+# pairs); the reverse index serves tag filters.
 lesson_plan_tags = Table(
     "lesson_plan_tags",
     Base.metadata,
-    Column("lesson_plan_id", Integer, ForeignKey("lesson_plans.id", ondelete="CASCADE")),
-    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"))
+    Column(
+        "lesson_plan_id",
+        Integer,
+        ForeignKey("lesson_plans.id", ondelete="CASCADE"),
+        primary_key=True
+    ),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_lesson_plan_tags_tag_id_lesson_plan_id", "tag_id", "lesson_plan_id")
 )
 
 
@@ -37,6 +62,11 @@ class LessonPlan(Base):
     """Lesson plan model."""
 
     __tablename__ = "lesson_plans"
+    __table_args__ = (
+        # Keyset pagination: newest first, globally and per owner
+        Index("ix_lesson_plans_created_at_id", "created_at", "id"),
+        Index("ix_lesson_plans_owner_id_created_at_id", "owner_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False, index=True)
@@ -45,38 +75,98 @@ class LessonPlan(Base):
     duration_minutes = Column(Integer)
     difficulty = Column(Enum(DifficultyLevel))
 
-    # Content fields
-    objectives = Column(Text)
-    materials = Column(Text)
-    procedure = Column(Text, nullable=False)
-    assessment = Column(Text)
-    notes = Column(Text)
+    # Content fields. These are large and only shown on detail views, so they
+    # are deferred: queries that need them must undefer the "content" group,
+    # and reading one that was not loaded raises instead of lazy loading.
+    objectives = deferred(Column(Text), group="content", raiseload=True)
+    materials = deferred(Column(Text), group="content", raiseload=True)
+    procedure = deferred(Column(Text, nullable=False), group="content", raiseload=True)
+    assessment = deferred(Column(Text), group="content", raiseload=True)
+    notes = deferred(Column(Text), group="content", raiseload=True)
 
     # Version control
-    version = Column(Integer, default=1)
+    version = Column(Integer, default=1, nullable=False)
+
+    # Optimistic concurrency: UPDATE/DELETE statements match on the version
+    # that was loaded and raise StaleDataError if another writer got there
+    # first. The application increments the version itself so that tag-only
+    # edits count as a new version too.
+    __mapper_args__ = {"version_id_col": version, "version_id_generator": False}
 
     # Relationships
     owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     owner = relationship("User", back_populates="lesson_plans")
 
-    tags = relationship("Tag", secondary=lesson_plan_tags, back_populates="lesson_plans")
+    # Tags are serialized with every lesson plan, so batch-load them with a
+    # single SELECT ... WHERE lesson_plan_id IN (...) per result set
+    tags = relationship(
+        "Tag", secondary=lesson_plan_tags, back_populates="lesson_plans", lazy="selectin"
+    )
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
 
+# Short preview for list views, computed by the database so the full text
+# never leaves it
+LessonPlan.snippet = column_property(
+    func.substr(
+        func.coalesce(LessonPlan.__table__.c.objectives, LessonPlan.__table__.c.procedure),
+        1,
+        SNIPPET_LENGTH
+    ),
+    deferred=True,
+    raiseload=True
+)
+
+# Full-text search index over title, subject, objectives and procedure
+register_search_index(LessonPlan.__table__)
+
+
 class Tag(Base):
     """Tag model for categorizing lesson plans."""
 
     __tablename__ = "tags"
+    __table_args__ = (
+        # Most used tags first
+        Index("ix_tags_lesson_plan_count_id", "lesson_plan_count", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False, index=True)
     description = Column(String)
 
+    # Number of lesson plans carrying the tag, maintained by the lesson plan
+    # endpoints in the same transaction as the association rows
+    lesson_plan_count = Column(Integer, default=0, server_default="0", nullable=False)
+
     # Relationships
     lesson_plans = relationship("LessonPlan", secondary=lesson_plan_tags, back_populates="tags")
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class LessonPlanRevision(Base):
+    """
+    Recorded version of a lesson plan's content.
+
+    Snapshots hold the full content as JSON; other revisions hold a delta
+    against the previous revision of the same lesson plan.
+    """
+
+    __tablename__ = "lesson_plan_revisions"
+    __table_args__ = (
+        UniqueConstraint("lesson_plan_id", "version", name="uq_lesson_plan_revisions_version"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    lesson_plan_id = Column(
+        Integer, ForeignKey("lesson_plans.id", ondelete="CASCADE"), nullable=False
+    )
+    version = Column(Integer, nullable=False)
+    is_snapshot = Column(Boolean, nullable=False)
+    content = Column(Text, nullable=False)
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
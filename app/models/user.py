@@ -1,6 +1,6 @@
 """User database model."""
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -24,3 +24,41 @@ class User(Base):
 
     # Relationships
     lesson_plans = relationship("LessonPlan", back_populates="owner", cascade="all, delete-orphan")
+
+
+class RefreshToken(Base):
+    """
+    Long-lived token exchanged for new access tokens.
+
+    Only a SHA-256 hash of the token is stored. Every exchange rotates the
+    token: the old one is marked used and a new one joins the same family,
+    so a used token presented again reveals that the family leaked.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token_hash = Column(String(64), unique=True, nullable=False)
+    family_id = Column(String(32), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True))
+    revoked = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class TokenRevocation(Base):
+    """
+    Revoked refresh token family (``fam:<id>``), covering the access tokens
+    minted from it.
+
+    Rows are only needed until the access tokens they cover have expired;
+    every worker mirrors the live ones in memory.
+    """
+
+    __tablename__ = "token_revocations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token_id = Column(String(64), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=False, index=True)
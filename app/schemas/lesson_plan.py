@@ -1,12 +1,19 @@
 """Lesson plan schemas for API validation."""
 
-from typing import Optional, List
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
+from enum import Enum
 from pydantic import BaseModel, Field
 
 from app.models.lesson_plan import GradeLevel, DifficultyLevel
 
 
+class TagMatch(str, Enum):
+    """How a multi-tag filter matches lesson plans."""
+    ANY = "any"
+    ALL = "all"
+
+
 class TagBase(BaseModel):
     """Base tag schema."""
     name: str = Field(..., min_length=1, max_length=50)
@@ -27,6 +34,17 @@ class Tag(TagBase):
         from_attributes = True
 
 
+class TagWithUsage(Tag):
+    """Tag schema with the number of lesson plans carrying it."""
+    lesson_plan_count: int
+
+
+class TagSort(str, Enum):
+    """Tag list orderings."""
+    NAME = "name"
+    POPULAR = "popular"
+
+
 class LessonPlanBase(BaseModel):
     """Base lesson plan schema."""
     title: str = Field(..., min_length=1, max_length=200)
@@ -77,3 +95,85 @@ class LessonPlanInDB(LessonPlanBase):
 class LessonPlan(LessonPlanInDB):
     """Public lesson plan schema."""
     pass
+
+
+class LessonPlanSummary(BaseModel):
+    """
+    Lesson plan schema for list views.
+
+    The content fields and ``snippet`` are only present when requested
+    through the ``fields`` parameter.
+    """
+    id: int
+    title: str
+    subject: str
+    grade_level: GradeLevel
+    duration_minutes: Optional[int] = None
+    difficulty: Optional[DifficultyLevel] = None
+    version: int
+    owner_id: int
+    tags: List[Tag] = []
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    snippet: Optional[str] = None
+    objectives: Optional[str] = None
+    materials: Optional[str] = None
+    procedure: Optional[str] = None
+    assessment: Optional[str] = None
+    notes: Optional[str] = None
+
+
+class LessonPlanImportResult(BaseModel):
+    """Outcome of a single record of a bulk import."""
+    index: int
+    status: Literal["created", "error"]
+    id: Optional[int] = None
+    errors: Optional[List[Dict[str, Any]]] = None
+
+
+class LessonPlanImportSummary(BaseModel):
+    """Summary of a bulk import with per-record results."""
+    created: int
+    failed: int
+    results: List[LessonPlanImportResult]
+
+
+class FacetCount(BaseModel):
+    """Number of lesson plans with a given field value."""
+    value: str
+    count: int
+
+
+class TagFacetCount(BaseModel):
+    """Number of lesson plans carrying a tag."""
+    id: int
+    name: str
+    count: int
+
+
+class LessonPlanFacets(BaseModel):
+    """Facet counts of the lesson plans matching a filter set."""
+    total: int
+    grade_level: List[FacetCount]
+    difficulty: List[FacetCount]
+    subject: List[FacetCount]
+    tags: List[TagFacetCount]
+
+
+class LessonPlanRevisionInfo(BaseModel):
+    """Metadata of a recorded lesson plan revision."""
+    version: int
+    is_snapshot: bool
+    author_id: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class LessonPlanRevisionContent(LessonPlanBase):
+    """Lesson plan content as of a recorded revision."""
+    version: int
+    tag_ids: List[int] = []
+    author_id: Optional[int] = None
+    created_at: datetime
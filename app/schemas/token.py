@@ -7,9 +7,15 @@ from pydantic import BaseModel
 class Token(BaseModel):
     """JWT token response schema."""
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
 
 
+class RefreshRequest(BaseModel):
+    """Refresh token to exchange (or revoke on logout)."""
+    refresh_token: str
+
+
 class TokenData(BaseModel):
     """Token payload data schema."""
     username: Optional[str] = None
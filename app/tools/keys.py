@@ -0,0 +1,129 @@
+"""
+Generate access token signing keys and schedule their rotation.
+
+    python -m app.tools.keys --manifest keys/jwks.json --alg EdDSA --activate-in-hours 24 --prune
+
+Each run writes a new private key next to the manifest and adds it with an
+``active_from`` time. Run it ahead of time (e.g. weekly from cron, activating
+a day later) so gateways fetch the new public key from the JWKS before it
+signs anything. ``--prune`` drops keys that no longer verify any token and
+deletes their key files. Workers pick the manifest up without a restart.
+"""
+
+import argparse
+import json
+import os
+import secrets
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from app.core.config import settings
+from app.core.keys import ASYMMETRIC_ALGORITHMS, KeyRing, parse_manifest
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--manifest", default=settings.JWT_KEYS_FILE or "keys/jwks.json",
+                        help="Key manifest to update (created if missing)")
+    parser.add_argument("--alg", choices=sorted(ASYMMETRIC_ALGORITHMS), default="EdDSA")
+    parser.add_argument("--rsa-bits", type=int, default=2048)
+    parser.add_argument("--kid", default=None, help="Key id (default: activation date and a random suffix)")
+    parser.add_argument("--activate-in-hours", type=float, default=0.0,
+                        help="Delay before the new key starts signing")
+    parser.add_argument("--prune", action="store_true",
+                        help="Remove keys that no longer verify any token")
+    return parser.parse_args(argv)
+
+
+def generate_private_key(algorithm: str, rsa_bits: int = 2048):
+    if algorithm == "RS256":
+        return rsa.generate_private_key(public_exponent=65537, key_size=rsa_bits)
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    return ed25519.Ed25519PrivateKey.generate()
+
+
+def write_private_key(path: str, key) -> None:
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(descriptor, "wb") as output:
+        output.write(pem)
+
+
+def write_manifest(path: str, manifest: dict) -> None:
+    """Replace the manifest atomically, so workers never read a partial file."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as output:
+        json.dump(manifest, output, indent=2)
+        output.write("\n")
+    os.replace(temporary, path)
+
+
+def rotate(
+    manifest_path: str,
+    algorithm: str = "EdDSA",
+    activate_at: Optional[datetime] = None,
+    kid: Optional[str] = None,
+    prune: bool = False,
+    rsa_bits: int = 2048
+) -> str:
+    """Add a new signing key to the manifest; return its key id."""
+    directory = os.path.dirname(os.path.abspath(manifest_path))
+    os.makedirs(directory, exist_ok=True)
+    manifest = {"keys": []}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as existing:
+            manifest = json.load(existing)
+
+    activate_at = activate_at or datetime.now(timezone.utc)
+    kid = kid or f"{activate_at:%Y-%m-%d}-{secrets.token_hex(4)}"
+    if any(entry["kid"] == kid for entry in manifest["keys"]):
+        raise ValueError(f"Key id {kid!r} already exists")
+
+    key_file = f"{kid}.pem"
+    write_private_key(os.path.join(directory, key_file), generate_private_key(algorithm, rsa_bits))
+    manifest["keys"].append({
+        "kid": kid,
+        "alg": algorithm,
+        "private_key_file": key_file,
+        "active_from": activate_at.isoformat().replace("+00:00", "Z"),
+    })
+
+    if prune:
+        ring = KeyRing(parse_manifest(manifest, directory), settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+        in_use = ring.kids_in_use()
+        for entry in [entry for entry in manifest["keys"] if entry["kid"] not in in_use]:
+            manifest["keys"].remove(entry)
+            key_path = os.path.join(directory, entry.get("private_key_file") or entry["public_key_file"])
+            if os.path.exists(key_path):
+                os.remove(key_path)
+
+    write_manifest(manifest_path, manifest)
+    return kid
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    activate_at = datetime.now(timezone.utc) + timedelta(hours=args.activate_in_hours)
+    kid = rotate(
+        args.manifest,
+        algorithm=args.alg,
+        activate_at=activate_at.replace(microsecond=0),
+        kid=args.kid,
+        prune=args.prune,
+        rsa_bits=args.rsa_bits,
+    )
+    print(f"Added {args.alg} key {kid!r} to {args.manifest}, signing from {activate_at:%Y-%m-%d %H:%M} UTC",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""
+Generate synthetic users, tags and lesson plans at production scale.
+
+    python -m app.tools.seed --plans 1000000 --users 20000 --tags 2000 --reset
+
+Subjects, grade levels, difficulties, text lengths, owners and tags follow
+skewed distributions similar to real catalogs (a few prolific teachers and
+popular tags, long-tailed text lengths). Rows get explicit primary keys and
+are streamed in batches: PostgreSQL (psycopg2) loads them with ``COPY``,
+other databases with ``executemany``. The same seed produces the same rows.
+"""
+
+import argparse
+import csv
+import io
+import math
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import Table, bindparam, create_engine, func, select, text, update
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db.database import Base
+from app.models.lesson_plan import DifficultyLevel, GradeLevel, LessonPlan, Tag, lesson_plan_tags
+from app.models.user import User
+
+# Catalog composition: (value, relative weight)
+SUBJECTS = [
+    ("Mathematics", 18), ("English", 15), ("Science", 12), ("History", 8),
+    ("Biology", 7), ("Computer Science", 7), ("Geography", 5), ("Chemistry", 5),
+    ("Physics", 5), ("Art", 4), ("Music", 4), ("Physical Education", 4),
+    ("Spanish", 3), ("Economics", 2), ("Philosophy", 1),
+]
+GRADE_LEVELS = [
+    (GradeLevel.ELEMENTARY, 30), (GradeLevel.MIDDLE_SCHOOL, 28), (GradeLevel.HIGH_SCHOOL, 27),
+    (GradeLevel.COLLEGE, 10), (GradeLevel.PROFESSIONAL, 5),
+]
+DIFFICULTIES = [
+    (DifficultyLevel.BEGINNER, 45), (DifficultyLevel.INTERMEDIATE, 40),
+    (DifficultyLevel.ADVANCED, 15),
+]
+DURATIONS = [(30, 15), (45, 35), (60, 30), (90, 15), (120, 5)]
+
+TOPICS = [
+    "fractions", "photosynthesis", "poetry", "the industrial revolution", "ecosystems",
+    "linear equations", "geometry proofs", "electric circuits", "persuasive writing",
+    "climate change", "democracy", "probability", "cell division", "kinetic energy",
+    "narrative structure", "plate tectonics", "statistics", "rhythm and meter",
+    "watercolor painting", "loops and functions", "chemical bonds", "Newton's laws",
+    "essay structure", "map projections", "human migration", "supply and demand",
+    "the water cycle", "ancient civilizations", "genetics", "ethics",
+]
+VERBS = [
+    "explain", "compare", "analyze", "describe", "evaluate", "model", "investigate",
+    "summarize", "apply", "classify", "predict", "discuss",
+]
+ACTIVITIES = [
+    "in small groups", "with a partner", "using a worksheet", "through a short video",
+    "with hands-on materials", "in a class discussion", "using an online simulation",
+    "with guided notes", "through a gallery walk", "in a timed challenge",
+]
+MATERIALS = [
+    "whiteboard", "markers", "printed handouts", "laptops", "projector", "graph paper",
+    "calculators", "sticky notes", "lab kits", "textbooks", "index cards", "rulers",
+]
+TAG_WORDS = [
+    "hands-on", "group-work", "stem", "project-based", "inquiry", "differentiated",
+    "assessment", "homework", "lab", "discussion", "reading", "writing", "visual",
+    "technology", "outdoor", "game-based", "review", "exam-prep", "remedial", "enrichment",
+]
+
+# Timestamps are spread over a fixed window so runs are reproducible
+CREATED_START = datetime(2023, 1, 1, tzinfo=timezone.utc)
+CREATED_SPAN = timedelta(days=730)
+
+SENTENCE_POOL_SIZE = 2000
+
+
+@dataclass
+class SeedSpec:
+    """Size and shape of the generated data."""
+    users: int = 1_000
+    tags: int = 500
+    plans: int = 100_000
+    mean_tags_per_plan: float = 3.0
+    max_tags_per_plan: int = 8
+    seed: int = 42
+    password: str = "password123"
+    batch_size: int = 5_000
+
+
+@dataclass
+class SeedResult:
+    """Keys of the generated rows."""
+    usernames: List[str]
+    user_ids: List[int]
+    tag_ids: List[int]
+    plan_ids: range
+    links: int = 0
+    seconds: float = 0.0
+    method: str = "executemany"
+
+
+class WeightedChoice:
+    """Fast repeated sampling from a fixed weighted population."""
+
+    def __init__(self, population: Sequence[Any], weights: Sequence[float]):
+        self.population = list(population)
+        self.cum_weights = list(accumulate(weights))
+
+    def pick(self, rng: random.Random) -> Any:
+        return rng.choices(self.population, cum_weights=self.cum_weights)[0]
+
+    def sample(self, rng: random.Random, k: int) -> List[Any]:
+        return rng.choices(self.population, cum_weights=self.cum_weights, k=k)
+
+
+def zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """Weights of ranks ``1..count`` under a Zipf law."""
+    return [1.0 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def lognormal_count(rng: random.Random, median: float, sigma: float, low: int, high: int) -> int:
+    """Long-tailed count with the given median, clipped to ``[low, high]``."""
+    return max(low, min(high, round(rng.lognormvariate(math.log(median), sigma))))
+
+
+def poisson(rng: random.Random, mean: float) -> int:
+    """Poisson-distributed count (Knuth's method; fine for small means)."""
+    limit, count, product = math.exp(-mean), 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+class TextGenerator:
+    """Lesson plan prose assembled from a pool of pre-generated sentences."""
+
+    def __init__(self, rng: random.Random):
+        self.sentences = [self._sentence(rng) for _ in range(SENTENCE_POOL_SIZE)]
+
+    @staticmethod
+    def _sentence(rng: random.Random) -> str:
+        return (
+            f"Students {rng.choice(VERBS)} {rng.choice(TOPICS)} {rng.choice(ACTIVITIES)}, "
+            f"then {rng.choice(VERBS)} how it relates to {rng.choice(TOPICS)}."
+        )
+
+    def paragraph(self, rng: random.Random, sentences: int) -> str:
+        return " ".join(rng.choices(self.sentences, k=sentences))
+
+    def steps(self, rng: random.Random, count: int) -> str:
+        return "\n".join(
+            f"{number}. {sentence}"
+            for number, sentence in enumerate(rng.choices(self.sentences, k=count), start=1)
+        )
+
+
+class ExecutemanyLoader:
+    """Insert batches with the DBAPI's ``executemany``."""
+
+    method = "executemany"
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+
+    def load(self, table: Table, rows: List[Dict[str, Any]]) -> None:
+        if rows:
+            self.conn.execute(table.insert(), rows)
+
+    def finish(self, tables: Sequence[Table]) -> None:
+        pass
+
+
+class CopyLoader:
+    """Stream batches into PostgreSQL with ``COPY ... FROM STDIN`` (psycopg2)."""
+
+    method = "copy"
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self.cursor = conn.connection.dbapi_connection.cursor()
+
+    @staticmethod
+    def _value(value: Any) -> Any:
+        # SQLAlchemy stores enum members by name
+        if isinstance(value, (GradeLevel, DifficultyLevel)):
+            return value.name
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    def load(self, table: Table, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([self._value(row[column]) for column in columns])
+        buffer.seek(0)
+        self.cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+
+    def finish(self, tables: Sequence[Table]) -> None:
+        # Rows carried explicit ids; move the sequences past them
+        for table in tables:
+            self.conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"(SELECT max(id) FROM {table.name}))"
+            ))
+
+
+def make_loader(conn: Connection):
+    """COPY on PostgreSQL with psycopg2, executemany everywhere else."""
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2":
+        return CopyLoader(conn)
+    return ExecutemanyLoader(conn)
+
+
+def _next_id(conn: Connection, table: Table) -> int:
+    return conn.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar() + 1
+
+
+def _batches(total: int, size: int) -> Iterator[range]:
+    for start in range(0, total, size):
+        yield range(start, min(start + size, total))
+
+
+def seed(
+    url: str,
+    spec: SeedSpec,
+    reset: bool = False,
+    progress=None
+) -> SeedResult:
+    """
+    Create the schema at ``url`` (a sync SQLAlchemy URL) and load ``spec``.
+
+    With ``reset`` every table is dropped first. Usernames, emails and tag
+    names are unique per seed, so a database can hold one dataset per seed.
+    ``progress`` is called with ``(table, rows_loaded, rows_total)``.
+    """
+    started = time.perf_counter()
+    rng = random.Random(spec.seed)
+    engine = create_engine(url)
+    if reset:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    users_table, tags_table = User.__table__, Tag.__table__
+    plans_table = LessonPlan.__table__
+    texts = TextGenerator(rng)
+    subjects = WeightedChoice(*zip(*SUBJECTS))
+    grade_levels = WeightedChoice(*zip(*GRADE_LEVELS))
+    difficulties = WeightedChoice(*zip(*DIFFICULTIES))
+    durations = WeightedChoice(*zip(*DURATIONS))
+    hashed_password = get_password_hash(spec.password)
+
+    with engine.begin() as conn:
+        loader = make_loader(conn)
+        first_user_id = _next_id(conn, users_table)
+        first_tag_id = _next_id(conn, tags_table)
+        first_plan_id = _next_id(conn, plans_table)
+
+        user_ids = list(range(first_user_id, first_user_id + spec.users))
+        usernames = [f"teacher_{spec.seed}_{index}" for index in range(spec.users)]
+        for batch in _batches(spec.users, spec.batch_size):
+            loader.load(users_table, [
+                {
+                    "id": user_ids[index],
+                    "email": f"{usernames[index]}@example.com",
+                    "username": usernames[index],
+                    "hashed_password": hashed_password,
+                    "full_name": f"Teacher {index}",
+                    "is_active": True,
+                    "is_superuser": False,
+                    "created_at": CREATED_START,
+                }
+                for index in batch
+            ])
+            if progress:
+                progress("users", batch.stop, spec.users)
+
+        # Few prolific teachers, a long tail of occasional ones; tags likewise
+        owners = WeightedChoice(user_ids, zipf_weights(spec.users, 0.8))
+        tag_ids = list(range(first_tag_id, first_tag_id + spec.tags))
+        for batch in _batches(spec.tags, spec.batch_size):
+            loader.load(tags_table, [
+                {
+                    "id": tag_ids[index],
+                    "name": f"{TAG_WORDS[index % len(TAG_WORDS)]}-{spec.seed}-{index}",
+                    "description": f"Lessons tagged {TAG_WORDS[index % len(TAG_WORDS)]}",
+                    "lesson_plan_count": 0,
+                }
+                for index in batch
+            ])
+        popular_tags = WeightedChoice(tag_ids, zipf_weights(spec.tags))
+        tag_usage: Counter = Counter()
+
+        plan_ids = range(first_plan_id, first_plan_id + spec.plans)
+        links = 0
+        for batch in _batches(spec.plans, spec.batch_size):
+            plans, plan_tags = [], []
+            for index in batch:
+                plan_id = plan_ids[index]
+                topic = rng.choice(TOPICS)
+                plans.append({
+                    "id": plan_id,
+                    "title": f"{topic[0].upper()}{topic[1:]}: {rng.choice(VERBS)} and practice",
+                    "subject": subjects.pick(rng),
+                    "grade_level": grade_levels.pick(rng),
+                    "duration_minutes": durations.pick(rng),
+                    "difficulty": difficulties.pick(rng),
+                    "objectives": texts.paragraph(rng, lognormal_count(rng, 2, 0.5, 1, 10)),
+                    "materials": ", ".join(rng.sample(MATERIALS, rng.randint(1, 6))),
+                    "procedure": texts.steps(rng, lognormal_count(rng, 8, 0.6, 2, 60)),
+                    "assessment": texts.paragraph(rng, lognormal_count(rng, 2, 0.6, 1, 12)),
+                    "notes": texts.paragraph(rng, 1) if rng.random() < 0.4 else None,
+                    "version": 1,
+                    "owner_id": owners.pick(rng),
+                    "created_at": CREATED_START + CREATED_SPAN * (
+                        (index + rng.random()) / spec.plans
+                    ),
+                })
+                if tag_ids:
+                    fan_out = min(poisson(rng, spec.mean_tags_per_plan), spec.max_tags_per_plan)
+                    for tag_id in set(popular_tags.sample(rng, fan_out)):
+                        plan_tags.append({"lesson_plan_id": plan_id, "tag_id": tag_id})
+                        tag_usage[tag_id] += 1
+            loader.load(plans_table, plans)
+            loader.load(lesson_plan_tags, plan_tags)
+            links += len(plan_tags)
+            if progress:
+                progress("lesson_plans", batch.stop, spec.plans)
+
+        # Usage counts are known from generation; no need to count the links
+        if tag_usage:
+            conn.execute(
+                update(tags_table)
+                .where(tags_table.c.id == bindparam("tag_id"))
+                .values(lesson_plan_count=bindparam("usage")),
+                [{"tag_id": tag_id, "usage": usage} for tag_id, usage in tag_usage.items()],
+            )
+
+        loader.finish([users_table, tags_table, plans_table])
+
+    engine.dispose()
+    return SeedResult(
+        usernames=usernames,
+        user_ids=user_ids,
+        tag_ids=tag_ids,
+        plan_ids=plan_ids,
+        links=links,
+        seconds=time.perf_counter() - started,
+        method=loader.method,
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    defaults = SeedSpec()
+    parser = argparse.ArgumentParser(description="Generate synthetic lesson plan data")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL,
+                        help="Sync SQLAlchemy URL (default: DATABASE_URL)")
+    parser.add_argument("--reset", action="store_true",
+                        help="Drop and recreate every table first")
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--tags", type=int, default=defaults.tags)
+    parser.add_argument("--plans", type=int, default=defaults.plans)
+    parser.add_argument("--mean-tags-per-plan", type=float, default=defaults.mean_tags_per_plan)
+    parser.add_argument("--max-tags-per-plan", type=int, default=defaults.max_tags_per_plan)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--password", default=defaults.password,
+                        help="Password of every generated user")
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    spec = SeedSpec(
+        users=args.users,
+        tags=args.tags,
+        plans=args.plans,
+        mean_tags_per_plan=args.mean_tags_per_plan,
+        max_tags_per_plan=args.max_tags_per_plan,
+        seed=args.seed,
+        password=args.password,
+        batch_size=args.batch_size,
+    )
+    started = time.perf_counter()
+
+    def report(table: str, loaded: int, total: int) -> None:
+        rate = loaded / max(time.perf_counter() - started, 1e-9)
+        print(f"\r{table}: {loaded}/{total} ({rate:,.0f} rows/s)", end="", file=sys.stderr)
+        if loaded == total:
+            print(file=sys.stderr)
+
+    result = seed(args.database_url, spec, reset=args.reset, progress=report)
+    print(
+        f"Loaded {spec.users} users, {spec.tags} tags, {spec.plans} lesson plans and "
+        f"{result.links} tag links with {result.method} in {result.seconds:.1f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Load tests and benchmarks for the Lesson Plan API.
+
+``python -m benchmarks.run`` seeds a synthetic dataset, drives every router
+through an in-process ASGI client or a multi-worker uvicorn server, and
+writes a JSON baseline; ``python -m benchmarks.compare`` diffs two baselines.
+"""
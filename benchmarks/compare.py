@@ -0,0 +1,81 @@
+"""
+Compare two benchmark baselines written by ``benchmarks.run``.
+
+    python -m benchmarks.compare before.json after.json --threshold 10
+
+Exits with status 1 when a scenario's p95 latency grows by more than
+``--threshold`` percent, its throughput drops by more than that, or it
+issues more SQL statements per request than before.
+"""
+
+import argparse
+import json
+import sys
+from typing import List, Optional, Tuple
+
+
+def change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    """Relative change in percent (None when either side is missing or zero)."""
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(before: dict, after: dict, threshold: float) -> Tuple[List[str], List[str]]:
+    """Table rows and regression messages for the scenarios present in both baselines."""
+    rows, regressions = [], []
+    for name in sorted(set(before["scenarios"]) & set(after["scenarios"])):
+        old, new = before["scenarios"][name], after["scenarios"][name]
+        throughput = change(old["throughput_rps"], new["throughput_rps"])
+        p95 = change(old["latency_ms"]["p95"], new["latency_ms"]["p95"])
+        p99 = change(old["latency_ms"]["p99"], new["latency_ms"]["p99"])
+        old_queries, new_queries = old["queries_per_request"], new["queries_per_request"]
+
+        rows.append(
+            f"{name:<20} {_percent(throughput):>9}  {_percent(p95):>9}  {_percent(p99):>9}  "
+            f"{_queries(old_queries, new_queries):>12}  {new['errors'] - old['errors']:>+7}"
+        )
+        if p95 is not None and p95 > threshold:
+            regressions.append(f"{name}: p95 latency {p95:+.1f}%")
+        if throughput is not None and throughput < -threshold:
+            regressions.append(f"{name}: throughput {throughput:+.1f}%")
+        if old_queries is not None and new_queries is not None and new_queries > old_queries:
+            regressions.append(f"{name}: queries per request {old_queries} -> {new_queries}")
+    return rows, regressions
+
+
+def _percent(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:+.1f}%"
+
+
+def _queries(old: Optional[float], new: Optional[float]) -> str:
+    return "n/a" if old is None or new is None else f"{old:g} -> {new:g}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark baselines")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Allowed p95 latency / throughput change in percent")
+    args = parser.parse_args(argv)
+
+    with open(args.before) as before_file, open(args.after) as after_file:
+        before, after = json.load(before_file), json.load(after_file)
+
+    for side, baseline in (("before", before), ("after", after)):
+        meta = baseline["meta"]
+        print(f"{side:<7} commit {meta['commit']}  {meta['mode']}  {meta['dataset']}")
+    if before["meta"]["dataset"] != after["meta"]["dataset"]:
+        print("warning: the baselines were measured on different datasets")
+
+    rows, regressions = compare(before, after, args.threshold)
+    print(f"{'scenario':<20} {'rps':>9}  {'p95':>9}  {'p99':>9}  {'queries':>12}  {'errors':>7}")
+    print("\n".join(rows))
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Reproducible synthetic datasets for benchmarks, generated by ``app.tools.seed``."""
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import create_engine, select
+
+from app.models.lesson_plan import LessonPlan
+from app.tools.seed import SeedSpec, seed
+
+PASSWORD = "benchmark-password"
+
+# Words that occur in the generated lesson plans, for search requests
+SEARCH_TERMS = [
+    "fractions", "photosynthesis", "poetry", "ecosystems", "probability", "democracy",
+    "genetics", "statistics", "equations", "circuits", "migration", "civilizations",
+]
+
+# Lesson plans in the dataset sampled for request parameters
+SAMPLE_SIZE = 1000
+
+
+def dataset_spec(
+    plans: int = 10_000,
+    users: int = 100,
+    tags: int = 200,
+    max_tags_per_plan: int = 5,
+    seed: int = 42
+) -> SeedSpec:
+    """Seed spec of a benchmark dataset (every user has ``PASSWORD``)."""
+    return SeedSpec(
+        users=users,
+        tags=tags,
+        plans=plans,
+        max_tags_per_plan=max_tags_per_plan,
+        seed=seed,
+        password=PASSWORD,
+    )
+
+
+@dataclass
+class Dataset:
+    """What scenarios need to know about a seeded dataset."""
+    spec: SeedSpec
+    usernames: List[str]
+    tag_ids: List[int]
+    # (id, created_at) of sampled lesson plans, newest first
+    plan_keys: List[Tuple[int, datetime]]
+    # Lesson plans owned by the first (and most prolific) user, who runs the
+    # write scenarios
+    owned_plan_ids: List[int]
+    search_terms: List[str] = field(default_factory=lambda: list(SEARCH_TERMS))
+
+    def describe(self) -> dict:
+        return {
+            "plans": self.spec.plans,
+            "users": self.spec.users,
+            "tags": self.spec.tags,
+            "mean_tags_per_plan": self.spec.mean_tags_per_plan,
+            "max_tags_per_plan": self.spec.max_tags_per_plan,
+            "seed": self.spec.seed,
+        }
+
+
+def seed_database(url: str, spec: SeedSpec, reset: bool = False) -> Dataset:
+    """
+    Seed ``spec`` into ``url`` (a sync SQLAlchemy URL) and sample request parameters.
+
+    With ``reset`` every table is dropped first; otherwise the database must
+    not already hold a dataset with the same seed.
+    """
+    result = seed(url, spec, reset=reset)
+    rng = random.Random(spec.seed)
+    sample = rng.sample(result.plan_ids, min(SAMPLE_SIZE, len(result.plan_ids)))
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        plan_keys = conn.execute(
+            select(LessonPlan.id, LessonPlan.created_at)
+            .where(LessonPlan.id.in_(sample))
+            .order_by(LessonPlan.created_at.desc(), LessonPlan.id.desc())
+        ).all()
+        owned_plan_ids = list(conn.execute(
+            select(LessonPlan.id)
+            .where(LessonPlan.owner_id == result.user_ids[0])
+            .order_by(LessonPlan.id)
+            .limit(SAMPLE_SIZE)
+        ).scalars())
+    engine.dispose()
+
+    return Dataset(
+        spec=spec,
+        usernames=result.usernames,
+        tag_ids=result.tag_ids,
+        plan_keys=[(plan_id, created_at) for plan_id, created_at in plan_keys],
+        owned_plan_ids=owned_plan_ids,
+    )
@@ -0,0 +1,196 @@
+"""Drive scenarios against the API and summarize throughput, latency and SQL work."""
+
+import asyncio
+import math
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+import httpx
+
+from benchmarks.dataset import PASSWORD
+from benchmarks.scenarios import API, Context, Scenario
+
+# Emitted by MetricsMiddleware when the server runs with DEBUG enabled
+_SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def queries_from_headers(headers: httpx.Headers) -> Optional[int]:
+    """SQL statement count reported in the Server-Timing header, if any."""
+    match = _SERVER_TIMING_QUERIES.search(headers.get("server-timing", ""))
+    return int(match.group(1)) if match else None
+
+
+@dataclass
+class ScenarioResult:
+    """Raw measurements of one scenario."""
+    name: str
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    queries: List[int] = field(default_factory=list)
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        requests = len(latencies)
+        return {
+            "requests": requests,
+            "errors": sum(self.errors.values()),
+            "error_statuses": dict(sorted(self.errors.items())),
+            "throughput_rps": round(requests / self.elapsed, 2) if self.elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(sum(latencies) / requests * 1000, 3) if requests else 0.0,
+                "p50": round(percentile(latencies, 0.50) * 1000, 3),
+                "p95": round(percentile(latencies, 0.95) * 1000, 3),
+                "p99": round(percentile(latencies, 0.99) * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+            # None when the server does not report Server-Timing (DEBUG off)
+            "queries_per_request": (
+                round(sum(self.queries) / len(self.queries), 2) if self.queries else None
+            ),
+        }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    context: Context,
+    requests: int,
+    concurrency: int,
+    warmup: int = 0,
+    seed: int = 0
+) -> ScenarioResult:
+    """
+    Send ``requests`` requests of ``scenario`` from ``concurrency`` workers.
+
+    The first ``warmup`` requests are sent but not measured. Every worker has
+    its own RNG derived from ``seed``, so runs issue the same requests.
+    """
+    result = ScenarioResult(scenario.name)
+
+    async def send(rng: random.Random, worker: int, measure: bool) -> None:
+        spec = scenario.build(context, rng, worker)
+        started = time.perf_counter()
+        response = await client.request(
+            spec.method,
+            spec.url,
+            params=spec.params,
+            json=spec.json,
+            data=spec.data,
+            headers=spec.headers,
+        )
+        elapsed = time.perf_counter() - started
+        if not measure:
+            return
+        result.latencies.append(elapsed)
+        if response.status_code not in scenario.expected_status:
+            status = str(response.status_code)
+            result.errors[status] = result.errors.get(status, 0) + 1
+        queries = queries_from_headers(response.headers)
+        if queries is not None:
+            result.queries.append(queries)
+
+    warmup_rng = random.Random(f"{seed}:{scenario.name}:warmup")
+    for _ in range(warmup):
+        await send(warmup_rng, 0, measure=False)
+
+    remaining = requests
+
+    async def worker(index: int) -> None:
+        nonlocal remaining
+        rng = random.Random(f"{seed}:{scenario.name}:{index}")
+        while remaining > 0:
+            remaining -= 1
+            await send(rng, index, measure=True)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+async def authenticate(client: httpx.AsyncClient, context: Context) -> None:
+    """Log in as the first dataset user, who owns the lesson plans scenarios edit."""
+    response = await client.post(f"{API}/auth/login", data={
+        "username": context.dataset.usernames[0],
+        "password": PASSWORD,
+    })
+    response.raise_for_status()
+    context.token = response.json()["access_token"]
+
+
+@asynccontextmanager
+async def in_process_client(app, timeout: float = 60.0) -> AsyncIterator[httpx.AsyncClient]:
+    """Client calling ``app`` directly, with its lifespan running."""
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark", timeout=timeout
+        ) as client:
+            yield client
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def uvicorn_server(
+    workers: int,
+    env: Dict[str, str],
+    startup_timeout: float = 60.0
+) -> Iterator[str]:
+    """
+    Run ``app.main:app`` under uvicorn with ``workers`` processes.
+
+    Yields the server's base URL once ``/health`` answers; the server is
+    stopped on exit.
+    """
+    port = _free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        env={**os.environ, **env},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not become ready in time")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
@@ -0,0 +1,149 @@
+"""Benchmark scenarios: one kind of request each, parameterized from the dataset."""
+
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from app.api.pagination import encode_cursor
+from benchmarks.dataset import PASSWORD, Dataset
+
+API = "/api/v1"
+PAGE_SIZE = 20
+
+
+@dataclass
+class Context:
+    """Dataset plus the state scenarios share during a run."""
+    dataset: Dataset
+    token: Optional[str] = None
+
+    @property
+    def auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+@dataclass
+class RequestSpec:
+    """Arguments of a single HTTP request."""
+    method: str
+    url: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    json: Any = None
+    data: Optional[Dict[str, str]] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+# Builds the next request from the context, a seeded RNG and the worker index
+RequestBuilder = Callable[[Context, random.Random, int], RequestSpec]
+
+
+@dataclass
+class Scenario:
+    """A named request kind and the statuses that count as success."""
+    name: str
+    build: RequestBuilder
+    expected_status: tuple = (200,)
+
+
+def _list(params: Dict[str, Any]) -> RequestSpec:
+    return RequestSpec("GET", f"{API}/lesson-plans/", params={"limit": PAGE_SIZE, **params})
+
+
+def _tag_ids(context: Context, rng: random.Random) -> str:
+    tags = context.dataset.tag_ids
+    return ",".join(str(tag_id) for tag_id in rng.sample(tags, min(2, len(tags))))
+
+
+def list_recent(context: Context, rng: random.Random, worker: int) -> RequestSpec:
+    return _list({"skip": rng.randrange(0, 5) * PAGE_SIZE})
+
+
+def search(context: Context, rng: random.Random, worker: int) -> RequestSpec:
+    return _list({"search": rng.choice(context.dataset.search_terms)})
+
+
+def tag_filter_any(context: Context, rng: random.Random, worker: int) -> RequestSpec:
+    return _list({"tag_ids": _tag_ids(context, rng)})
+
+
+def tag_filter_all(context: Context, rng: random.Random, worker: int) -> RequestSpec:
+    return _list({"tag_ids": _tag_ids(context, rng), "tag_match": "all"})
+
+
+def deep_page_cursor(context: Context, rng: random.Random, worker: int) -> RequestSpec:
+    plan_id, created_at = rng.choice(context.dataset.plan_keys)
+    return _list({"cursor": encode_cursor(created_at, plan_id)})
+
+
+def deep_page_offset(context: Context, rng: random.Random, worker: int) -> RequestSpec:
+    return _list({"skip": rng.randrange(0, max(1, context.dataset.spec.plans - PAGE_SIZE))})
+
+
+def get_lesson_plan(context: Context, rng: random.Random, worker: int) -> RequestSpec:
+    plan_id, _ = rng.choice(context.dataset.plan_keys)
+    return RequestSpec("GET", f"{API}/lesson-plans/{plan_id}")
+
+
+def facets(context: Context, rng: random.Random, worker: int) -> RequestSpec:
+    return RequestSpec("GET", f"{API}/lesson-plans/facets", params={
+        "search": rng.choice(context.dataset.search_terms)
+    })
+
+
+def popular_tags(context: Context, rng: random.Random, worker: int) -> RequestSpec:
+    return RequestSpec("GET", f"{API}/tags/popular", params={"limit": PAGE_SIZE})
+
+
+def current_user(context: Context, rng: random.Random, worker: int) -> RequestSpec:
+    return RequestSpec("GET", f"{API}/users/me", headers=context.auth_headers)
+
+
+def login(context: Context, rng: random.Random, worker: int) -> RequestSpec:
+    return RequestSpec("POST", f"{API}/auth/login", data={
+        "username": rng.choice(context.dataset.usernames),
+        "password": PASSWORD,
+    })
+
+
+def create_lesson_plan(context: Context, rng: random.Random, worker: int) -> RequestSpec:
+    term = rng.choice(context.dataset.search_terms)
+    return RequestSpec("POST", f"{API}/lesson-plans/", headers=context.auth_headers, json={
+        "title": f"Benchmark {term} lesson",
+        "subject": "Science",
+        "grade_level": "middle_school",
+        "duration_minutes": 45,
+        "difficulty": "beginner",
+        "objectives": f"Students explore {term}.",
+        "procedure": f"Introduce {term}, then practice in groups and discuss.",
+        "tag_ids": rng.sample(context.dataset.tag_ids, min(3, len(context.dataset.tag_ids))),
+    })
+
+
+def update_lesson_plan(context: Context, rng: random.Random, worker: int) -> RequestSpec:
+    # Each worker edits its own lesson plan, so optimistic locking never conflicts
+    owned = context.dataset.owned_plan_ids
+    return RequestSpec(
+        "PUT",
+        f"{API}/lesson-plans/{owned[worker % len(owned)]}",
+        headers=context.auth_headers,
+        json={"notes": f"Revised {rng.random():.6f}"},
+    )
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("list_recent", list_recent),
+    Scenario("search", search),
+    Scenario("tag_filter_any", tag_filter_any),
+    Scenario("tag_filter_all", tag_filter_all),
+    Scenario("deep_page_cursor", deep_page_cursor),
+    Scenario("deep_page_offset", deep_page_offset),
+    Scenario("get_lesson_plan", get_lesson_plan),
+    Scenario("facets", facets),
+    Scenario("popular_tags", popular_tags),
+    Scenario("current_user", current_user),
+    Scenario("login", login),
+    Scenario("create_lesson_plan", create_lesson_plan, expected_status=(201,)),
+    Scenario("update_lesson_plan", update_lesson_plan),
+]
+
+SCENARIOS_BY_NAME = {scenario.name: scenario for scenario in SCENARIOS}
@@ -1,30 +1,51 @@
 """Pytest configuration and fixtures."""
 
+import os
+from contextlib import contextmanager
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+# Cheap bcrypt cost for tests; must be set before the app reads its settings
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
 
-from app.main import app
-from app.db.database import Base, get_db
-from app.core.security import create_access_token
+from app.main import app  # noqa: E402
+from app.api.dependencies import token_cache, user_cache  # noqa: E402
+from app.core.response_cache import create_backend, response_cache  # noqa: E402
+from app.db.database import Base, get_db, get_read_db  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.core.metrics import instrument_engine  # noqa: E402
+from app.api import rate_limit  # noqa: E402
+from app.core.revocation import revocations  # noqa: E402
 
 # Test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
+# Sync engine for schema setup and direct data access from fixtures
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine serving the application; each TestClient runs its own event
+# loop, so connections must not be pooled across tests
+async_engine = create_async_engine(
+    "sqlite+aiosqlite:///./test.db", poolclass=NullPool
+)
+AsyncTestingSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+instrument_engine(async_engine.sync_engine)
+
 
-def override_get_db():
+async def override_get_db():
     """Override database dependency for testing."""
-    try:
-        db = TestingSessionLocal()
+    async with AsyncTestingSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 @pytest.fixture(scope="function")
@@ -38,12 +59,46 @@ def db():
 @pytest.fixture(scope="function")
 def client(db):
     """Create a test client with database override."""
+    token_cache.clear()
+    user_cache.clear()
+    revocations.clear()
+    response_cache.backend = create_backend()
+    rate_limit.rate_limiter.store = rate_limit.create_store()
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def count_queries():
+    """
+    Count SQL statements the application executes against the test database.
+
+    Usage::
+
+        with count_queries() as statements:
+            client.get(...)
+        assert len(statements) == 2
+    """
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        sync_engine = async_engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
+
+
 @pytest.fixture
 def test_user(client):
     """Create a test user and return user data with token."""
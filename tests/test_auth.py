@@ -1,6 +1,19 @@
 """Tests for authentication endpoints."""
 
+import asyncio
+
 import pytest
+from passlib.hash import bcrypt
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.hashing import PasswordHasher, password_hasher
+from app.core.revocation import RevocationList, revocations
+from app.core.security import pwd_context
+from app.db.tokens import load_revocations, revoke
+from app.models.user import User
 
 
 def test_register_user(client):
@@ -59,6 +72,7 @@ def test_login_success(client, test_user):
 
     data = response.json()
     assert "access_token" in data
+    assert data["refresh_token"]
     assert data["token_type"] == "bearer"
 
 
@@ -82,3 +96,201 @@ def test_login_nonexistent_user(client):
 
     response = client.post("/api/v1/auth/login", data=login_data)
     assert response.status_code == 401
+
+
+def test_login_rehashes_outdated_password_hash(client, db, test_user):
+    """Test login upgrades a hash made with a different bcrypt cost."""
+    username = test_user["user_data"]["username"]
+    password = test_user["user_data"]["password"]
+
+    user = db.query(User).filter(User.username == username).one()
+    user.hashed_password = bcrypt.using(rounds=5).hash(password)
+    db.commit()
+
+    response = client.post("/api/v1/auth/login", data={"username": username, "password": password})
+    assert response.status_code == 200
+
+    db.expire_all()
+    assert not pwd_context.needs_update(user.hashed_password)
+    assert pwd_context.verify(password, user.hashed_password)
+
+
+def test_login_shed_when_hashing_queue_full(client, test_user, monkeypatch):
+    """Test login is rejected fast with 503 when the hashing pool is saturated."""
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+
+    login_data = {
+        "username": test_user["user_data"]["username"],
+        "password": test_user["user_data"]["password"]
+    }
+    response = client.post("/api/v1/auth/login", data=login_data)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_password_hasher_round_trip():
+    """Test hashing and verification through the worker pool."""
+    hasher = PasswordHasher(max_workers=1, max_pending=1)
+
+    async def round_trip():
+        hashed = await hasher.hash("password123")
+        return await hasher.verify("password123", hashed), await hasher.verify("wrong", hashed)
+
+    try:
+        assert asyncio.run(round_trip()) == (True, False)
+    finally:
+        hasher.shutdown()
+
+
+def test_token_user_claims_skip_user_lookup(
+    client, test_user, test_lesson_plan_data, count_queries, monkeypatch
+):
+    """Test tokens with uid/active claims authorize writes without a user query."""
+    monkeypatch.setattr(settings, "TOKEN_USER_CLAIMS", True)
+    login_data = {
+        "username": test_user["user_data"]["username"],
+        "password": test_user["user_data"]["password"]
+    }
+    token = client.post("/api/v1/auth/login", data=login_data).json()["access_token"]
+
+    with count_queries() as statements:
+        response = client.post(
+            "/api/v1/lesson-plans/",
+            json=test_lesson_plan_data,
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+    assert response.status_code == 201
+    assert not any("FROM users" in statement for statement in statements)
+
+
+def login(client, test_user):
+    login_data = {
+        "username": test_user["user_data"]["username"],
+        "password": test_user["user_data"]["password"]
+    }
+    return client.post("/api/v1/auth/login", data=login_data).json()
+
+
+def test_refresh_rotates_tokens(client, test_user):
+    """Test a refresh token is exchanged for a new pair exactly once."""
+    tokens = login(client, test_user)
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    response = client.get(
+        "/api/v1/users/me", headers={"Authorization": f"Bearer {rotated['access_token']}"}
+    )
+    assert response.status_code == 200
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert response.status_code == 200
+
+
+def test_refresh_token_reuse_revokes_family(client, test_user):
+    """Test replaying a used refresh token revokes every token of its login."""
+    tokens = login(client, test_user)
+    rotated = client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    ).json()
+    headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+    # Both the newest access token and the newest refresh token are dead
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 401
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert response.status_code == 401
+
+    # Other logins are unaffected
+    assert client.get(
+        "/api/v1/users/me", headers={"Authorization": f"Bearer {test_user['token']}"}
+    ).status_code == 200
+
+
+def test_refresh_unknown_token(client):
+    """Test an unknown refresh token is rejected."""
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": "unknown"})
+    assert response.status_code == 401
+
+
+def test_logout_revokes_tokens(client, test_user):
+    """Test logging out revokes the refresh token and its access tokens."""
+    tokens = login(client, test_user)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+
+    response = client.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 204
+
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 401
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_revocations_load_from_database(client, test_user):
+    """Test a worker picks up revocations recorded by another one."""
+    tokens = login(client, test_user)
+    client.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    # Simulate a worker that did not handle the logout
+    revocations.clear()
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+
+    async def sync():
+        engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+        try:
+            async with async_sessionmaker(engine)() as db:
+                return await load_revocations(db)
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(sync()) == 1
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 401
+
+
+def test_revocations_apply_once_committed(db):
+    """Test a rolled back revocation never reaches the in-memory list."""
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+        try:
+            async with async_sessionmaker(engine)() as session:
+                await revoke(session, "fam:rolled-back")
+                assert "fam:rolled-back" not in revocations
+                await session.rollback()
+
+                await revoke(session, "fam:committed")
+                await session.commit()
+        finally:
+            await engine.dispose()
+
+    revocations.clear()
+    asyncio.run(scenario())
+    assert "fam:rolled-back" not in revocations
+    assert "fam:committed" in revocations
+
+
+def test_revocation_list_expires_entries(monkeypatch):
+    """Test revocations are forgotten once the tokens they cover have expired."""
+    now = 1_000_000.0
+    monkeypatch.setattr("app.core.revocation.time.time", lambda: now)
+    revoked = RevocationList(bucket_seconds=60)
+
+    revoked.add("fam:a", now + 30)
+    revoked.add("fam:b", now + 600)
+    revoked.add("fam:expired", now - 120)
+    assert revoked.is_revoked({"fam": "a"})
+    assert revoked.is_revoked({"sub": "testuser", "fam": "b"})
+    assert not revoked.is_revoked({"sub": "testuser"})
+    assert len(revoked) == 2
+
+    now += 120
+    assert not revoked.is_revoked({"fam": "a"})
+    assert revoked.is_revoked({"fam": "b"})
+    assert len(revoked) == 1
@@ -0,0 +1,70 @@
+"""Tests for the benchmark dataset, harness statistics and baseline comparison."""
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models.lesson_plan import LessonPlan, Tag
+from benchmarks.compare import compare
+from benchmarks.dataset import dataset_spec, seed_database
+from benchmarks.harness import ScenarioResult, percentile, queries_from_headers
+from benchmarks.run import parse_args
+
+
+def test_seed_database_is_reproducible(tmp_path):
+    """Test the same spec seeds the same rows and maintains tag counts."""
+    spec = dataset_spec(plans=30, users=3, tags=5, max_tags_per_plan=3, seed=7)
+    first = seed_database(f"sqlite:///{tmp_path / 'first.db'}", spec)
+    second = seed_database(f"sqlite:///{tmp_path / 'second.db'}", spec)
+
+    assert first.plan_keys == second.plan_keys
+    assert first.owned_plan_ids == second.owned_plan_ids
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'first.db'}")
+    with Session(engine) as db:
+        assert db.query(LessonPlan).count() == 30
+        for tag in db.query(Tag).filter(Tag.id.in_(first.tag_ids)):
+            assert tag.lesson_plan_count == len(tag.lesson_plans)
+    engine.dispose()
+
+
+def test_multi_worker_runs_need_a_server_database():
+    """Test several uvicorn workers are not pointed at one SQLite file."""
+    with pytest.raises(SystemExit):
+        parse_args(["--mode", "uvicorn", "--workers", "4"])
+    assert parse_args(["--mode", "uvicorn", "--workers", "1"]).workers == 1
+    args = parse_args(["--mode", "uvicorn", "--database-url", "postgresql://localhost/bench"])
+    assert args.workers == 4
+
+
+def test_summary_percentiles_and_queries():
+    """Test latency percentiles use the nearest rank and queries come from Server-Timing."""
+    assert percentile([1, 2, 3, 4], 0.5) == 2
+    assert percentile([1, 2, 3, 4], 0.99) == 4
+    assert queries_from_headers(httpx.Headers({
+        "Server-Timing": 'db;dur=1.50;desc="3 queries", app;dur=4.00'
+    })) == 3
+    assert queries_from_headers(httpx.Headers()) is None
+
+    result = ScenarioResult("list", elapsed=2.0, latencies=[0.01, 0.02], queries=[2, 3])
+    summary = result.summary()
+    assert summary["throughput_rps"] == 1.0
+    assert summary["queries_per_request"] == 2.5
+
+
+def test_compare_flags_regressions():
+    """Test slower, chattier scenarios are reported as regressions."""
+    def baseline(rps, p95, queries):
+        return {"scenarios": {"search": {
+            "throughput_rps": rps,
+            "latency_ms": {"p95": p95, "p99": p95},
+            "queries_per_request": queries,
+            "errors": 0,
+        }}}
+
+    _, regressions = compare(baseline(100, 10, 2), baseline(98, 10.5, 2), threshold=10)
+    assert regressions == []
+
+    _, regressions = compare(baseline(100, 10, 2), baseline(50, 20, 3), threshold=10)
+    assert len(regressions) == 3
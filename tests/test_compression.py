@@ -0,0 +1,97 @@
+"""Tests for response compression."""
+
+import asyncio
+import gzip
+
+import pytest
+from starlette.responses import Response, StreamingResponse
+
+from app.core.compression import CompressionMiddleware, accepted_encodings
+
+
+def run(app, accept_encoding="gzip", request_headers=()):
+    """Drive ``app`` through the middleware and collect the sent messages."""
+    messages = []
+
+    async def receive():
+        # Nothing to read; block like a client that stays connected
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept_encoding.encode()), *request_headers],
+    }
+    middleware = CompressionMiddleware(app, encodings=["br", "gzip"], minimum_size=100)
+    asyncio.run(middleware(scope, receive, send))
+
+    headers = {key.decode(): value.decode() for key, value in messages[0]["headers"]}
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return headers, body
+
+
+def test_accepted_encodings():
+    """Codings with q=0 are not accepted."""
+    assert accepted_encodings("gzip;q=0.5, br;q=0, identity") == {"gzip", "identity"}
+
+
+def test_large_response_is_gzipped():
+    """Responses over the threshold are compressed with an accepted encoding."""
+    payload = b"x" * 1000
+    headers, body = run(Response(payload))
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(body)
+    assert gzip.decompress(body) == payload
+
+
+def test_compressed_responses_get_their_own_etag(client, test_user, test_lesson_plan_data):
+    """Compressed and identity representations have distinct strong ETags that both revalidate."""
+    etag = '"lp-1-v1"'
+    headers, _ = run(Response(b"x" * 1000, headers={"ETag": etag}))
+    assert headers["etag"] == '"lp-1-v1-gzip"'
+    headers, _ = run(Response(b"x" * 1000, headers={"ETag": etag}), "identity")
+    assert headers["etag"] == etag
+
+    # A 304 names the representation the client revalidated
+    not_modified = Response(status_code=304, headers={"ETag": etag})
+    headers, _ = run(not_modified, request_headers=[(b"if-none-match", b'"lp-1-v1-gzip"')])
+    assert headers["etag"] == '"lp-1-v1-gzip"'
+
+    lesson_plan_id = client.post(
+        "/api/v1/lesson-plans/",
+        json={**test_lesson_plan_data, "procedure": "x" * 2000},
+        headers=test_user["headers"]
+    ).json()["id"]
+    url = f"/api/v1/lesson-plans/{lesson_plan_id}"
+    compressed = client.get(url, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    assert compressed.endswith('-gzip"')
+    assert client.get(url, headers={"If-None-Match": compressed}).status_code == 304
+    response = client.put(
+        url, json={"title": "Updated"}, headers={**test_user["headers"], "If-Match": compressed}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("accept_encoding, size", [("gzip", 10), ("identity", 1000)])
+def test_response_passes_through(accept_encoding, size):
+    """Small responses and clients without a supported encoding are left alone."""
+    headers, body = run(Response(b"x" * size), accept_encoding)
+    assert "content-encoding" not in headers
+    assert body == b"x" * size
+
+
+def test_streaming_response_is_compressed_incrementally():
+    """Streaming bodies are compressed chunk by chunk."""
+    async def chunks():
+        for index in range(50):
+            yield f"line {index}\n".encode()
+
+    headers, body = run(StreamingResponse(chunks()))
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert gzip.decompress(body) == b"".join(f"line {index}\n".encode() for index in range(50))
@@ -0,0 +1,105 @@
+"""Tests for health and connection pool endpoints."""
+
+import asyncio
+import os
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.requests import Request
+
+from app.core.response_cache import InMemoryBackend, response_cache
+from app.db import database
+from app.db.database import InstrumentedPool, ReplicaSet, pool_status
+
+
+def test_health_check(client):
+    """Test the health check endpoint."""
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "healthy"}
+
+
+def test_pool_health(client):
+    """Test pool metrics are reported for both pools."""
+    response = client.get("/health/pool")
+    assert response.status_code == 200
+    assert set(response.json()) == {"write", "read", "replicas"}
+
+
+def test_instrumented_pool_tracks_checkouts():
+    """Test the instrumented pool reports checked-out and idle connections."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///./test.db", poolclass=InstrumentedPool, pool_size=2
+    )
+
+    async def use_pool():
+        async with engine.connect():
+            during = pool_status(engine.pool)
+        after = pool_status(engine.pool)
+        await engine.dispose()
+        return during, after
+
+    during, after = asyncio.run(use_pool())
+
+    assert during["checked_out"] == 1
+    assert after["checked_out"] == 0
+    assert after["idle"] == 1
+    assert after["checkouts"] == 1
+    assert after["wait_seconds_max"] >= 0
+
+
+def read_session_bind(method="GET", token="Bearer abc"):
+    """Run get_db (for unsafe methods) and get_read_db; return the read session's engine."""
+    scope = {
+        "type": "http",
+        "method": method,
+        "headers": [(b"authorization", token.encode())],
+        "client": ("127.0.0.1", 1234),
+    }
+
+    async def route():
+        if method != "GET":
+            async for _ in database.get_db(Request(scope)):
+                pass
+        dependency = database.get_read_db(Request({**scope, "method": "GET"}))
+        db = await dependency.__anext__()
+        bind = db.bind
+        await dependency.aclose()
+        return bind
+
+    return asyncio.run(route())
+
+
+def test_read_replica_routing(monkeypatch):
+    """Test reads rotate over healthy replicas and fall back to the primary."""
+    first = create_async_engine("sqlite+aiosqlite:///./replica_first.db")
+    second = create_async_engine("sqlite+aiosqlite:///./replica_second.db")
+    broken = create_async_engine("sqlite+aiosqlite:////nonexistent/replica.db")
+    replicas = ReplicaSet([first, broken, second], retry_after=60)
+    monkeypatch.setattr(database, "replicas", replicas)
+    monkeypatch.setattr(response_cache, "backend", InMemoryBackend(max_entries=100, ttl=60))
+    database.recent_writers.clear()
+
+    try:
+        assert read_session_bind() is first
+        # The broken replica is skipped and taken out of rotation
+        assert read_session_bind() is second
+        assert [replica["healthy"] for replica in replicas.status()] == [True, False, True]
+        assert read_session_bind() is second
+        assert read_session_bind() is first
+
+        # A client that just wrote reads its writes from the primary
+        assert read_session_bind(method="POST") is database.read_engine
+        assert read_session_bind(token="Bearer other") in (first, second)
+        # Other workers see the write through the shared backend
+        database.recent_writers.clear()
+        assert read_session_bind() is database.read_engine
+
+        replicas.mark_down(first)
+        replicas.mark_down(second)
+        assert read_session_bind(token="Bearer other") is database.read_engine
+    finally:
+        for engine in (first, second, broken):
+            asyncio.run(engine.dispose())
+        for path in ("replica_first.db", "replica_second.db"):
+            if os.path.exists(path):
+                os.remove(path)
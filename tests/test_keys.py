@@ -0,0 +1,116 @@
+"""Tests for token signing keys, rotation and the JWKS endpoint."""
+
+import json
+import time
+
+import orjson
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jose import jwt
+
+import app.main
+from app.core.config import settings
+from app.core.keys import KeyRing, SigningKey, b64encode
+from app.core.security import decode_access_token
+from app.tools.keys import rotate
+
+PRIVATE_KEYS = {
+    "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+
+def claims(lifetime: float = 60) -> dict:
+    return {"sub": "testuser", "exp": int(time.time() + lifetime)}
+
+
+@pytest.mark.parametrize("algorithm", sorted(PRIVATE_KEYS))
+def test_asymmetric_round_trip(algorithm):
+    """Test tokens verify with their key and are rejected once tampered with or expired."""
+    ring = KeyRing([SigningKey("k1", algorithm, PRIVATE_KEYS[algorithm]())])
+    token = ring.encode(claims())
+
+    assert ring.decode(token)["sub"] == "testuser"
+    header, payload, signature = token.split(".")
+    forged = b64encode(orjson.dumps({**claims(), "sub": "admin"}))
+    assert ring.decode(f"{header}.{forged}.{signature}") is None
+    assert ring.decode(ring.encode(claims(lifetime=-1))) is None
+
+    (jwk,) = orjson.loads(ring.jwks())["keys"]
+    assert jwk["kid"] == "k1" and jwk["alg"] == algorithm
+    assert "d" not in jwk
+
+
+def test_rs256_tokens_verify_with_published_jwk():
+    """Test a standard JWT library verifies tokens against the JWKS entry."""
+    ring = KeyRing([SigningKey("k1", "RS256", PRIVATE_KEYS["RS256"]())])
+    (jwk,) = orjson.loads(ring.jwks())["keys"]
+    assert jwt.decode(ring.encode(claims()), jwk, algorithms=["RS256"])["sub"] == "testuser"
+
+
+def test_algorithm_is_fixed_by_the_key():
+    """Test a token cannot pick a weaker algorithm than its key's."""
+    ring = KeyRing([SigningKey("k1", "EdDSA", PRIVATE_KEYS["EdDSA"]())])
+    header = b64encode(orjson.dumps({"alg": "none", "kid": "k1"}))
+    assert ring.decode(f"{header}.{b64encode(orjson.dumps(claims()))}.") is None
+    assert ring.decode("not-a-token") is None
+
+
+def test_tokens_without_kid_use_secret_key():
+    """Test tokens signed with SECRET_KEY before key ids existed stay valid."""
+    token = jwt.encode(claims(), settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    assert decode_access_token(token)["sub"] == "testuser"
+
+
+def test_scheduled_rotation(monkeypatch):
+    """Test the successor signs once active and the old key verifies for one token lifetime."""
+    now = time.time()
+    monkeypatch.setattr("app.core.keys.time.time", lambda: now)
+    old = SigningKey("old", "EdDSA", PRIVATE_KEYS["EdDSA"](), active_from=now - 3600)
+    new = SigningKey("new", "EdDSA", PRIVATE_KEYS["EdDSA"](), active_from=now + 60)
+    ring = KeyRing([old, new], token_lifetime=600)
+
+    # The successor is published before it signs
+    assert ring.kids_in_use() == {"old", "new"}
+    token = ring.encode({"sub": "testuser", "exp": now + 600})
+    assert jwt.get_unverified_header(token)["kid"] == "old"
+
+    now += 120
+    assert jwt.get_unverified_header(ring.encode(claims()))["kid"] == "new"
+    assert ring.decode(token)["sub"] == "testuser"
+
+    now += 600
+    assert ring.kids_in_use() == {"new"}
+    assert [jwk["kid"] for jwk in orjson.loads(ring.jwks())["keys"]] == ["new"]
+
+
+def test_rotate_tool_updates_manifest(tmp_path, monkeypatch):
+    """Test the rotation tool adds keys, prunes retired ones and workers reload them."""
+    manifest = str(tmp_path / "jwks.json")
+    first = rotate(manifest, algorithm="ES256")
+    ring = KeyRing(path=manifest, token_lifetime=600, reload_seconds=0)
+    token = ring.encode(claims())
+
+    second = rotate(manifest, algorithm="EdDSA")
+    assert jwt.get_unverified_header(ring.encode(claims()))["kid"] == second
+    assert ring.decode(token)["sub"] == "testuser"
+
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_EXPIRE_MINUTES", 0)
+    third = rotate(manifest, algorithm="EdDSA", prune=True)
+    with open(manifest) as saved:
+        assert [entry["kid"] for entry in json.load(saved)["keys"]] == [third]
+    assert not (tmp_path / f"{first}.pem").exists()
+
+
+def test_jwks_endpoint(client, monkeypatch):
+    """Test the JWKS lists public keys only and may be cached."""
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert response.json() == {"keys": []}
+
+    ring = KeyRing([SigningKey("k1", "EdDSA", PRIVATE_KEYS["EdDSA"]())])
+    monkeypatch.setattr(app.main, "key_ring", ring)
+    response = client.get("/.well-known/jwks.json")
+    assert [jwk["kid"] for jwk in response.json()["keys"]] == ["k1"]
+    assert response.headers["Cache-Control"] == f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}"
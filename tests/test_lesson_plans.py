@@ -1,6 +1,13 @@
 """Tests for lesson plan endpoints."""
 
+import json
+
 import pytest
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app.core.response_cache import create_backend, response_cache
+from app.models.lesson_plan import LessonPlan
 
 
 def test_create_lesson_plan(client, test_user, test_lesson_plan_data):
@@ -193,3 +200,501 @@ def test_filter_lesson_plans_by_grade_level(client, test_user, test_lesson_plan_
     data = response.json()
     assert len(data) > 0
     assert data[0]["grade_level"] == "high_school"
+
+
+def test_search_lesson_plans_ranked_by_relevance(client, test_user, test_lesson_plan_data):
+    """Test full-text search covers objectives and ranks title matches first."""
+    client.post(
+        "/api/v1/lesson-plans/",
+        json={**test_lesson_plan_data, "title": "Loops", "objectives": "Practice recursion basics"},
+        headers=test_user["headers"]
+    )
+    client.post(
+        "/api/v1/lesson-plans/",
+        json={**test_lesson_plan_data, "title": "Recursion Deep Dive"},
+        headers=test_user["headers"]
+    )
+
+    response = client.get("/api/v1/lesson-plans/?search=recurs")
+    assert response.status_code == 200
+
+    titles = [plan["title"] for plan in response.json()]
+    assert titles == ["Recursion Deep Dive", "Loops"]
+
+
+def test_search_index_follows_updates_and_deletes(client, test_user, test_lesson_plan_data):
+    """Test the search index is kept in sync with lesson plan changes."""
+    create_response = client.post(
+        "/api/v1/lesson-plans/",
+        json=test_lesson_plan_data,
+        headers=test_user["headers"]
+    )
+    lesson_plan_id = create_response.json()["id"]
+
+    client.put(
+        f"/api/v1/lesson-plans/{lesson_plan_id}",
+        json={"title": "Photosynthesis Lab"},
+        headers=test_user["headers"]
+    )
+    assert len(client.get("/api/v1/lesson-plans/?search=photosynthesis").json()) == 1
+
+    client.delete(f"/api/v1/lesson-plans/{lesson_plan_id}", headers=test_user["headers"])
+    assert client.get("/api/v1/lesson-plans/?search=photosynthesis").json() == []
+
+
+def test_cursor_pagination_lesson_plans(client, test_user, test_lesson_plan_data):
+    """Test paging through lesson plans with the opaque next cursor."""
+    for index in range(3):
+        client.post(
+            "/api/v1/lesson-plans/",
+            json={**test_lesson_plan_data, "title": f"Plan {index}"},
+            headers=test_user["headers"]
+        )
+
+    first_page = client.get("/api/v1/lesson-plans/?limit=2")
+    assert [plan["title"] for plan in first_page.json()] == ["Plan 2", "Plan 1"]
+    cursor = first_page.headers["X-Next-Cursor"]
+
+    second_page = client.get("/api/v1/lesson-plans/", params={"limit": 2, "cursor": cursor})
+    assert [plan["title"] for plan in second_page.json()] == ["Plan 0"]
+    assert "X-Next-Cursor" not in second_page.headers
+
+    my_page = client.get(
+        "/api/v1/lesson-plans/my",
+        params={"limit": 2, "cursor": cursor},
+        headers=test_user["headers"]
+    )
+    assert [plan["title"] for plan in my_page.json()] == ["Plan 0"]
+
+
+def test_invalid_cursor(client):
+    """Test a malformed cursor is rejected."""
+    response = client.get("/api/v1/lesson-plans/?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_lesson_plan_etag_conditional_get(client, test_user, test_lesson_plan_data):
+    """Test If-None-Match returns 304 until the lesson plan changes."""
+    lesson_plan_id = client.post(
+        "/api/v1/lesson-plans/",
+        json=test_lesson_plan_data,
+        headers=test_user["headers"]
+    ).json()["id"]
+
+    etag = client.get(f"/api/v1/lesson-plans/{lesson_plan_id}").headers["ETag"]
+    response = client.get(
+        f"/api/v1/lesson-plans/{lesson_plan_id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    client.put(
+        f"/api/v1/lesson-plans/{lesson_plan_id}",
+        json={"title": "Updated Title"},
+        headers=test_user["headers"]
+    )
+    response = client.get(
+        f"/api/v1/lesson-plans/{lesson_plan_id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_lesson_plan_etag_revalidates_without_loading_content(
+    client, test_user, test_lesson_plan_data, count_queries
+):
+    """Test an uncached conditional GET only reads the version column."""
+    lesson_plan_id = client.post(
+        "/api/v1/lesson-plans/",
+        json=test_lesson_plan_data,
+        headers=test_user["headers"]
+    ).json()["id"]
+    etag = client.get(f"/api/v1/lesson-plans/{lesson_plan_id}").headers["ETag"]
+    response_cache.backend = create_backend()
+
+    with count_queries() as statements:
+        response = client.get(
+            f"/api/v1/lesson-plans/{lesson_plan_id}", headers={"If-None-Match": etag}
+        )
+
+    assert response.status_code == 304
+    assert len(statements) == 1
+    assert "procedure" not in statements[0]
+
+
+def test_lesson_plan_list_etag(client, test_user, test_lesson_plan_data):
+    """Test list pages answer If-None-Match and change when a plan is added."""
+    client.post("/api/v1/lesson-plans/", json=test_lesson_plan_data, headers=test_user["headers"])
+
+    etag = client.get("/api/v1/lesson-plans/").headers["ETag"]
+    response_cache.backend = create_backend()
+    response = client.get("/api/v1/lesson-plans/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    client.post("/api/v1/lesson-plans/", json=test_lesson_plan_data, headers=test_user["headers"])
+    response = client.get("/api/v1/lesson-plans/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+def test_update_lesson_plan_if_match(client, test_user, test_lesson_plan_data):
+    """Test updates based on a stale ETag are rejected with 412."""
+    create_response = client.post(
+        "/api/v1/lesson-plans/",
+        json=test_lesson_plan_data,
+        headers=test_user["headers"]
+    )
+    lesson_plan_id = create_response.json()["id"]
+    etag = create_response.headers["ETag"]
+
+    response = client.put(
+        f"/api/v1/lesson-plans/{lesson_plan_id}",
+        json={"title": "First Edit"},
+        headers={**test_user["headers"], "If-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    response = client.put(
+        f"/api/v1/lesson-plans/{lesson_plan_id}",
+        json={"title": "Second Edit"},
+        headers={**test_user["headers"], "If-Match": etag}
+    )
+    assert response.status_code == 412
+    assert client.get(f"/api/v1/lesson-plans/{lesson_plan_id}").json()["title"] == "First Edit"
+
+
+def test_concurrent_update_conflict(client, test_user, test_lesson_plan_data):
+    """Test a write that loses a race with another writer returns 409."""
+    lesson_plan_id = client.post(
+        "/api/v1/lesson-plans/",
+        json=test_lesson_plan_data,
+        headers=test_user["headers"]
+    ).json()["id"]
+
+    def concurrent_edit(session, flush_context, instances):
+        # Another writer commits a new version between our read and our write
+        session.execute(
+            update(LessonPlan)
+            .where(LessonPlan.id == lesson_plan_id)
+            .values(version=LessonPlan.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    event.listen(Session, "before_flush", concurrent_edit)
+    try:
+        response = client.put(
+            f"/api/v1/lesson-plans/{lesson_plan_id}",
+            json={"title": "Lost Update"},
+            headers=test_user["headers"]
+        )
+    finally:
+        event.remove(Session, "before_flush", concurrent_edit)
+
+    assert response.status_code == 409
+    data = client.get(f"/api/v1/lesson-plans/{lesson_plan_id}").json()
+    assert data["title"] == test_lesson_plan_data["title"]
+
+
+def test_bulk_import_lesson_plans(client, test_user, test_lesson_plan_data, monkeypatch):
+    """Test bulk importing NDJSON with per-record results across batches."""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "BULK_IMPORT_BATCH_SIZE", 2)
+
+    tag = client.post("/api/v1/tags/", json={"name": "imported"}, headers=test_user["headers"])
+    tag_id = tag.json()["id"]
+
+    records = [
+        {**test_lesson_plan_data, "title": "Plan A", "tag_ids": [tag_id, tag_id, 999]},
+        {**test_lesson_plan_data, "title": ""},
+        {**test_lesson_plan_data, "title": "Plan B"},
+        {**test_lesson_plan_data, "title": "Plan C", "tag_ids": [tag_id]},
+    ]
+    lines = [json.dumps(records[0]), json.dumps(records[1]), "{not json", "",
+             json.dumps(records[2]), json.dumps(records[3])]
+    response = client.post(
+        "/api/v1/lesson-plans/import",
+        content="\n".join(lines).encode(),
+        headers={**test_user["headers"], "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["created"] == 3
+    assert data["failed"] == 2
+    assert [result["status"] for result in data["results"]] == [
+        "created", "error", "error", "created", "created"
+    ]
+    assert data["results"][1]["errors"][0]["loc"] == ["title"]
+
+    plan_a = client.get(f"/api/v1/lesson-plans/{data['results'][0]['id']}").json()
+    assert plan_a["version"] == 1
+    assert [tag["name"] for tag in plan_a["tags"]] == ["imported"]
+
+    titles = [plan["title"] for plan in client.get("/api/v1/lesson-plans/").json()]
+    assert sorted(titles) == ["Plan A", "Plan B", "Plan C"]
+
+
+def test_bulk_import_json_array(client, test_user, test_lesson_plan_data):
+    """Test bulk importing a JSON array body."""
+    records = [{**test_lesson_plan_data, "title": f"Plan {i}"} for i in range(3)]
+    response = client.post(
+        "/api/v1/lesson-plans/import",
+        content=json.dumps(records).encode(),
+        headers={**test_user["headers"], "Content-Type": "application/json"}
+    )
+    assert response.status_code == 200
+    assert response.json()["created"] == 3
+
+
+def test_export_lesson_plans(client, test_user, test_lesson_plan_data, monkeypatch, count_queries):
+    """Test streaming the filtered catalog as NDJSON in cursor batches."""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+
+    tag = client.post("/api/v1/tags/", json={"name": "export"}, headers=test_user["headers"])
+    for i in range(5):
+        client.post(
+            "/api/v1/lesson-plans/",
+            json={**test_lesson_plan_data, "title": f"Plan {i}", "tag_ids": [tag.json()["id"]]},
+            headers=test_user["headers"]
+        )
+    client.post(
+        "/api/v1/lesson-plans/",
+        json={**test_lesson_plan_data, "title": "Other", "grade_level": "college"},
+        headers=test_user["headers"]
+    )
+
+    with count_queries() as statements:
+        response = client.get("/api/v1/lesson-plans/export?grade_level=high_school")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    plans = [json.loads(line) for line in response.text.splitlines()]
+    assert [plan["title"] for plan in plans] == [f"Plan {i}" for i in reversed(range(5))]
+    assert all(plan["tags"][0]["name"] == "export" for plan in plans)
+    # One streamed SELECT plus one tag load per batch of two
+    assert len(statements) == 4
+
+
+def test_export_lesson_plans_csv(client, test_user, test_lesson_plan_data):
+    """Test exporting the catalog as CSV."""
+    import csv
+    import io
+
+    tag = client.post("/api/v1/tags/", json={"name": "csv"}, headers=test_user["headers"])
+    client.post(
+        "/api/v1/lesson-plans/",
+        json={**test_lesson_plan_data, "tag_ids": [tag.json()["id"]]},
+        headers=test_user["headers"]
+    )
+
+    response = client.get("/api/v1/lesson-plans/export?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["title"] == test_lesson_plan_data["title"]
+    assert rows[0]["procedure"] == test_lesson_plan_data["procedure"]
+    assert rows[0]["grade_level"] == "high_school"
+    assert rows[0]["tags"] == "csv"
+
+
+def test_lesson_plan_facets(client, test_user, test_lesson_plan_data, count_queries):
+    """Test facet counts for the current filter set in a single query."""
+    headers = test_user["headers"]
+    python = client.post("/api/v1/tags/", json={"name": "python"}, headers=headers).json()
+    intro = client.post("/api/v1/tags/", json={"name": "intro"}, headers=headers).json()
+
+    for plan in [
+        {"grade_level": "high_school", "difficulty": "beginner", "tag_ids": [python["id"], intro["id"]]},
+        {"grade_level": "high_school", "difficulty": "advanced", "tag_ids": [python["id"]]},
+        {"grade_level": "college", "difficulty": None, "subject": "Math", "tag_ids": []},
+    ]:
+        client.post("/api/v1/lesson-plans/", json={**test_lesson_plan_data, **plan}, headers=headers)
+
+    with count_queries() as statements:
+        response = client.get("/api/v1/lesson-plans/facets")
+    assert response.status_code == 200
+    assert len(statements) == 1
+
+    data = response.json()
+    assert data["total"] == 3
+    assert data["grade_level"] == [
+        {"value": "high_school", "count": 2}, {"value": "college", "count": 1}
+    ]
+    assert data["difficulty"] == [
+        {"value": "advanced", "count": 1}, {"value": "beginner", "count": 1}
+    ]
+    assert data["subject"] == [
+        {"value": "Computer Science", "count": 2}, {"value": "Math", "count": 1}
+    ]
+    assert data["tags"] == [
+        {"id": python["id"], "name": "python", "count": 2},
+        {"id": intro["id"], "name": "intro", "count": 1},
+    ]
+
+    filtered = client.get("/api/v1/lesson-plans/facets?difficulty=beginner").json()
+    assert filtered["total"] == 1
+    assert filtered["grade_level"] == [{"value": "high_school", "count": 1}]
+    assert [tag["name"] for tag in filtered["tags"]] == ["intro", "python"]
+
+
+def test_filter_lesson_plans_by_tags_any_and_all(client, test_user, test_lesson_plan_data):
+    """Test that tag filters return each lesson plan once, with any/all semantics."""
+    headers = test_user["headers"]
+    tag_a = client.post("/api/v1/tags/", json={"name": "a"}, headers=headers).json()["id"]
+    tag_b = client.post("/api/v1/tags/", json={"name": "b"}, headers=headers).json()["id"]
+
+    for title, tag_ids in [("Both", [tag_a, tag_b]), ("Only A", [tag_a]), ("Only B", [tag_b])]:
+        client.post(
+            "/api/v1/lesson-plans/",
+            json={**test_lesson_plan_data, "title": title, "tag_ids": tag_ids},
+            headers=headers
+        )
+
+    response = client.get(f"/api/v1/lesson-plans/?tag_ids={tag_a},{tag_b}&limit=2")
+    first_page = [plan["title"] for plan in response.json()]
+    assert first_page == ["Only B", "Only A"]
+    next_page = client.get(
+        f"/api/v1/lesson-plans/?tag_ids={tag_a},{tag_b}&limit=2"
+        f"&cursor={response.headers['X-Next-Cursor']}"
+    )
+    assert [plan["title"] for plan in next_page.json()] == ["Both"]
+
+    response = client.get(f"/api/v1/lesson-plans/?tag_ids={tag_a},{tag_b}&tag_match=all")
+    assert [plan["title"] for plan in response.json()] == ["Both"]
+
+    response = client.get(f"/api/v1/lesson-plans/?tag_ids={tag_a},{tag_a}&tag_match=all")
+    assert [plan["title"] for plan in response.json()] == ["Only A", "Both"]
+
+    facets = client.get(f"/api/v1/lesson-plans/facets?tag_ids={tag_a},{tag_b}").json()
+    assert facets["total"] == 3
+
+
+def test_list_lesson_plans_summary_fields(client, test_user, test_lesson_plan_data, count_queries):
+    """Test list views return summaries and only load content fields on request."""
+    client.post("/api/v1/lesson-plans/", json=test_lesson_plan_data, headers=test_user["headers"])
+
+    with count_queries() as statements:
+        response = client.get("/api/v1/lesson-plans/")
+    plan = response.json()[0]
+    assert plan["title"] == test_lesson_plan_data["title"]
+    assert "procedure" not in plan and "snippet" not in plan
+    assert "procedure" not in statements[0]
+
+    response = client.get("/api/v1/lesson-plans/?fields=snippet,procedure")
+    plan = response.json()[0]
+    assert plan["procedure"] == test_lesson_plan_data["procedure"]
+    assert plan["snippet"] == test_lesson_plan_data["objectives"][:200]
+    assert "objectives" not in plan
+
+    my_plan = client.get(
+        "/api/v1/lesson-plans/my?fields=notes", headers=test_user["headers"]
+    ).json()[0]
+    assert my_plan["notes"] == test_lesson_plan_data["notes"]
+    assert "procedure" not in my_plan
+
+    # Different fieldsets are different representations of the same page
+    assert response.headers["ETag"] != client.get("/api/v1/lesson-plans/").headers["ETag"]
+
+    response = client.get("/api/v1/lesson-plans/?fields=procedure,password")
+    assert response.status_code == 400
+
+    detail = client.get(f"/api/v1/lesson-plans/{plan['id']}").json()
+    assert detail["objectives"] == test_lesson_plan_data["objectives"]
+
+
+def test_list_serialization_matches_detail(client, test_user, test_lesson_plan_data):
+    """Test row-built list items serialize like the validated detail response."""
+    tag_id = client.post(
+        "/api/v1/tags/", json={"name": "serialization"}, headers=test_user["headers"]
+    ).json()["id"]
+    created = client.post(
+        "/api/v1/lesson-plans/",
+        json={**test_lesson_plan_data, "tag_ids": [tag_id]},
+        headers=test_user["headers"]
+    ).json()
+
+    detail = client.get(f"/api/v1/lesson-plans/{created['id']}").json()
+    summary = client.get("/api/v1/lesson-plans/?fields=objectives").json()[0]
+    assert summary == {key: detail[key] for key in summary}
+    assert summary["tags"] == detail["tags"]
+
+
+def test_list_lesson_plans_compressed(client, test_user, test_lesson_plan_data):
+    """Test large list responses are gzip-compressed for clients that accept it."""
+    for index in range(10):
+        client.post(
+            "/api/v1/lesson-plans/",
+            json={**test_lesson_plan_data, "title": f"Plan {index}"},
+            headers=test_user["headers"]
+        )
+
+    response = client.get("/api/v1/lesson-plans/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 10
+
+
+def test_lesson_plan_revision_history(client, test_user, test_lesson_plan_data, monkeypatch, db):
+    """Test every update is recorded as a delta and any version can be rebuilt."""
+    from app.core.config import settings
+    from app.models.lesson_plan import LessonPlanRevision
+    monkeypatch.setattr(settings, "REVISION_SNAPSHOT_INTERVAL", 3)
+
+    headers = test_user["headers"]
+    tag_id = client.post("/api/v1/tags/", json={"name": "history"}, headers=headers).json()["id"]
+    procedure = "".join(f"{step}. Step number {step} of the lesson\n" for step in range(1, 41))
+    lesson_plan = client.post(
+        "/api/v1/lesson-plans/",
+        json={**test_lesson_plan_data, "procedure": procedure},
+        headers=headers
+    ).json()
+    lesson_plan_id = lesson_plan["id"]
+
+    procedures = {1: procedure}
+    for version in range(2, 6):
+        procedures[version] = procedures[version - 1].replace(
+            f"{version}. Step number", f"{version}. Revised step"
+        )
+        update = {"procedure": procedures[version]}
+        if version == 3:
+            update["title"] = "Renamed"
+            update["tag_ids"] = [tag_id]
+        client.put(f"/api/v1/lesson-plans/{lesson_plan_id}", json=update, headers=headers)
+
+    revisions = client.get(f"/api/v1/lesson-plans/{lesson_plan_id}/revisions").json()
+    assert [revision["version"] for revision in revisions] == [5, 4, 3, 2, 1]
+    assert [revision["is_snapshot"] for revision in revisions] == [False, True, False, False, True]
+
+    for version in range(1, 6):
+        revision = client.get(f"/api/v1/lesson-plans/{lesson_plan_id}/revisions/{version}").json()
+        assert revision["version"] == version
+        assert revision["procedure"] == procedures[version]
+        assert revision["title"] == ("Renamed" if version >= 3 else test_lesson_plan_data["title"])
+        assert revision["tag_ids"] == ([tag_id] if version >= 3 else [])
+        assert revision["grade_level"] == "high_school"
+
+    # A one-line edit to a long text field is stored as a small patch
+    delta = db.query(LessonPlanRevision).filter_by(lesson_plan_id=lesson_plan_id, version=2).one()
+    assert len(delta.content) < len(procedure) / 5
+
+    response = client.get(f"/api/v1/lesson-plans/{lesson_plan_id}/revisions/9")
+    assert response.status_code == 404
+    response = client.get("/api/v1/lesson-plans/999/revisions")
+    assert response.status_code == 404
+
+
+def test_imported_lesson_plans_start_revision_history(client, test_user, test_lesson_plan_data):
+    """Test bulk imported lesson plans get an initial snapshot revision."""
+    client.post(
+        "/api/v1/lesson-plans/import",
+        content=json.dumps([test_lesson_plan_data]).encode(),
+        headers={**test_user["headers"], "Content-Type": "application/json"}
+    )
+    lesson_plan_id = client.get("/api/v1/lesson-plans/").json()[0]["id"]
+
+    revision = client.get(f"/api/v1/lesson-plans/{lesson_plan_id}/revisions/1").json()
+    assert revision["procedure"] == test_lesson_plan_data["procedure"]
+    assert revision["difficulty"] == "beginner"
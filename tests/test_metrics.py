@@ -0,0 +1,111 @@
+"""Tests for request metrics and the metrics endpoint."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from starlette.responses import Response
+
+from app.core import metrics
+from app.core.metrics import Counter, Histogram
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test histogram samples are cumulative and end with +Inf, sum and count."""
+    histogram = Histogram("latency_seconds", "Latency.", ["route"], buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+
+    assert histogram.samples() == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_counter_escapes_label_values():
+    """Test label values are escaped in the text format."""
+    counter = Counter("events_total", "Events.", ["name"])
+    counter.inc('say "hi"')
+    assert counter.samples() == ['events_total{name="say \\"hi\\""} 1']
+
+
+def test_requests_are_recorded_per_route(client, test_user):
+    """Test requests are labelled by route template and their SQL is counted."""
+    route = "/api/v1/lesson-plans/{lesson_plan_id}"
+    before = metrics.requests_total.value("GET", route, "404")
+    statements_before = metrics.request_statements.sum("GET", route)
+
+    response = client.get("/api/v1/lesson-plans/999999")
+    assert response.status_code == 404
+
+    assert metrics.requests_total.value("GET", route, "404") == before + 1
+    assert metrics.request_statements.sum("GET", route) > statements_before
+
+
+def test_unmatched_requests_share_a_label(client):
+    """Test unknown paths do not create a label per path."""
+    before = metrics.requests_total.value("GET", "<unmatched>", "404")
+    client.get("/no-such-page")
+    assert metrics.requests_total.value("GET", "<unmatched>", "404") == before + 1
+
+
+def test_metrics_endpoint(client):
+    """Test the metrics endpoint serves the Prometheus text format."""
+    client.get("/health")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in body
+    assert "http_requests_in_flight 1" in body
+    assert "http_request_db_statements_bucket" in body
+
+
+def test_server_timing_reports_sql_work():
+    """Test debug mode adds a Server-Timing header with the query count."""
+    async def app(scope, receive, send):
+        stats = metrics.current_request.get()
+        stats.statements += 2
+        stats.db_seconds += 0.004
+        await Response("ok")(scope, receive, send)
+
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+    asyncio.run(metrics.MetricsMiddleware(app, server_timing=True)(scope, receive, send))
+
+    headers = dict(messages[0]["headers"])
+    assert headers[b"server-timing"].startswith(b'db;dur=4.00;desc="2 queries", app;dur=')
+
+
+def test_failed_statements_are_timed_on_their_own():
+    """Test a failing statement is counted and leaves no start time behind."""
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine)
+    stats = metrics.RequestStats()
+    token = metrics.current_request.set(stats)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing"))
+            conn.execute(text("SELECT 1"))
+            assert "metrics_started" not in conn.info
+    finally:
+        metrics.current_request.reset(token)
+        engine.dispose()
+
+    assert stats.statements == 2
+    assert 0 <= stats.db_seconds < 1
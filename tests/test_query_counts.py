@@ -0,0 +1,49 @@
+"""Tests asserting the number of SQL statements issued per endpoint."""
+
+import pytest
+
+
+@pytest.fixture
+def tagged_lesson_plans(client, test_user, test_lesson_plan_data):
+    """Create several lesson plans that each carry two tags."""
+    tag_ids = [
+        client.post("/api/v1/tags/", json={"name": name}, headers=test_user["headers"]).json()["id"]
+        for name in ["Programming", "Beginner"]
+    ]
+    return [
+        client.post(
+            "/api/v1/lesson-plans/",
+            json={**test_lesson_plan_data, "title": f"Plan {index}", "tag_ids": tag_ids},
+            headers=test_user["headers"]
+        ).json()
+        for index in range(5)
+    ]
+
+
+def test_list_lesson_plans_query_count(client, tagged_lesson_plans, count_queries):
+    """Test listing lesson plans loads all tags in one batched query."""
+    with count_queries() as statements:
+        response = client.get("/api/v1/lesson-plans/")
+
+    assert len(response.json()) == 5
+    assert all(len(plan["tags"]) == 2 for plan in response.json())
+    assert len(statements) == 2
+
+
+def test_my_lesson_plans_query_count(client, test_user, tagged_lesson_plans, count_queries):
+    """Test listing my lesson plans reuses the cached user and costs two queries."""
+    with count_queries() as statements:
+        response = client.get("/api/v1/lesson-plans/my", headers=test_user["headers"])
+
+    assert len(response.json()) == 5
+    assert len(statements) == 2
+
+
+def test_get_lesson_plan_query_count(client, tagged_lesson_plans, count_queries):
+    """Test fetching one lesson plan with its tags."""
+    lesson_plan_id = tagged_lesson_plans[0]["id"]
+    with count_queries() as statements:
+        response = client.get(f"/api/v1/lesson-plans/{lesson_plan_id}")
+
+    assert len(response.json()["tags"]) == 2
+    assert len(statements) == 2
@@ -0,0 +1,186 @@
+"""Tests for rate limiting and admission control."""
+
+import asyncio
+from ipaddress import ip_network
+
+import pytest
+
+from app.api import rate_limit
+from app.api.rate_limit import (
+    AdmissionController,
+    InMemoryBucketStore,
+    RedisBucketStore,
+    client_address,
+    client_identity,
+    route_class
+)
+
+
+def scope(method="GET", path="/api/v1/lesson-plans/", query=b"", headers=(), peer="10.0.0.1"):
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": list(headers),
+        "client": (peer, 5000),
+    }
+
+
+def test_bucket_allows_bursts_then_refills():
+    """Test a bucket grants its capacity at once and reports when to retry."""
+    store = InMemoryBucketStore(max_keys=10)
+
+    async def take():
+        return [await store.take("client", rate=1.0, capacity=2) for _ in range(3)]
+
+    first, second, third = asyncio.run(take())
+    assert first == second == 0
+    assert 0.9 < third <= 1.0
+
+
+def test_route_classes():
+    """Test requests are charged to the budget of their route class."""
+    assert route_class(scope("POST", "/api/v1/auth/login")) == "auth"
+    assert route_class(scope("POST", "/api/v1/auth/refresh")) == "session"
+    assert route_class(scope("POST", "/api/v1/auth/logout")) == "session"
+    assert route_class(scope("PUT", "/api/v1/lesson-plans/1")) == "write"
+    assert route_class(scope(query=b"search=algebra&limit=5")) == "search"
+    assert route_class(scope(query=b"research=1")) == "read"
+
+
+def test_client_identity(test_user):
+    """Test authenticated clients are keyed by user, others by address."""
+    token = test_user["token"].encode()
+    assert client_identity(scope(headers=[(b"authorization", b"Bearer " + token)])) == (
+        "user:testuser"
+    )
+    assert client_identity(scope(headers=[(b"authorization", b"Bearer invalid")])) == (
+        "ip:10.0.0.1"
+    )
+    assert client_identity(scope()) == "ip:10.0.0.1"
+
+
+def test_forwarded_address_only_from_trusted_proxies():
+    """Test X-Forwarded-For is read from the right, and only when sent by a trusted proxy."""
+    proxies = [ip_network("10.0.0.0/24")]
+    forwarded = [(b"x-forwarded-for", b"6.6.6.6, 203.0.113.7, 10.0.0.2")]
+
+    assert client_address(scope(headers=forwarded), proxies) == "203.0.113.7"
+    assert client_address(scope(headers=forwarded, peer="192.0.2.1"), proxies) == "192.0.2.1"
+    assert client_address(scope(headers=forwarded), []) == "10.0.0.1"
+    assert client_address(scope(), proxies) == "10.0.0.1"
+
+
+def test_login_is_rate_limited(client, monkeypatch):
+    """Test clients over their budget get 429 with Retry-After before any work is done."""
+    monkeypatch.setitem(rate_limit.rate_limiter.per_minute, "auth", 2)
+    login = {"username": "nobody", "password": "password123"}
+
+    assert client.post("/api/v1/auth/login", data=login).status_code == 401
+    assert client.post("/api/v1/auth/login", data=login).status_code == 401
+
+    response = client.post("/api/v1/auth/login", data=login)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    # Other route classes have their own budget
+    assert client.get("/api/v1/lesson-plans/").status_code == 200
+
+
+def test_login_budget_is_per_username_and_address(client, test_user, monkeypatch):
+    """Test one username's failed logins do not lock out others at the same address."""
+    monkeypatch.setitem(rate_limit.rate_limiter.per_minute, "auth", 1)
+    monkeypatch.setitem(rate_limit.rate_limiter.per_minute, "auth-address", 3)
+    # Forget the fixture's own register and login
+    monkeypatch.setattr(rate_limit.rate_limiter, "store", rate_limit.create_store())
+    guess = {"username": "nobody", "password": "password123"}
+    user = test_user["user_data"]
+    login = {"username": user["username"], "password": user["password"]}
+
+    assert client.post("/api/v1/auth/login", data=guess).status_code == 401
+    assert client.post("/api/v1/auth/login", data=guess).status_code == 429
+    # The body read to find the username still reaches the endpoint
+    assert client.post("/api/v1/auth/login", data=login).status_code == 200
+
+    # The address as a whole has its own, larger budget
+    assert client.post("/api/v1/auth/login", data={**guess, "username": "other"}).status_code == 401
+    assert client.post("/api/v1/auth/login", data={**guess, "username": "third"}).status_code == 429
+
+
+def test_unreachable_shared_store_fails_open(client, monkeypatch):
+    """Test requests are let through when the bucket store cannot be reached."""
+    class Unreachable:
+        async def eval(self, *args):
+            raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(rate_limit.rate_limiter, "store", RedisBucketStore(Unreachable()))
+    assert client.get("/api/v1/lesson-plans/").status_code == 200
+
+
+def test_redis_store_runs_script_under_prefixed_key():
+    """Test the shared store delegates to a single script call."""
+    calls = []
+
+    class FakeRedis:
+        async def eval(self, script, numkeys, *args):
+            calls.append((numkeys, args))
+            return b"0.5"
+
+    store = RedisBucketStore(FakeRedis())
+    assert asyncio.run(store.take("read:ip:1", rate=2.0, capacity=10)) == 0.5
+    assert calls == [(1, ("rate-limit:read:ip:1", 2.0, 10, 1.0))]
+
+
+def test_admission_queues_then_sheds():
+    """Test waiting requests get freed slots in order and time out otherwise."""
+    async def scenario():
+        controller = AdmissionController(limit=1, timeout=0.05)
+        assert await controller.acquire()
+
+        # Times out: nobody releases
+        assert not await controller.acquire()
+
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        controller.release()
+        assert await waiter
+        assert controller.active == 1
+
+        controller.release()
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("path, expected", [("/api/v1/lesson-plans/", 503), ("/health", 200)])
+def test_overload_is_shed_except_health_checks(client, monkeypatch, path, expected):
+    """Test requests beyond the concurrency limit get 503, health checks still answer."""
+    monkeypatch.setattr(rate_limit.admission, "limit", 0)
+    monkeypatch.setattr(rate_limit.admission, "timeout", 0)
+
+    response = client.get(path)
+    assert response.status_code == expected
+    if expected == 503:
+        assert response.headers["Retry-After"] == "1"
+
+
+def test_refreshes_are_charged_per_login(client, monkeypatch):
+    """Test refreshes from one address by different users do not share a budget."""
+    monkeypatch.setitem(rate_limit.rate_limiter.per_minute, "session", 2)
+    refresh_tokens = []
+    for name in ("alice", "bob", "carol"):
+        user = {"email": f"{name}@example.com", "username": name, "password": "password123"}
+        client.post("/api/v1/auth/register", json=user)
+        login = client.post("/api/v1/auth/login", data=user)
+        refresh_tokens.append(login.json()["refresh_token"])
+
+    for _ in range(2):
+        for index, token in enumerate(refresh_tokens):
+            response = client.post("/api/v1/auth/refresh", json={"refresh_token": token})
+            assert response.status_code == 200
+            refresh_tokens[index] = response.json()["refresh_token"]
+
+    # Each login has used its own budget
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_tokens[0]})
+    assert response.status_code == 429
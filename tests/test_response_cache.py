@@ -0,0 +1,153 @@
+"""Tests for the response cache on public GET endpoints."""
+
+import asyncio
+
+import pytest
+
+from app.api.endpoints.lesson_plans import lesson_plan_cache_key
+from app.core.response_cache import LESSON_PLANS, RedisBackend, replica_read, response_cache
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of the redis.asyncio API we use."""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+    async def incr(self, key):
+        self.store[key] = int(self.store.get(key, 0)) + 1
+        return self.store[key]
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache_backend(request, client):
+    """Run a test against both the in-memory and the Redis-compatible backend."""
+    if request.param == "redis":
+        response_cache.backend = RedisBackend(FakeRedis())
+    return request.param
+
+
+def test_lesson_plan_detail_cached_and_invalidated(
+    client, cache_backend, test_user, test_lesson_plan_data
+):
+    """Test detail responses are cached and refreshed after an update."""
+    lesson_plan_id = client.post(
+        "/api/v1/lesson-plans/",
+        json=test_lesson_plan_data,
+        headers=test_user["headers"]
+    ).json()["id"]
+
+    assert client.get(f"/api/v1/lesson-plans/{lesson_plan_id}").headers["X-Cache"] == "MISS"
+    assert client.get(f"/api/v1/lesson-plans/{lesson_plan_id}").headers["X-Cache"] == "HIT"
+
+    client.put(
+        f"/api/v1/lesson-plans/{lesson_plan_id}",
+        json={"title": "Updated Title"},
+        headers=test_user["headers"]
+    )
+
+    response = client.get(f"/api/v1/lesson-plans/{lesson_plan_id}")
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json()["title"] == "Updated Title"
+
+
+def test_detail_read_racing_an_update_is_not_served(
+    client, cache_backend, test_user, test_lesson_plan_data
+):
+    """Test a response built before an update but stored after it is never served."""
+    created = client.post(
+        "/api/v1/lesson-plans/",
+        json=test_lesson_plan_data,
+        headers=test_user["headers"]
+    )
+    lesson_plan_id = created.json()["id"]
+    stale_etag = created.headers["ETag"]
+
+    # A reader misses the cache and loads the row...
+    stale_key = asyncio.run(lesson_plan_cache_key(lesson_plan_id))
+    stale_body = client.get(f"/api/v1/lesson-plans/{lesson_plan_id}").content
+
+    # ...the update commits...
+    client.put(
+        f"/api/v1/lesson-plans/{lesson_plan_id}",
+        json={"title": "Updated Title"},
+        headers=test_user["headers"]
+    )
+
+    # ...and only then does the reader store what it loaded
+    asyncio.run(response_cache.store_body(stale_key, stale_body, {"ETag": stale_etag}))
+
+    response = client.get(f"/api/v1/lesson-plans/{lesson_plan_id}")
+    assert response.json()["title"] == "Updated Title"
+    response = client.get(
+        f"/api/v1/lesson-plans/{lesson_plan_id}", headers={"If-None-Match": stale_etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != stale_etag
+
+
+def test_replica_reads_are_not_cached_right_after_invalidation(cache_backend, monkeypatch):
+    """Test responses read from a possibly lagging replica do not fill a fresh generation."""
+    monkeypatch.setattr(response_cache, "lag", 5)
+
+    async def scenario():
+        await response_cache.invalidate(LESSON_PLANS)
+        key = await response_cache.key("lesson_plan", [LESSON_PLANS], id=1)
+        replica_read.set(True)
+        await response_cache.store_body(key, b"{}")
+        from_replica = await response_cache.get(key)
+        replica_read.set(False)
+        await response_cache.store_body(key, b"{}")
+        return from_replica, await response_cache.get(key)
+
+    from_replica, from_primary = asyncio.run(scenario())
+    assert from_replica is None
+    assert from_primary is not None
+
+
+def test_lesson_plan_list_invalidated_on_create(
+    client, cache_backend, test_user, test_lesson_plan_data
+):
+    """Test list pages are cached per query and invalidated by new lesson plans."""
+    client.get("/api/v1/lesson-plans/?limit=10&subject=Computer")
+    response = client.get("/api/v1/lesson-plans/?subject=Computer&limit=10")
+    assert response.headers["X-Cache"] == "HIT"
+    assert response.json() == []
+
+    client.post("/api/v1/lesson-plans/", json=test_lesson_plan_data, headers=test_user["headers"])
+
+    response = client.get("/api/v1/lesson-plans/?limit=10&subject=Computer")
+    assert response.headers["X-Cache"] == "MISS"
+    assert len(response.json()) == 1
+
+
+def test_delete_tag_invalidates_lesson_plans(
+    client, cache_backend, test_user, test_lesson_plan_data
+):
+    """Test deleting a tag refreshes cached lesson plans that embedded it."""
+    tag_id = client.post(
+        "/api/v1/tags/", json={"name": "STEM"}, headers=test_user["headers"]
+    ).json()["id"]
+    lesson_plan_id = client.post(
+        "/api/v1/lesson-plans/",
+        json={**test_lesson_plan_data, "tag_ids": [tag_id]},
+        headers=test_user["headers"]
+    ).json()["id"]
+
+    assert len(client.get(f"/api/v1/lesson-plans/{lesson_plan_id}").json()["tags"]) == 1
+    assert len(client.get("/api/v1/tags/").json()) == 1
+
+    client.delete(f"/api/v1/tags/{tag_id}", headers=test_user["headers"])
+
+    assert client.get(f"/api/v1/lesson-plans/{lesson_plan_id}").json()["tags"] == []
+    assert client.get("/api/v1/tags/").json() == []
+    assert client.get(f"/api/v1/tags/{tag_id}").status_code == 404
@@ -0,0 +1,61 @@
+"""Tests for the synthetic data generator."""
+
+from sqlalchemy import create_engine, func, select
+
+from app.models.lesson_plan import LessonPlan, Tag, lesson_plan_tags
+from app.models.user import User
+from app.tools.seed import SeedSpec, main, seed
+
+
+def test_seed_loads_consistent_rows(tmp_path):
+    """Test seeded tags count their lesson plans and every user can own plans."""
+    url = f"sqlite:///{tmp_path / 'seed.db'}"
+    spec = SeedSpec(users=5, tags=8, plans=200, batch_size=64)
+    result = seed(url, spec)
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(LessonPlan)).scalar() == 200
+        assert conn.execute(select(func.count()).select_from(lesson_plan_tags)).scalar() == (
+            result.links
+        )
+        usage = dict(conn.execute(
+            select(lesson_plan_tags.c.tag_id, func.count()).group_by(lesson_plan_tags.c.tag_id)
+        ).all())
+        for tag_id, count in conn.execute(select(Tag.id, Tag.lesson_plan_count)):
+            assert count == usage.get(tag_id, 0)
+        owners = set(conn.execute(select(LessonPlan.owner_id).distinct()).scalars())
+        assert owners <= set(result.user_ids)
+    engine.dispose()
+
+
+def test_seed_is_reproducible_and_appends(tmp_path):
+    """Test a seed always yields the same rows and new seeds get fresh ids."""
+    def titles(url):
+        engine = create_engine(url)
+        with engine.connect() as conn:
+            rows = conn.execute(select(LessonPlan.title).order_by(LessonPlan.id)).scalars().all()
+        engine.dispose()
+        return rows
+
+    spec = SeedSpec(users=3, tags=4, plans=50)
+    first, second = f"sqlite:///{tmp_path / 'a.db'}", f"sqlite:///{tmp_path / 'b.db'}"
+    seed(first, spec)
+    seed(second, spec)
+    assert titles(first) == titles(second)
+
+    more = seed(first, SeedSpec(users=3, tags=4, plans=50, seed=7))
+    assert more.plan_ids == range(51, 101)
+    assert more.user_ids == [4, 5, 6]
+
+
+def test_seed_cli(tmp_path, capsys):
+    """Test the command line entry point."""
+    url = f"sqlite:///{tmp_path / 'cli.db'}"
+    main(["--database-url", url, "--users", "2", "--tags", "3", "--plans", "10", "--reset"])
+
+    assert "Loaded 2 users, 3 tags, 10 lesson plans" in capsys.readouterr().err
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(User)).scalar() == 2
+    engine.dispose()
@@ -0,0 +1,81 @@
+"""Tests for incremental JSON record parsing."""
+
+import asyncio
+
+from app.api.streaming import RecordError, iter_json_records
+
+
+def parse(*chunks):
+    """Collect the records parsed from the given body chunks."""
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [record async for record in iter_json_records(stream())]
+
+    return asyncio.run(collect())
+
+
+def test_ndjson_records_split_across_chunks():
+    """Records may span chunk boundaries, including inside UTF-8 characters."""
+    body = '{"a": 1}\n\n{"b": "café"}\n{"c": 3}'.encode()
+    split = body.index(b"\xc3") + 1
+    assert parse(body[:5], body[5:split], body[split:]) == [
+        (0, {"a": 1}), (1, {"b": "café"}), (2, {"c": 3})
+    ]
+
+
+def test_ndjson_invalid_line_is_reported():
+    """An invalid NDJSON line is reported without stopping the stream."""
+    records = parse(b'{"a": 1}\nnope\n{"b": 2}\n')
+    assert records[0] == (0, {"a": 1})
+    assert isinstance(records[1][1], RecordError)
+    assert records[2] == (2, {"b": 2})
+
+
+def test_json_array_records():
+    """Array elements are yielded one by one."""
+    assert parse(b' [{"a": 1},', b' {"b"', b': 2} ]') == [(0, {"a": 1}), (1, {"b": 2})]
+
+
+def test_unterminated_json_array():
+    """A truncated array ends with an error."""
+    records = parse(b'[{"a": 1}, {"b": ')
+    assert records[0] == (0, {"a": 1})
+    assert isinstance(records[1][1], RecordError)
+
+
+def test_malformed_array_element_is_skipped():
+    """A malformed array element is reported and the elements after it still parse."""
+    records = parse(b'[{"a": 1}, nope, {"b": "x, ]"}', b', {"c": [3]}]')
+    assert records[0] == (0, {"a": 1})
+    assert isinstance(records[1][1], RecordError)
+    assert records[2:] == [(2, {"b": "x, ]"}), (3, {"c": [3]})]
+
+
+def test_array_number_split_across_chunks():
+    """A number is only decoded once a delimiter shows it is complete."""
+    assert parse(b"[12", b"3, 4", b"5]") == [(0, 123), (1, 45)]
+    assert parse(b'["a\\', b'"b"]') == [(0, 'a"b')]
+
+
+def test_oversized_records_are_rejected():
+    """Records over the size limit are reported without buffering them whole."""
+    async def stream(*chunks):
+        for chunk in chunks:
+            yield chunk
+
+    async def collect(*chunks):
+        return [record async for record in iter_json_records(stream(*chunks), max_record_size=8)]
+
+    big = b'{"a": "' + b"x" * 20 + b'"}'
+    records = asyncio.run(collect(b'[1, ' + big[:10], big[10:], b", 2]"))
+    assert records[0] == (0, 1)
+    assert isinstance(records[1][1], RecordError)
+    assert records[2] == (2, 2)
+
+    records = asyncio.run(collect(b"1\n" + big[:10], big[10:] + b"\n2\n"))
+    assert records[0] == (0, 1)
+    assert isinstance(records[1][1], RecordError)
+    assert records[2] == (2, 2)
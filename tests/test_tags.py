@@ -1,7 +1,11 @@
 """Tests for tag endpoints."""
 
+import json
+
 import pytest
 
+from app.core.config import settings
+
 
 def test_create_tag(client, test_user):
     """Test creating a tag."""
@@ -119,3 +123,144 @@ def test_delete_tag(client, test_user):
     # Verify it's deleted
     response = client.get(f"/api/v1/tags/{tag_id}")
     assert response.status_code == 404
+
+
+def test_get_tags_cursor_pagination(client, test_user):
+    """Test tags are paged in name order with the next cursor."""
+    for name in ["Science", "Art", "Math"]:
+        client.post("/api/v1/tags/", json={"name": name}, headers=test_user["headers"])
+
+    first_page = client.get("/api/v1/tags/?limit=2")
+    assert [tag["name"] for tag in first_page.json()] == ["Art", "Math"]
+
+    second_page = client.get(
+        "/api/v1/tags/",
+        params={"limit": 2, "cursor": first_page.headers["X-Next-Cursor"]}
+    )
+    assert [tag["name"] for tag in second_page.json()] == ["Science"]
+
+
+def test_delete_tag_bumps_lesson_plan_version(client, test_user, test_lesson_plan_data):
+    """Test removing a tag changes the version of lesson plans that carried it."""
+    tag_id = client.post(
+        "/api/v1/tags/", json={"name": "STEM"}, headers=test_user["headers"]
+    ).json()["id"]
+    lesson_plan_id = client.post(
+        "/api/v1/lesson-plans/",
+        json={**test_lesson_plan_data, "tag_ids": [tag_id]},
+        headers=test_user["headers"]
+    ).json()["id"]
+
+    client.delete(f"/api/v1/tags/{tag_id}", headers=test_user["headers"])
+
+    data = client.get(f"/api/v1/lesson-plans/{lesson_plan_id}").json()
+    assert data["version"] == 2
+    assert data["tags"] == []
+
+
+def test_delete_tag_records_lesson_plan_revisions(
+    client, test_user, test_lesson_plan_data, monkeypatch
+):
+    """Test removing a tag records the new version in each lesson plan's history."""
+    monkeypatch.setattr(settings, "REVISION_SNAPSHOT_INTERVAL", 2)
+    headers = test_user["headers"]
+    removed, kept = (
+        client.post("/api/v1/tags/", json={"name": name}, headers=headers).json()["id"]
+        for name in ["STEM", "Art"]
+    )
+    lesson_plan_ids = [
+        client.post(
+            "/api/v1/lesson-plans/",
+            json={**test_lesson_plan_data, "tag_ids": [removed, kept]},
+            headers=headers
+        ).json()["id"]
+        for _ in range(2)
+    ]
+    # The second lesson plan's next revision is due to be a snapshot
+    client.put(
+        f"/api/v1/lesson-plans/{lesson_plan_ids[1]}", json={"title": "Renamed"}, headers=headers
+    )
+
+    client.delete(f"/api/v1/tags/{removed}", headers=headers)
+
+    for lesson_plan_id, version, title in [
+        (lesson_plan_ids[0], 2, test_lesson_plan_data["title"]),
+        (lesson_plan_ids[1], 3, "Renamed"),
+    ]:
+        assert client.get(f"/api/v1/lesson-plans/{lesson_plan_id}").json()["version"] == version
+        revision = client.get(
+            f"/api/v1/lesson-plans/{lesson_plan_id}/revisions/{version}"
+        ).json()
+        assert revision["tag_ids"] == [kept]
+        assert revision["title"] == title
+        previous = client.get(
+            f"/api/v1/lesson-plans/{lesson_plan_id}/revisions/{version - 1}"
+        ).json()
+        assert previous["tag_ids"] == sorted([removed, kept])
+
+    revisions = client.get(f"/api/v1/lesson-plans/{lesson_plan_ids[1]}/revisions").json()
+    assert revisions[0]["is_snapshot"] is True
+
+
+def test_tag_usage_counts(client, test_user, test_lesson_plan_data):
+    """Test tag usage counts follow lesson plan writes and drive popularity order."""
+    headers = test_user["headers"]
+    tag_ids = {
+        name: client.post("/api/v1/tags/", json={"name": name}, headers=headers).json()["id"]
+        for name in ["Art", "Math", "Science"]
+    }
+
+    def counts():
+        return {tag["name"]: tag["lesson_plan_count"] for tag in client.get("/api/v1/tags/").json()}
+
+    first = client.post(
+        "/api/v1/lesson-plans/",
+        json={**test_lesson_plan_data, "tag_ids": [tag_ids["Math"], tag_ids["Science"]]},
+        headers=headers
+    ).json()
+    client.post(
+        "/api/v1/lesson-plans/",
+        json={**test_lesson_plan_data, "tag_ids": [tag_ids["Math"]]},
+        headers=headers
+    )
+    assert counts() == {"Art": 0, "Math": 2, "Science": 1}
+
+    client.put(
+        f"/api/v1/lesson-plans/{first['id']}",
+        json={"tag_ids": [tag_ids["Math"], tag_ids["Art"]]},
+        headers=headers
+    )
+    assert counts() == {"Art": 1, "Math": 2, "Science": 0}
+    assert client.get(f"/api/v1/tags/{tag_ids['Art']}").json()["lesson_plan_count"] == 1
+
+    response = client.get("/api/v1/tags/popular")
+    assert [tag["name"] for tag in response.json()] == ["Math", "Art"]
+
+    first_page = client.get("/api/v1/tags/?sort=popular&limit=2")
+    assert [tag["name"] for tag in first_page.json()] == ["Math", "Art"]
+    second_page = client.get(
+        "/api/v1/tags/",
+        params={"sort": "popular", "limit": 2, "cursor": first_page.headers["X-Next-Cursor"]}
+    )
+    assert [tag["name"] for tag in second_page.json()] == ["Science"]
+
+    client.delete(f"/api/v1/lesson-plans/{first['id']}", headers=headers)
+    assert counts() == {"Art": 0, "Math": 1, "Science": 0}
+
+
+def test_bulk_import_updates_tag_usage(client, test_user, test_lesson_plan_data):
+    """Test bulk imports count each imported tag association."""
+    headers = test_user["headers"]
+    tag_id = client.post("/api/v1/tags/", json={"name": "Bulk"}, headers=headers).json()["id"]
+    client.get(f"/api/v1/tags/{tag_id}")
+
+    body = "\n".join(
+        json.dumps({**test_lesson_plan_data, "tag_ids": [tag_id]}) for _ in range(3)
+    )
+    client.post(
+        "/api/v1/lesson-plans/import",
+        content=body.encode(),
+        headers={**headers, "Content-Type": "application/x-ndjson"}
+    )
+
+    assert client.get(f"/api/v1/tags/{tag_id}").json()["lesson_plan_count"] == 3
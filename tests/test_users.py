@@ -56,3 +56,55 @@ def test_update_user_password(client, test_user):
     }
     response = client.post("/api/v1/auth/login", data=login_data)
     assert response.status_code == 200
+
+
+def test_password_change_revokes_tokens(client, test_user):
+    """Test changing the password revokes refresh tokens and their access tokens."""
+    login_data = {
+        "username": test_user["user_data"]["username"],
+        "password": test_user["user_data"]["password"]
+    }
+    other_session = client.post("/api/v1/auth/login", data=login_data).json()
+
+    response = client.put(
+        "/api/v1/users/me",
+        json={"password": "newpassword123"},
+        headers=test_user["headers"]
+    )
+    assert response.status_code == 200
+
+    response = client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": other_session["refresh_token"]}
+    )
+    assert response.status_code == 401
+    for token in (test_user["token"], other_session["access_token"]):
+        response = client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+
+
+def test_username_change_invalidates_cached_user(client, test_user):
+    """Test tokens for a renamed account stop resolving despite the user cache."""
+    # Warm the user cache
+    assert client.get("/api/v1/users/me", headers=test_user["headers"]).status_code == 200
+
+    response = client.put(
+        "/api/v1/users/me",
+        json={"username": "renameduser"},
+        headers=test_user["headers"]
+    )
+    assert response.status_code == 200
+
+    response = client.get("/api/v1/users/me", headers=test_user["headers"])
+    assert response.status_code == 401
+
+
+def test_cached_user_skips_lookup(client, test_user, count_queries):
+    """Test repeated requests with the same token skip the user query."""
+    client.get("/api/v1/users/me", headers=test_user["headers"])
+
+    with count_queries() as statements:
+        response = client.get("/api/v1/users/me", headers=test_user["headers"])
+
+    assert response.status_code == 200
+    assert response.json()["username"] == test_user["user_data"]["username"]
+    assert statements == []